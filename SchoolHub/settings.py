@@ -244,6 +244,21 @@ CRONJOBS = [
 
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1_000_000
 
+# Processes rendering the pages of large PDF exports (1 renders in the request's process).
+PDF_EXPORT_WORKERS = config('PDF_EXPORT_WORKERS', default=1, cast=int)
+
+# Where export jobs run: "thread" in a background thread of the web process, "sync" in the
+# request that starts them, "worker" in a separate `manage.py run_export_jobs --watch` process.
+EXPORT_JOB_RUNNER = config('EXPORT_JOB_RUNNER', default='thread')
+EXPORT_JOB_THREADS = config('EXPORT_JOB_THREADS', default=1, cast=int)
+# Seconds without progress after which a running export job counts as interrupted (e.g. its
+# web process died) and is run again.
+EXPORT_JOB_STALE_AFTER = config('EXPORT_JOB_STALE_AFTER', default=300, cast=int)
+
+# Seconds after which a process rebuilds its student typeahead index, picking up changes
+# made by other processes and bulk writes (its own saves and deletes update it at once).
+TYPEAHEAD_MAX_AGE = config('TYPEAHEAD_MAX_AGE', default=300, cast=int)
+
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
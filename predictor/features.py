@@ -0,0 +1,78 @@
+"""
+Feature extraction for ``student_performance_model.pkl``.
+
+``student_features()`` reads the columns the model needs for a queryset of
+students with one ``values_list`` query (the grade average as a correlated
+subquery, the profiles as left joins) and encodes them column by column with
+NumPy into a ``float32`` matrix, in the order the model was trained on.
+"""
+
+import numpy as np
+from django.db.models import Avg, OuterRef, Subquery
+
+from students.models import Grade
+
+# The model's input columns, in order: (name, value path, encoding). A value of
+# None means the column is used as a number (NULL, e.g. a missing profile, is
+# 0); otherwise the column is 1 where the value equals it and 0 elsewhere.
+FEATURES = [
+    ("attendance_percentage", "attendance_percentage", None),
+    ("average_score", "average_score", None),
+    ("daily_study_hours", "economic_situation__daily_study_hours", None),
+    ("has_private_study_room", "economic_situation__has_private_study_room", True),
+    ("has_stationery", "economic_situation__has_stationery", True),
+    ("receives_private_tutoring", "economic_situation__receives_private_tutoring", True),
+    ("works_after_school", "economic_situation__works_after_school", True),
+    ("family_income_level", "economic_situation__family_income_level", None),
+    ("housing_owned", "economic_situation__housing_status", "Owned"),
+    ("housing_rented", "economic_situation__housing_status", "Rented"),
+    ("housing_temporary_shelter", "economic_situation__housing_status", "Temporary Shelter"),
+    ("housing_none", "economic_situation__housing_status", "None"),
+    ("high_motivation", "health_information__motivation", "High"),
+    ("depression", "health_information__depression", True),
+    ("high_academic_stress", "health_information__academic_stress", "High"),
+    ("good_study_life_balance", "health_information__study_life_balance", "Good"),
+    ("high_family_pressures", "health_information__family_pressures", "High"),
+    ("high_sleep_disorder", "health_information__sleep_disorder", "High"),
+    ("daily_screen_time", "tech_and_social__daily_screen_time", None),
+    ("plays_video_games", "tech_and_social__plays_video_games", True),
+    ("daily_gaming_hours", "tech_and_social__daily_gaming_hours", None),
+    ("negative_social_media_impact", "tech_and_social__social_media_impact_on_studies", "Negative"),
+    ("watches_gaming", "tech_and_social__content_type_watched", "Gaming"),
+    ("watches_educational", "tech_and_social__content_type_watched", "Educational"),
+    ("watches_entertainment", "tech_and_social__content_type_watched", "Entertainment"),
+    ("watches_news", "tech_and_social__content_type_watched", "News"),
+]
+
+FEATURE_NAMES = [name for name, _, _ in FEATURES]
+
+# Each value read once, even when several features encode it.
+FEATURE_VALUES = list(dict.fromkeys(path for _, path, _ in FEATURES))
+
+
+def encode_features(rows):
+    """The ``float32`` feature matrix of ``rows`` of ``FEATURE_VALUES``."""
+    values = np.array(rows, dtype=object).reshape(len(rows), len(FEATURE_VALUES))
+    columns = {path: values[:, index] for index, path in enumerate(FEATURE_VALUES)}
+    matrix = np.zeros((len(rows), len(FEATURES)), dtype=np.float32)
+    for index, (_, path, encoding) in enumerate(FEATURES):
+        column = columns[path]
+        if encoding is None:
+            matrix[:, index] = np.where(np.equal(column, None), 0.0, column).astype(np.float32)
+        else:
+            matrix[:, index] = np.equal(column, encoding)
+    return matrix
+
+
+def student_features(queryset):
+    """
+    ``(student_ids, matrix)`` for the students of ``queryset``: their ids and
+    their ``float32`` feature matrix, one row per student in queryset order.
+    """
+    average_score = (
+        Grade.objects.filter(student=OuterRef("pk")).order_by()
+        .values("student").annotate(average=Avg("score")).values("average")
+    )
+    rows = list(queryset.annotate(average_score=Subquery(average_score)).values_list("pk", *FEATURE_VALUES))
+    student_ids = [row[0] for row in rows]
+    return student_ids, encode_features([row[1:] for row in rows])
@@ -1,3 +1,133 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Avg
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from predictor.features import FEATURE_NAMES, student_features
+from students.models import (
+    EconomicSituation,
+    Grade,
+    HealthInformation,
+    SocialMediaAndTechnology,
+    Student,
+    Subject,
+)
+
+
+def per_student_features(student):
+    """The feature list performance_dashboard built for each student before predictor.features."""
+    econ = getattr(student, 'economic_situation', None)
+    health = getattr(student, 'health_information', None)
+    tech = getattr(student, 'tech_and_social', None)
+    return [
+        student.attendance_percentage or 0.0,
+        student.avg_score or 0.0,
+        getattr(econ, 'daily_study_hours', 0.0),
+        1 if econ and econ.has_private_study_room else 0,
+        1 if econ and econ.has_stationery else 0,
+        1 if econ and econ.receives_private_tutoring else 0,
+        1 if econ and econ.works_after_school else 0,
+        float(getattr(econ, 'family_income_level', 0.0)),
+        1 if econ and econ.housing_status == "Owned" else 0,
+        1 if econ and econ.housing_status == "Rented" else 0,
+        1 if econ and econ.housing_status == "Temporary Shelter" else 0,
+        1 if econ and econ.housing_status == "None" else 0,
+        1 if health and health.motivation == "High" else 0,
+        1 if health and health.depression else 0,
+        1 if health and health.academic_stress == "High" else 0,
+        1 if health and health.study_life_balance == "Good" else 0,
+        1 if health and health.family_pressures == "High" else 0,
+        1 if health and health.sleep_disorder == "High" else 0,
+        getattr(tech, 'daily_screen_time', 0.0),
+        1 if tech and tech.plays_video_games else 0,
+        getattr(tech, 'daily_gaming_hours', 0.0),
+        1 if tech and tech.social_media_impact_on_studies == "Negative" else 0,
+        1 if tech and tech.content_type_watched == "Gaming" else 0,
+        1 if tech and tech.content_type_watched == "Educational" else 0,
+        1 if tech and tech.content_type_watched == "Entertainment" else 0,
+        1 if tech and tech.content_type_watched == "News" else 0,
+    ]
+
+
+class StudentFeaturesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        subject = Subject.objects.create(name="Mathematics")
+
+        def student(name, attendance, **profiles):
+            user = User.objects.create(username=name, email=f"{name}@example.com")
+            student = Student.objects.create(
+                user=user,
+                full_name=name.title(),
+                email=f"{name}@example.com",
+                enrollment_date=date(2023, 9, 1),
+                date_of_birth=date(2008, 1, 1),
+                gender="Female",
+                address="1 Main Street",
+                emergency_contact="0100000000",
+                guardian_relationship="Mother",
+                attendance_percentage=attendance,
+            )
+            for model, values in profiles.items():
+                {"economic": EconomicSituation, "health": HealthInformation, "tech": SocialMediaAndTechnology}[
+                    model
+                ].objects.create(student=student, **values)
+            return student
+
+        cls.complete = student(
+            "complete", 92.5,
+            economic=dict(
+                daily_study_hours=3.5, has_private_study_room=True, has_stationery=True,
+                receives_private_tutoring=False, works_after_school=True,
+                family_income_level=Decimal("1500.00"), housing_status="Rented",
+            ),
+            health=dict(
+                motivation="High", depression=True, academic_stress="High", study_life_balance="Good",
+                family_pressures="High",
+            ),
+            tech=dict(
+                daily_screen_time=6.0, plays_video_games=True, daily_gaming_hours=2.5,
+                social_media_impact_on_studies="Negative", content_type_watched="Educational",
+            ),
+        )
+        cls.no_housing = student(
+            "nohousing", 70.0,
+            economic=dict(daily_study_hours=1.0, family_income_level=Decimal("300.00"), housing_status=None),
+            tech=dict(content_type_watched="Gaming"),
+        )
+        cls.no_profiles = student("noprofiles", 0.0)
+        for score in ("80.00", "95.50"):
+            Grade.objects.create(student=cls.complete, subject=subject, score=Decimal(score))
+        Grade.objects.create(student=cls.no_housing, subject=subject, score=Decimal("61.25"))
+
+    def test_matches_the_per_student_features(self):
+        queryset = Student.objects.order_by("full_name")
+        student_ids, matrix = student_features(queryset)
+
+        students = queryset.select_related(
+            "economic_situation", "health_information", "tech_and_social"
+        ).annotate(avg_score=Avg("grades__score"))
+        self.assertEqual(student_ids, [student.pk for student in students])
+        self.assertEqual(matrix.shape, (3, len(FEATURE_NAMES)))
+        self.assertEqual(matrix.dtype, np.float32)
+        for row, student in zip(matrix, students):
+            with self.subTest(student=student.full_name):
+                expected = np.array([float(value) for value in per_student_features(student)], dtype=np.float32)
+                np.testing.assert_array_equal(row, expected)
+
+    def test_missing_profiles_and_housing_are_zero(self):
+        student_ids, matrix = student_features(Student.objects.filter(pk=self.no_profiles.pk))
+        self.assertEqual(student_ids, [self.no_profiles.pk])
+        self.assertFalse(matrix.any())
+
+        _, matrix = student_features(Student.objects.filter(pk=self.no_housing.pk))
+        housing = [FEATURE_NAMES.index(name) for name in FEATURE_NAMES if name.startswith("housing_")]
+        self.assertFalse(matrix[0, housing].any())
+
+    def test_empty_selection(self):
+        student_ids, matrix = student_features(Student.objects.filter(pk__in=[]))
+        self.assertEqual(student_ids, [])
+        self.assertEqual(matrix.shape, (0, len(FEATURE_NAMES)))
@@ -1,110 +1,30 @@
-import datetime
 import json
-import csv
 import logging
-from io import BytesIO
 from django.contrib import admin
-from django.http import HttpResponse
-from django.urls import reverse
-from django.utils.html import format_html, mark_safe
+from django.utils.html import mark_safe
 from django.shortcuts import redirect
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from docx import Document
+from students.export_jobs import start_admin_export
 from .models import Report, ReportsDashboard
 
 logger = logging.getLogger(__name__)
 
 def export_reports_pdf(modeladmin, request, queryset):
     """
-    Admin action to export selected reports as PDF.
+    Admin action to export selected reports as PDF, in a background export job.
     """
-    try:
-        response = HttpResponse(content_type='application/pdf')
-        filename = f'reports_{datetime.datetime.now().strftime("%Y%m%d")}.pdf'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        pdf = canvas.Canvas(response, pagesize=letter)
-        pdf.setTitle("Reports Information")
-        y = 750
-
-        for report in queryset:
-            if y < 100:
-                pdf.showPage()
-                y = 750
-            pdf.setFont("Helvetica-Bold", 12)
-            pdf.drawString(100, y, f"Report for {report.student.full_name} - {report.get_category_display()}")
-            y -= 20
-            pdf.setFont("Helvetica", 10)
-            pdf.drawString(100, y, f"Report Type: {report.report_type} | Status: {report.status}")
-            y -= 15
-            pdf.drawString(100, y, f"Generated At: {report.generated_at}")
-            y -= 25
-
-            # Attempt to print report data (assuming it is a dict)
-            if isinstance(report.data, dict):
-                for key, value in report.data.items():
-                    pdf.drawString(120, y, f"{key}: {value}")
-                    y -= 15
-                    if y < 100:
-                        pdf.showPage()
-                        y = 750
-            else:
-                pdf.drawString(120, y, f"Data: {report.data}")
-                y -= 15
-            y -= 20
-
-        pdf.save()
-        return response
-    except Exception as e:
-        logger.exception("Error exporting reports to PDF: %s", e)
-        return HttpResponse("An error occurred while generating the PDF.", status=500)
+    start_admin_export(modeladmin, request, "reports.pdf", queryset)
 
 def export_reports_csv(modeladmin, request, queryset):
     """
-    Admin action to export selected reports as CSV.
+    Admin action to export selected reports as CSV, in a background export job.
     """
-    try:
-        response = HttpResponse(content_type='text/csv')
-        filename = f'reports_{datetime.datetime.now().strftime("%Y%m%d")}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(["Student", "Category", "Report Type", "Status", "Generated At", "Data"])
-        for report in queryset:
-            data_str = (report.data if isinstance(report.data, str)
-                        else json.dumps(report.data, ensure_ascii=False))
-            writer.writerow([
-                report.student.full_name if report.student else "No Student",
-                report.get_category_display(),
-                report.report_type,
-                report.status,
-                report.generated_at,
-                data_str
-            ])
-        return response
-    except Exception as e:
-        logger.exception("Error exporting reports to CSV: %s", e)
-        return HttpResponse("An error occurred while generating the CSV file.", status=500)
+    start_admin_export(modeladmin, request, "reports.csv", queryset)
 
 def export_reports_word(modeladmin, request, queryset):
     """
-    Admin action to export selected reports as a Word document.
+    Admin action to export selected reports as a Word document, in a background export job.
     """
-    try:
-        doc = Document()
-        doc.add_heading("Report Information", level=1)
-        for index, report in enumerate(queryset):
-            doc.add_paragraph(f"Report for {report.student.full_name} - {report.get_category_display()}")
-            if index < len(queryset) - 1:
-                doc.add_page_break()
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
-        response["Content-Disposition"] = 'attachment; filename="reports.docx"'
-        doc.save(response)
-        return response
-    except Exception as e:
-        logger.exception("Error exporting reports to Word: %s", e)
-        return HttpResponse("An error occurred while generating the Word document.", status=500)
+    start_admin_export(modeladmin, request, "reports.word", queryset)
 
 class ReportAdmin(admin.ModelAdmin):
     list_display = ('student', 'get_category_display', 'report_type', 'status', 'generated_at')
@@ -0,0 +1,85 @@
+"""
+Report exports run by ``students.export_jobs``.
+"""
+
+import json
+
+from django.conf import settings
+
+from students.export_jobs import exporter
+from students.exports import write_csv
+from students.pdf import Line, render_pdf
+from students.word import RecordDocument
+
+# Number of reports read per query by the exports.
+EXPORT_CHUNK_SIZE = 2000
+
+REPORT_CSV_HEADER = ["Student", "Category", "Report Type", "Status", "Generated At", "Data"]
+
+
+def _report_pdf_lines(report):
+    lines = [
+        Line(f"Report for {report.student.full_name} - {report.get_category_display()}", "Helvetica-Bold", 12, 100, 20),
+        Line(f"Report Type: {report.report_type} | Status: {report.status}", "Helvetica", 10, 100, 15),
+        Line(f"Generated At: {report.generated_at}", "Helvetica", 10, 100, 25),
+    ]
+    # Attempt to print report data (assuming it is a dict)
+    if isinstance(report.data, dict):
+        lines += [Line(f"{key}: {value}", "Helvetica", 10, 120, 15) for key, value in report.data.items()]
+    else:
+        lines.append(Line(f"Data: {report.data}", "Helvetica", 10, 120, 15))
+    # Space between reports.
+    lines[-1] = lines[-1]._replace(advance=lines[-1].advance + 20)
+    return lines
+
+
+def _report_csv_row(report):
+    data = report.data if isinstance(report.data, str) else json.dumps(report.data, ensure_ascii=False)
+    return [
+        report.student.full_name,
+        report.get_category_display(),
+        report.report_type,
+        report.status,
+        report.generated_at,
+        data,
+    ]
+
+
+@exporter("reports.pdf", "pdf", "reports")
+def write_reports_pdf(queryset, file, progress):
+    reports = queryset.select_related("student").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    render_pdf(
+        file,
+        (_report_pdf_lines(report) for report in progress.counted(reports)),
+        title="Reports Information",
+        workers=settings.PDF_EXPORT_WORKERS,
+    )
+
+
+@exporter("reports.csv", "csv", "reports")
+def write_reports_csv(queryset, file, progress):
+    reports = queryset.select_related("student").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    write_csv(file, REPORT_CSV_HEADER, (_report_csv_row(report) for report in progress.counted(reports)))
+
+
+@exporter("reports.word", "docx", "reports")
+def write_reports_word(queryset, file, progress):
+    document = RecordDocument("Report Information")
+    reports = queryset.select_related("student").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for index, report in enumerate(progress.counted(reports)):
+        if index:
+            document.page_break()
+        document.heading(f"Report for {report.student.full_name} - {report.get_category_display()}")
+        fields = [
+            ("Report Type", report.report_type),
+            ("Status", report.get_status_display()),
+            ("Generated At", report.generated_at),
+        ]
+        if isinstance(report.data, dict):
+            fields += report.data.items()
+        else:
+            fields.append(("Data", report.data))
+        document.fields(fields)
+        if index % 500 == 499:
+            document.flush()
+    document.save(file)
@@ -1,13 +1,13 @@
 import json
-import datetime
+from django.contrib.auth.decorators import login_required
 from django.db.models import Count
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
 from django.core.paginator import Paginator
 
 from .models import Report, ReportCategory
 from .report_builder import ReportBuilder
 from students.models import Student
+from students.export_jobs import enqueue_export
 from .evaluation import compute_evaluation_metrics
 
 
@@ -39,67 +39,22 @@ def reports_by_category(request, category):
     return render(request, "reports/reports_by_category.html", {"reports": reports, "category": category_display})
 
 
+@login_required
 def export_reports_pdf_view(request):
     """
-    Exports all reports as a PDF document.
-    """
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter
-
-    reports = Report.objects.all()
-    response = HttpResponse(content_type="application/pdf")
-    filename = f'reports_{datetime.datetime.now().strftime("%Y%m%d")}.pdf'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    pdf = canvas.Canvas(response, pagesize=letter)
-    y = 750
-    for report in reports:
-        if y < 100:
-            pdf.showPage()
-            y = 750
-        pdf.setFont("Helvetica-Bold", 12)
-        pdf.drawString(100, y, f"Report for {report.student.full_name} - {report.get_category_display()}")
-        y -= 20
-        pdf.setFont("Helvetica", 10)
-        pdf.drawString(100, y, f"Report Type: {report.report_type} | Generated At: {report.generated_at}")
-        y -= 25
-        if isinstance(report.data, dict):
-            for key, value in report.data.items():
-                pdf.drawString(120, y, f"{key}: {value}")
-                y -= 15
-                if y < 100:
-                    pdf.showPage()
-                    y = 750
-        else:
-            pdf.drawString(120, y, f"Data: {report.data}")
-            y -= 15
-        y -= 20
-    pdf.save()
-    return response
+    Exports all reports as a PDF document, in a background export job.
+    """
+    job = enqueue_export("reports.pdf", Report.objects.all(), request.user)
+    return redirect("export_job", job_id=job.pk)
 
 
+@login_required
 def export_reports_csv_view(request):
     """
-    Exports all reports as a CSV file.
+    Exports all reports as a CSV file, in a background export job.
     """
-    import csv
-
-    reports = Report.objects.all()
-    response = HttpResponse(content_type="text/csv")
-    filename = f'reports_{datetime.datetime.now().strftime("%Y%m%d")}.csv'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow(["Student", "Category", "Report Type", "Generated At", "Data"])
-    for report in reports:
-        writer.writerow([
-            report.student.full_name,
-            report.get_category_display(),
-            report.report_type,
-            report.generated_at,
-            report.data,
-        ])
-    return response
+    job = enqueue_export("reports.csv", Report.objects.all(), request.user)
+    return redirect("export_job", job_id=job.pk)
 
 
 def generate_single_student_report(request, student_id):
@@ -155,9 +110,11 @@ def import_reports_csv_view(request):
     return render(request, "reports/import_reports.html")
 
 
+@login_required
 def generate_report_dropdown(request):
     """
     Generates a report based on dropdown selection of student and category.
+    Login is required by the student typeahead the page picks students with.
     """
     if request.method == "POST":
         student_id        = request.POST.get("student_id")
@@ -166,8 +123,8 @@ def generate_report_dropdown(request):
         builder = ReportBuilder(student, selected_category)
         new_report = builder.build()
         return redirect('view_report', report_id=new_report.id)
-    students = Student.objects.all()
-    return render(request, "reports/generate_dropdown.html", {"students": students})
+    # Students are picked with the typeahead endpoint rather than listed in the page.
+    return render(request, "reports/generate_dropdown.html")
 
 
 def dashboard_view(request):
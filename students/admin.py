@@ -5,20 +5,14 @@ This file configures export actions (PDF, Excel, Word, CSV) and ModelAdmin setti
 for various student-related models.
 """
 
-import datetime
 import logging
-import csv
-from io import BytesIO
 
-import pandas as pd
 from django.contrib import admin
-from django.http import HttpResponse
 from django.urls import reverse
 from django.utils.html import format_html
-from docx import Document
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 
+from .export_jobs import start_admin_export
+from .search import search_students
 from .models import (
     Student,
     ChronicIllness,
@@ -29,7 +23,10 @@ from .models import (
     HealthInformation,
     GradeHistory,
     StudentPerformanceTrend,
+    ImportCheckpoint,
+    ExportJob,
 )
+from .typeahead import student_typeahead
 from teachers.models import Teacher
 
 logger = logging.getLogger(__name__)
@@ -38,207 +35,61 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # Export Functions
 # =============================================================================
+
+# Each action enqueues a background export job (see students.export_jobs) and
+# links the page where its progress is shown and the file is downloaded.
+
 def export_student_pdf(modeladmin, request, queryset):
     """
     Export selected students as a PDF document.
     """
-    try:
-        response = HttpResponse(content_type='application/pdf')
-        filename = f'students_{datetime.datetime.now().strftime("%Y%m%d")}.pdf'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        pdf = canvas.Canvas(response, pagesize=letter)
-        pdf.setTitle("Student Information")
-        y = 750
-        for student in queryset:
-            # New page if nearing the bottom
-            if y < 100:
-                pdf.showPage()
-                y = 750
-            pdf.drawString(100, y, f"Student Name: {student.full_name}")
-            y -= 20
-        pdf.save()
-        return response
-    except Exception as e:
-        logger.exception("Error exporting students to PDF: %s", e)
-        return HttpResponse("An error occurred while generating the PDF.", status=500)
+    start_admin_export(modeladmin, request, "students.pdf", queryset)
+
+
+def export_students_word(modeladmin, request, queryset):
+    """
+    Export selected students as a Word document, one page per student with
+    their full profile.
+    """
+    start_admin_export(modeladmin, request, "students.word", queryset)
+
+
+def export_students_csv(modeladmin, request, queryset):
+    """
+    Export selected students as a CSV file with selected fields for analysis.
+    The CSV includes academic performance, attendance, and additional indicators.
+    """
+    start_admin_export(modeladmin, request, "students.csv", queryset)
 
 
 def export_students_excel(modeladmin, request, queryset):
     """
     Export selected students as an Excel file.
     """
-    try:
-        data = [
-            {
-                "Full Name": student.full_name,
-                "Email": student.email,
-                "Mobile": student.mobile,
-                "Date of Birth": student.date_of_birth,
-                "Grade Level": student.grade_level or "None",
-                "Academic Performance": student.academic_performance or "None",
-            }
-            for student in queryset
-        ]
-        df = pd.DataFrame(data)
-        with BytesIO() as buffer:
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name="Students")
-            buffer.seek(0)
-            response = HttpResponse(
-                buffer.read(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            response['Content-Disposition'] = 'attachment; filename="students.xlsx"'
-            return response
-    except Exception as e:
-        logger.exception("Error exporting students to Excel: %s", e)
-        return HttpResponse("An error occurred while generating the Excel file.", status=500)
+    start_admin_export(modeladmin, request, "students.excel", queryset)
 
 
-def export_students_word(modeladmin, request, queryset):
+def export_students_excel_analytics(modeladmin, request, queryset):
     """
-    Export selected students as a Word document.
+    Export selected students as an Excel file with the same analysis columns
+    as the CSV export.
     """
-    try:
-        doc = Document()
-        doc.add_heading("Student Information", level=1)
-        for index, student in enumerate(queryset):
-            doc.add_paragraph(f"Student Name: {student.full_name}")
-            # Add a page break if there are more than one student
-            if index < len(queryset) - 1:
-                doc.add_page_break()
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
-        response["Content-Disposition"] = 'attachment; filename="students.docx"'
-        doc.save(response)
-        return response
-    except Exception as e:
-        logger.exception("Error exporting students to Word: %s", e)
-        return HttpResponse("An error occurred while generating the Word document.", status=500)
+    start_admin_export(modeladmin, request, "students.excel_analytics", queryset)
 
 
-def export_students_csv(modeladmin, request, queryset):
+def export_students_parquet(modeladmin, request, queryset):
     """
-    Export selected students as a CSV file with selected fields for analysis.
-    The CSV includes academic performance, attendance, and additional indicators.
+    Export the full records of the selected students, typed and columnar, in a
+    file import_full_students can read back.
+    """
+    start_admin_export(modeladmin, request, "students.parquet", queryset)
+
+
+def export_students_arrow(modeladmin, request, queryset):
+    """
+    Export the full records of the selected students as an Arrow IPC file.
     """
-    try:
-        response = HttpResponse(content_type='text/csv')
-        filename = f'students_{datetime.datetime.now().strftime("%Y%m%d")}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        
-        writer.writerow([
-            "Full Name",
-            "Academic Performance",
-            "Attendance Percentage",
-            "Seat Zone",
-            "Grades",
-            "Academic Stress",           # from HealthInformation
-            "Motivation",                # from HealthInformation
-            "Depression",                # from HealthInformation
-            "Sleep Disorder",            # from HealthInformation
-            "Study Life Balance",        # from HealthInformation
-            "Family Pressures",          # from HealthInformation
-            "Parents Marital Status",    # from EconomicSituation
-            "Family Income Level",       # from EconomicSituation
-            "Housing Status",            # from EconomicSituation
-            "Has Private Study Room",    # from EconomicSituation
-            "Daily Food Availability",   # from EconomicSituation
-            "Has School Uniform",        # from EconomicSituation
-            "Has Stationery",            # from EconomicSituation
-            "Receives Private Tutoring", # from EconomicSituation
-            "Daily Study Hours",         # from EconomicSituation
-            "Works After School",        # from EconomicSituation
-            "Has Electronic Device",     # from SocialMediaAndTechnology
-            "Device Usage Purpose",      # from SocialMediaAndTechnology
-            "Has Social Media Accounts", # from SocialMediaAndTechnology
-            "Daily Screen Time",         # from SocialMediaAndTechnology
-            "Social Media Impact On Studies",  # from SocialMediaAndTechnology
-            "Content Type Watched",      # from SocialMediaAndTechnology
-            "Plays Video Games",         # from SocialMediaAndTechnology
-            "Daily Gaming Hours"         # from SocialMediaAndTechnology
-        ])
-        
-        for student in queryset:
-            # Attempt to get GPA (if available)
-            try:
-                gpa = student.studentperformancetrend.gpa if hasattr(student, 'studentperformancetrend') else "N/A"
-            except Exception:
-                gpa = "N/A"
-            
-            # Combine grades into a single string
-            try:
-                grades = "; ".join([f"{grade.subject.name}:{grade.score}" for grade in student.grades.all()])
-            except Exception:
-                grades = "N/A"
-            
-            health_info = getattr(student, 'health_information', None)
-            academic_stress = health_info.academic_stress if health_info else "N/A"
-            motivation = health_info.motivation if health_info else "N/A"
-            depression = health_info.depression if health_info else "N/A"
-            sleep_disorder = health_info.sleep_disorder if health_info else "N/A"
-            study_life_balance = health_info.study_life_balance if health_info else "N/A"
-            family_pressures = health_info.family_pressures if health_info else "N/A"
-            
-            econ_info = getattr(student, 'economic_situation', None)
-            parents_marital_status = econ_info.parents_marital_status if econ_info else "N/A"
-            family_income_level = econ_info.family_income_level if econ_info else "N/A"
-            housing_status = econ_info.housing_status if econ_info else "N/A"
-            has_private_study_room = econ_info.has_private_study_room if econ_info else "N/A"
-            daily_food_availability = econ_info.daily_food_availability if econ_info else "N/A"
-            has_school_uniform = econ_info.has_school_uniform if econ_info else "N/A"
-            has_stationery = econ_info.has_stationery if econ_info else "N/A"
-            receives_private_tutoring = econ_info.receives_private_tutoring if econ_info else "N/A"
-            daily_study_hours = econ_info.daily_study_hours if econ_info else "N/A"
-            works_after_school = econ_info.works_after_school if econ_info else "N/A"
-            
-            tech_info = getattr(student, 'tech_and_social', None)
-            has_electronic_device = tech_info.has_electronic_device if tech_info else "N/A"
-            device_usage_purpose = tech_info.device_usage_purpose if tech_info else "N/A"
-            has_social_media_accounts = tech_info.has_social_media_accounts if tech_info else "N/A"
-            daily_screen_time = tech_info.daily_screen_time if tech_info else "N/A"
-            social_media_impact_on_studies = tech_info.social_media_impact_on_studies if tech_info else "N/A"
-            content_type_watched = tech_info.content_type_watched if tech_info else "N/A"
-            plays_video_games = tech_info.plays_video_games if tech_info else "N/A"
-            daily_gaming_hours = tech_info.daily_gaming_hours if tech_info else "N/A"
-            
-            writer.writerow([
-                student.full_name,
-                student.academic_performance,
-                student.attendance_percentage,
-                student.seat_zone,
-                grades,
-                academic_stress,
-                motivation,
-                depression,
-                sleep_disorder,
-                study_life_balance,
-                family_pressures,
-                parents_marital_status,
-                family_income_level,
-                housing_status,
-                has_private_study_room,
-                daily_food_availability,
-                has_school_uniform,
-                has_stationery,
-                receives_private_tutoring,
-                daily_study_hours,
-                works_after_school,
-                has_electronic_device,
-                device_usage_purpose,
-                has_social_media_accounts,
-                daily_screen_time,
-                social_media_impact_on_studies,
-                content_type_watched,
-                plays_video_games,
-                daily_gaming_hours,
-            ])
-        return response
-    except Exception as e:
-        logger.exception("Error exporting students to CSV: %s", e)
-        return HttpResponse("An error occurred while generating the CSV file.", status=500)
+    start_admin_export(modeladmin, request, "students.arrow", queryset)
 
 
 # =============================================================================
@@ -345,6 +196,7 @@ class SocialMediaAndTechnologyInline(admin.StackedInline):
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = (
+        'profile_thumbnail',
         'full_name',
         'student_id',
         'grade_level',
@@ -356,13 +208,11 @@ class StudentAdmin(admin.ModelAdmin):
     )
     list_display_links = ('full_name',)
     list_filter = ('grade_level', 'academic_performance', 'gender', 'nationality',)
+    # The students' search documents: name, email, mobile and the subjects,
+    # teachers and update reasons of their grades (see get_search_results).
     search_fields = (
-        'full_name',
-        'email',
-        'mobile',
-        'grades__subject__name',
-        'grades__teacher__full_name',
-        'grades__history__reason_for_update',
+        'search_document__text',
+        'search_document__grade_text',
     )
     fieldsets = (
         ('Personal Information', {
@@ -376,6 +226,7 @@ class StudentAdmin(admin.ModelAdmin):
                 'nationality',
                 'address',
                 'profile_image',
+                'profile_preview',
                 'email',
                 'mobile',
                 'emergency_contact_name',
@@ -403,7 +254,7 @@ class StudentAdmin(admin.ModelAdmin):
             )
         }),
     )
-    readonly_fields = ('get_age', 'student_id', 'academic_performance')
+    readonly_fields = ('get_age', 'student_id', 'academic_performance', 'profile_preview')
     filter_horizontal = ('subjects',)
     ordering = ('student_id',)
     inlines = [
@@ -413,12 +264,52 @@ class StudentAdmin(admin.ModelAdmin):
         SocialMediaAndTechnologyInline,
     ]
     list_select_related = ('user',)
-    actions = [export_students_csv, export_student_pdf, export_students_excel, export_students_word]
+    actions = [
+        export_students_csv, export_student_pdf, export_students_excel, export_students_excel_analytics,
+        export_students_word, export_students_parquet, export_students_arrow,
+    ]
+
+    # Students offered by an autocomplete widget (e.g. on grades) for one search, at most.
+    autocomplete_limit = 100
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match the words of the term as prefixes through the search index, or,
+        when no student matches that way (e.g. "mith" for "Smith", or a term
+        of punctuation only), as substrings of the search documents in
+        ``search_fields``, which scans them.
+        """
+        if not search_term.strip():
+            return queryset, False
+        # Autocomplete widgets search on every keystroke: look the term up in the
+        # typeahead index rather than running icontains over every search field.
+        if request.resolver_match and request.resolver_match.url_name == "autocomplete":
+            matches = student_typeahead.lookup(search_term, limit=self.autocomplete_limit)
+            if matches:
+                return queryset.filter(pk__in=[match["id"] for match in matches]), False
+        results = search_students(queryset, search_term)
+        if results.exists():
+            return results, False
+        return super().get_search_results(request, queryset, search_term)
 
     @admin.display(description="Age")
     def get_age(self, obj):
         return obj.age or "-"
 
+    @admin.display(description="Photo")
+    def profile_thumbnail(self, obj):
+        url = obj.get_profile_image_url("avatar")
+        if not url:
+            return "-"
+        return format_html('<img src="{}" width="40" height="40" style="border-radius:50%; object-fit:cover;" />', url)
+
+    @admin.display(description="Preview")
+    def profile_preview(self, obj):
+        url = obj.get_profile_image_url("profile")
+        if not url:
+            return "-"
+        return format_html('<img src="{}" style="max-width:300px; max-height:300px;" />', url)
+
     def generate_report_link(self, obj):
         """
         Returns a link to generate a report for the student using the new reports app.
@@ -496,5 +387,39 @@ class GradeHistoryAdmin(admin.ModelAdmin):
 
 @admin.register(StudentPerformanceTrend)
 class StudentPerformanceTrendAdmin(admin.ModelAdmin):
-    list_display = ('student', 'semester', 'average_percentage', 'gpa')
+    list_display = ('student', 'semester', 'average_percentage', 'gpa', 'grade_count')
     search_fields = ('student__full_name',)
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'rows_imported', 'rows_unchanged', 'rows_rejected', 'started_at', 'completed_at')
+    readonly_fields = ('file_hash', 'done_ranges', 'started_at', 'updated_at')
+    search_fields = ('file_name', 'file_hash')
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'exporter', 'status', 'progress', 'requested_by', 'created_at', 'finished_at', 'download')
+    list_filter = ('status', 'exporter')
+    readonly_fields = (
+        'exporter', 'fingerprint', 'status', 'processed', 'total', 'file', 'file_name',
+        'reusable', 'error', 'requested_by', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+    exclude = ('selection',)
+
+    def progress(self, obj):
+        if obj.percent is None:
+            return obj.processed
+        return f"{obj.processed} / {obj.total} ({obj.percent}%)"
+
+    def download(self, obj):
+        if obj.status != ExportJob.Status.DONE:
+            return "-"
+        return format_html('<a href="{}">Download</a>', reverse("download_export", args=[obj.pk]))
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,193 @@
+"""
+Parquet and Arrow IPC files of full student records.
+
+The columns are the ones ``import_full_students`` reads: the student's fields
+plus the HealthInformation, EconomicSituation and SocialMediaAndTechnology
+fields, with ``subjects`` as a list of names and ``grades`` as a list of
+``{subject, score}`` structs. Columns are typed from the model fields, so
+reading a file back needs no per-cell string parsing, and files are written as
+a stream of record batches, one chunk of students at a time.
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import models
+
+from .models import (
+    Student,
+    Grade,
+    HealthInformation,
+    EconomicSituation,
+    SocialMediaAndTechnology,
+)
+from .utils import chunked
+
+COLUMNAR_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+}
+
+# Student fields that are generated or internal rather than part of the record.
+EXCLUDED_STUDENT_FIELDS = {"id", "user", "student_id", "profile_image_hash", "import_hash"}
+
+# Related name of each profile model on Student.
+PROFILE_RELATIONS = {
+    HealthInformation: "health_information",
+    EconomicSituation: "economic_situation",
+    SocialMediaAndTechnology: "tech_and_social",
+}
+
+GRADE_TYPE = pa.struct([
+    ("subject", pa.string()),
+    ("score", pa.decimal128(5, 2)),
+])
+
+
+def columnar_format(path):
+    """Return ``"parquet"`` or ``"arrow"`` for a columnar file path, else ``None``."""
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def arrow_type(field):
+    """The Arrow type used for a model field's column."""
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.IntegerField):
+        return pa.int64()
+    return pa.string()
+
+
+def _record_fields():
+    """``(column, lookup, field)`` for every scalar column of the record."""
+    columns = [("user", "user__username", None)]
+    columns += [
+        (field.name, field.name, field)
+        for field in Student._meta.concrete_fields
+        if field.name not in EXCLUDED_STUDENT_FIELDS
+    ]
+    for model, relation in PROFILE_RELATIONS.items():
+        columns += [
+            (field.name, f"{relation}__{field.name}", field)
+            for field in model._meta.concrete_fields
+            if not field.primary_key and not field.is_relation
+        ]
+    return columns
+
+
+RECORD_FIELDS = _record_fields()
+
+STUDENT_RECORD_SCHEMA = pa.schema(
+    [(column, arrow_type(field) if field else pa.string()) for column, _, field in RECORD_FIELDS]
+    + [("subjects", pa.list_(pa.string())), ("grades", pa.list_(GRADE_TYPE))]
+)
+
+
+# =============================================================================
+# Writing
+# =============================================================================
+
+def _record_batch(students):
+    """Build one record batch from a chunk of ``values()`` rows, with two more queries."""
+    student_ids = [student["pk"] for student in students]
+    subjects, grades = {}, {}
+    links = Student.subjects.through.objects.filter(student_id__in=student_ids)
+    for student_id, name in links.values_list("student_id", "subject__name").order_by("pk"):
+        subjects.setdefault(student_id, []).append(name)
+    student_grades = Grade.objects.filter(student_id__in=student_ids).order_by("pk")
+    for student_id, name, score in student_grades.values_list("student_id", "subject__name", "score"):
+        grades.setdefault(student_id, []).append({"subject": name, "score": score})
+
+    columns = {
+        column: [student[lookup] for student in students]
+        for column, lookup, _ in RECORD_FIELDS
+    }
+    columns["subjects"] = [subjects.get(pk, []) for pk in student_ids]
+    columns["grades"] = [grades.get(pk, []) for pk in student_ids]
+    return pa.RecordBatch.from_pydict(columns, schema=STUDENT_RECORD_SCHEMA)
+
+
+def student_record_batches(queryset=None, batch_size=5000):
+    """Yield the students of ``queryset`` as record batches of ``batch_size`` rows."""
+    if queryset is None:
+        queryset = Student.objects.all()
+    if not queryset.query.is_sliced:
+        queryset = queryset.order_by("pk")
+    rows = queryset.values("pk", *(lookup for _, lookup, _ in RECORD_FIELDS))
+    for chunk in chunked(rows.iterator(chunk_size=batch_size), batch_size):
+        yield _record_batch(chunk)
+
+
+def write_student_records(sink, file_format, queryset=None, batch_size=5000, progress=None):
+    """
+    Write the students of ``queryset`` to ``sink`` (a path or binary file
+    object) as Parquet or Arrow IPC. Returns the number of students written.
+    ``progress``, if given, is called with the number of rows of each batch.
+    """
+    written = 0
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, STUDENT_RECORD_SCHEMA, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, STUDENT_RECORD_SCHEMA)
+    with writer:
+        for batch in student_record_batches(queryset, batch_size):
+            writer.write_batch(batch)
+            written += batch.num_rows
+            if progress is not None:
+                progress(batch.num_rows)
+    return written
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+
+def read_schema(path):
+    """The schema of the Parquet or Arrow file at ``path``."""
+    if columnar_format(path) == "parquet":
+        return pq.read_schema(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def count_rows(path):
+    """Number of rows in the Parquet or Arrow file at ``path``, from its metadata."""
+    if columnar_format(path) == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(index).num_rows for index in range(reader.num_record_batches))
+
+
+def iter_columnar_rows(path, batch_size=5000):
+    """
+    Yield ``(row_number, row)`` pairs from the Parquet or Arrow file at ``path``,
+    reading one record batch at a time. Rows are dicts of typed values and row
+    numbers count from 1.
+    """
+    row_number = 0
+    if columnar_format(path) == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        for batch in batches:
+            for row in batch.to_pylist():
+                row_number += 1
+                yield row_number, row
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            for row in reader.get_batch(index).to_pylist():
+                row_number += 1
+                yield row_number, row
@@ -0,0 +1,302 @@
+"""
+Background export jobs.
+
+The admin export actions and the export views used to build the whole file
+inside the request, so a large selection ran into gunicorn's request timeout
+and every repeat built the same file again. Now they call ``enqueue_export()``,
+which records an ``ExportJob`` holding the exporter's name and the selection
+(see ``queryset_selection()``), and returns straight away. Once the transaction
+commits, the job is run according to ``EXPORT_JOB_RUNNER``:
+
+* ``"thread"`` (default): in a background thread of the web process;
+* ``"sync"``: in the request itself;
+* ``"worker"``: by ``manage.py run_export_jobs --watch`` in a separate process.
+
+A run writes the export to a temporary file, saves it to media storage and
+records the rows written, and a heartbeat, on the job as it goes; the
+``export_job`` page shows the progress and links the file once it is ready.
+Running jobs without a heartbeat for ``EXPORT_JOB_STALE_AFTER`` seconds were
+interrupted (e.g. their web process died): the thread runner requeues them
+when it starts, and so does ``manage.py run_export_jobs``. A finished job stays
+reusable until one of the exported models changes (see ``expire_exports()``),
+and exporting the same selection again meanwhile reuses its file.
+
+Exporters are functions ``write(queryset, file, progress)`` registered with
+``@exporter("<app label>.<name>", ...)`` in the app's ``exports`` module.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+
+from .models import ExportJob
+from .on_commit import OnCommitBatch
+
+logger = logging.getLogger(__name__)
+
+Exporter = namedtuple("Exporter", ["name", "write", "extension", "base_name"])
+
+EXPORTERS = {}
+
+_executor = None
+
+
+def exporter(name, extension, base_name):
+    """
+    Register ``write(queryset, file, progress)`` as the exporter ``name``, whose
+    files are downloaded as ``<base_name>_<date>.<extension>``.
+    """
+    def register(write):
+        EXPORTERS[name] = Exporter(name, write, extension, base_name)
+        return write
+    return register
+
+
+def get_exporter(name):
+    """The exporter ``name``, importing the ``exports`` module of its app first."""
+    if name not in EXPORTERS:
+        import_module(f"{name.split('.')[0]}.exports")
+    return EXPORTERS[name]
+
+
+class JobProgress:
+    """Rows written by an exporter, saved on the job at most every ``interval`` seconds."""
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self.processed = 0
+        self._saved = time.monotonic()
+
+    def advance(self, count=1):
+        self.processed += count
+        now = time.monotonic()
+        if now - self._saved >= self.interval:
+            ExportJob.objects.filter(pk=self.job.pk).update(processed=self.processed, heartbeat_at=timezone.now())
+            self._saved = now
+
+    def counted(self, rows):
+        """Yield ``rows``, counting each one."""
+        for row in rows:
+            yield row
+            self.advance()
+
+
+# =============================================================================
+# Selections
+# =============================================================================
+
+def _pk_ranges(pks):
+    """Integer primary keys as sorted ``[first, last]`` runs of consecutive values."""
+    ranges = []
+    for pk in sorted(pks):
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def queryset_selection(queryset):
+    """
+    The rows of ``queryset`` as plain JSON data: the model, its primary keys
+    as runs (a whole table is a handful of ranges), the ordering and the
+    ``values_list()`` fields. Equal selections give equal data.
+    """
+    query = queryset.query
+    return {
+        "model": queryset.model._meta.label_lower,
+        "pks": _pk_ranges(queryset.order_by().values_list("pk", flat=True)),
+        "order_by": [field for field in query.order_by if isinstance(field, str)],
+        "fields": list(query.values_select),
+    }
+
+
+def selection_queryset(selection):
+    """The queryset of a ``queryset_selection()``, over the rows as they are now."""
+    model = apps.get_model(selection["model"])
+    single = [first for first, last in selection["pks"] if first == last]
+    rows = Q(pk__in=single) | Q(
+        *[Q(pk__range=(first, last)) for first, last in selection["pks"] if first != last], _connector=Q.OR
+    )
+    queryset = model._default_manager.filter(rows)
+    if selection["order_by"]:
+        queryset = queryset.order_by(*selection["order_by"])
+    if selection["fields"]:
+        queryset = queryset.values_list(*selection["fields"])
+    return queryset
+
+
+# =============================================================================
+# Enqueueing
+# =============================================================================
+
+def enqueue_export(name, queryset, user=None):
+    """
+    Return the job producing the ``name`` export of ``queryset`` for ``user``:
+    the job already pending or running for the same user and selection, a
+    finished job sharing the file of a reusable one, or a new job handed to
+    the runner once the transaction commits.
+    """
+    export = get_exporter(name)
+    selection = queryset_selection(queryset)
+    canonical = json.dumps(selection, sort_keys=True, separators=(",", ":"))
+    fingerprint = hashlib.sha256(f"{name}\0{canonical}".encode()).hexdigest()
+    if user is not None and not user.is_authenticated:
+        user = None
+
+    jobs = ExportJob.objects.filter(fingerprint=fingerprint)
+    active = jobs.filter(
+        requested_by=user, status__in=[ExportJob.Status.PENDING, ExportJob.Status.RUNNING]
+    ).first()
+    if active is not None:
+        return active
+
+    job = ExportJob(
+        exporter=name,
+        selection=selection,
+        fingerprint=fingerprint,
+        file_name=f"{export.base_name}_{timezone.localdate():%Y%m%d}.{export.extension}",
+        requested_by=user,
+    )
+    stored = jobs.filter(status=ExportJob.Status.DONE, reusable=True).first()
+    if stored is not None and stored.file.storage.exists(stored.file.name):
+        job.status = ExportJob.Status.DONE
+        job.file = stored.file.name
+        job.processed, job.total = stored.processed, stored.total
+        job.reusable = True
+        job.started_at = job.finished_at = timezone.now()
+        job.save()
+        return job
+    job.save()
+    schedule_export(job.pk)
+    return job
+
+
+def start_admin_export(modeladmin, request, name, queryset):
+    """Enqueue an export for an admin action and link its page in a message."""
+    job = enqueue_export(name, queryset, request.user)
+    state = "is ready" if job.status == ExportJob.Status.DONE else "has started"
+    modeladmin.message_user(request, format_html(
+        'The export {} {}: <a href="{}">follow its progress and download it here</a>.',
+        job.file_name, state, reverse("export_job", args=[job.pk]),
+    ))
+
+
+# =============================================================================
+# Running
+# =============================================================================
+
+def _run_in_worker(job_id):
+    try:
+        run_export(job_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_export(job_id):
+    """Run the job after the current transaction commits, as ``EXPORT_JOB_RUNNER`` says."""
+    global _executor
+    runner = getattr(settings, "EXPORT_JOB_RUNNER", "thread")
+    if runner == "worker":
+        return
+    if runner == "sync":
+        transaction.on_commit(lambda: run_export(job_id))
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "EXPORT_JOB_THREADS", 1),
+            thread_name_prefix="export-jobs",
+        )
+        # Jobs whose runner died with its process would otherwise stay running.
+        for stale_id in requeue_stale_jobs():
+            _executor.submit(_run_in_worker, stale_id)
+    transaction.on_commit(lambda: _executor.submit(_run_in_worker, job_id))
+
+
+def requeue_stale_jobs(stale_after=None):
+    """
+    Mark pending again the running jobs without a heartbeat for ``stale_after``
+    seconds (``EXPORT_JOB_STALE_AFTER`` by default). Returns their ids.
+    """
+    if stale_after is None:
+        stale_after = getattr(settings, "EXPORT_JOB_STALE_AFTER", 300)
+    stale = ExportJob.objects.filter(
+        status=ExportJob.Status.RUNNING, heartbeat_at__lt=timezone.now() - timedelta(seconds=stale_after)
+    )
+    job_ids = list(stale.values_list("pk", flat=True))
+    stale.filter(pk__in=job_ids).update(status=ExportJob.Status.PENDING, processed=0)
+    return job_ids
+
+
+def run_export(job_id):
+    """
+    Produce the file of a pending job and store it. Returns ``False`` if the
+    job was not pending (another runner claimed it first).
+    """
+    now = timezone.now()
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.PENDING).update(
+        status=ExportJob.Status.RUNNING, started_at=now, heartbeat_at=now, reusable=True
+    )
+    if not claimed:
+        return False
+    job = ExportJob.objects.get(pk=job_id)
+    progress = JobProgress(job)
+    try:
+        export = get_exporter(job.exporter)
+        queryset = selection_queryset(job.selection)
+        job.total = queryset.count()
+        job.save(update_fields=["total"])
+
+        with tempfile.TemporaryFile() as file:
+            export.write(queryset, file, progress)
+            file.seek(0)
+            job.file.save(f"{job.exporter.replace('.', '_')}_{job.pk}.{export.extension}", File(file), save=False)
+        # ``reusable`` is left as it is: expire_exports() clears it if the data
+        # changed while the job was running.
+        job.status = ExportJob.Status.DONE
+        job.processed = progress.processed
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "processed", "file", "finished_at"])
+    except Exception as e:
+        logger.exception("Error running export job %s (%s): %s", job_id, job.exporter, e)
+        ExportJob.objects.filter(pk=job_id).update(
+            status=ExportJob.Status.FAILED,
+            processed=progress.processed,
+            reusable=False,
+            error=str(e) or repr(e),
+            finished_at=timezone.now(),
+        )
+    return True
+
+
+def expire_exports():
+    """
+    Mark every stored export, and every running one, as stale once the
+    current transaction commits, so the next export of the same selection is
+    produced again. The callback is queued at most once per transaction,
+    however many rows change in it.
+    """
+    _expiry.add()
+
+
+def _expire(items):
+    ExportJob.objects.filter(reusable=True).update(reusable=False)
+
+
+_expiry = OnCommitBatch(_expire)
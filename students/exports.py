@@ -0,0 +1,240 @@
+"""
+Student exports run by ``students.export_jobs``.
+
+Each exporter writes the students of a queryset to a binary file, reading
+them in chunks of ``EXPORT_CHUNK_SIZE`` and counting them on ``progress``.
+"""
+
+import csv
+import io
+
+from django.conf import settings
+from openpyxl import Workbook
+
+from .columnar import write_student_records
+from .export_jobs import exporter
+from .models import Grade, Student
+from .pdf import Line, render_pdf
+from .utils import chunked
+from .word import student_document
+
+# Number of students read per query by the exports.
+EXPORT_CHUNK_SIZE = 2000
+
+STUDENT_CSV_HEADER = [
+    "Full Name",
+    "Academic Performance",
+    "Attendance Percentage",
+    "Seat Zone",
+    "Grades",
+    "Academic Stress",           # from HealthInformation
+    "Motivation",                # from HealthInformation
+    "Depression",                # from HealthInformation
+    "Sleep Disorder",            # from HealthInformation
+    "Study Life Balance",        # from HealthInformation
+    "Family Pressures",          # from HealthInformation
+    "Parents Marital Status",    # from EconomicSituation
+    "Family Income Level",       # from EconomicSituation
+    "Housing Status",            # from EconomicSituation
+    "Has Private Study Room",    # from EconomicSituation
+    "Daily Food Availability",   # from EconomicSituation
+    "Has School Uniform",        # from EconomicSituation
+    "Has Stationery",            # from EconomicSituation
+    "Receives Private Tutoring", # from EconomicSituation
+    "Daily Study Hours",         # from EconomicSituation
+    "Works After School",        # from EconomicSituation
+    "Has Electronic Device",     # from SocialMediaAndTechnology
+    "Device Usage Purpose",      # from SocialMediaAndTechnology
+    "Has Social Media Accounts", # from SocialMediaAndTechnology
+    "Daily Screen Time",         # from SocialMediaAndTechnology
+    "Social Media Impact On Studies",  # from SocialMediaAndTechnology
+    "Content Type Watched",      # from SocialMediaAndTechnology
+    "Plays Video Games",         # from SocialMediaAndTechnology
+    "Daily Gaming Hours"         # from SocialMediaAndTechnology
+]
+
+# Columns taken from each one-to-one profile, "N/A" when the student has none.
+STUDENT_CSV_PROFILE_FIELDS = {
+    "health_information": [
+        "academic_stress", "motivation", "depression", "sleep_disorder",
+        "study_life_balance", "family_pressures",
+    ],
+    "economic_situation": [
+        "parents_marital_status", "family_income_level", "housing_status",
+        "has_private_study_room", "daily_food_availability", "has_school_uniform",
+        "has_stationery", "receives_private_tutoring", "daily_study_hours",
+        "works_after_school",
+    ],
+    "tech_and_social": [
+        "has_electronic_device", "device_usage_purpose", "has_social_media_accounts",
+        "daily_screen_time", "social_media_impact_on_studies", "content_type_watched",
+        "plays_video_games", "daily_gaming_hours",
+    ],
+}
+
+STUDENT_EXCEL_HEADER = [
+    "Full Name", "Email", "Mobile", "Date of Birth", "Grade Level", "Academic Performance",
+]
+
+# Student columns the roster CSV can include, by field name, with their headers
+# (the field's explicit verbose name, else its title-cased name).
+STUDENT_ROSTER_COLUMNS = {
+    field.name: field.verbose_name if field.verbose_name != field.name.replace("_", " ") else field.verbose_name.title()
+    for field in Student._meta.concrete_fields
+    if not field.is_relation and field.name not in {"id", "profile_image", "profile_image_hash", "import_hash"}
+}
+
+STUDENT_ROSTER_DEFAULT_COLUMNS = [
+    "full_name", "student_id", "email", "mobile",
+    "grade_level", "academic_performance", "enrollment_date",
+]
+
+
+class Echo:
+    """A file-like object whose ``write`` returns the value, for streaming a csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    """Yield ``header`` and ``rows`` as lines of CSV text."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def student_roster(queryset, columns=None):
+    """
+    The ``(header, rows)`` of the roster CSV of ``queryset`` with ``columns``
+    (``STUDENT_ROSTER_DEFAULT_COLUMNS`` by default). Rows are plain tuples read
+    in chunks in primary key order, which needs no sort of the whole table.
+    """
+    columns = list(columns or STUDENT_ROSTER_DEFAULT_COLUMNS)
+    header = [STUDENT_ROSTER_COLUMNS[column] for column in columns]
+    rows = queryset.order_by("pk").values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return header, rows
+
+
+def write_csv(file, header, rows):
+    """Write ``header`` and ``rows`` to the binary ``file`` as UTF-8 CSV."""
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(header)
+    writer.writerows(rows)
+    text.flush()
+    # Leave ``file`` open for the caller.
+    text.detach()
+
+
+def write_excel(file, header, rows, title="Students"):
+    """
+    Write ``header`` and ``rows`` to ``file`` with a write-only openpyxl
+    workbook, which keeps one row at a time in memory.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file)
+
+
+def _student_csv_row(student, grades):
+    """One ``STUDENT_CSV_HEADER`` row of a student fetched by ``student_analysis_rows``."""
+    grades = "; ".join(f"{name}:{score}" for name, score in grades)
+    row = [
+        student.full_name,
+        student.academic_performance,
+        student.attendance_percentage,
+        student.seat_zone,
+        grades,
+    ]
+    for relation, fields in STUDENT_CSV_PROFILE_FIELDS.items():
+        # A missing one-to-one raises DoesNotExist on access.
+        profile = getattr(student, relation, None)
+        row.extend(getattr(profile, field) if profile else "N/A" for field in fields)
+    return row
+
+
+def student_analysis_rows(queryset):
+    """
+    Yield the ``STUDENT_CSV_HEADER`` row of every student of ``queryset``.
+
+    Students are read in chunks with their profiles joined, and the grades of
+    each chunk are fetched with one more query (as plain values, not model
+    instances), so this runs a few queries per chunk rather than several per
+    student.
+    """
+    students = queryset.select_related(*STUDENT_CSV_PROFILE_FIELDS)
+    for chunk in chunked(students.iterator(chunk_size=EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE):
+        grades = {}
+        chunk_grades = Grade.objects.filter(student__in=chunk)
+        for student_id, name, score in chunk_grades.values_list("student_id", "subject__name", "score"):
+            grades.setdefault(student_id, []).append((name, score))
+        for student in chunk:
+            yield _student_csv_row(student, grades.get(student.pk, []))
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+@exporter("students.pdf", "pdf", "students")
+def write_students_pdf(queryset, file, progress):
+    names = queryset.values_list("full_name", flat=True).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    render_pdf(
+        file,
+        ([Line(f"Student Name: {name}", "Helvetica", 12, 100, 20)] for name in progress.counted(names)),
+        title="Student Information",
+        workers=settings.PDF_EXPORT_WORKERS,
+    )
+
+
+@exporter("students.word", "docx", "students")
+def write_students_word(queryset, file, progress):
+    student_document(queryset, progress=progress.advance).save(file)
+
+
+@exporter("students.csv", "csv", "students")
+def write_students_csv(queryset, file, progress):
+    write_csv(file, STUDENT_CSV_HEADER, progress.counted(student_analysis_rows(queryset)))
+
+
+@exporter("students.roster_csv", "csv", "students")
+def write_student_roster_csv(queryset, file, progress):
+    # The columns are the fields the selection was narrowed to with values_list().
+    header, rows = student_roster(queryset, queryset.query.values_select)
+    write_csv(file, header, progress.counted(rows))
+
+
+@exporter("students.excel", "xlsx", "students")
+def write_students_excel(queryset, file, progress):
+    rows = (
+        [
+            student.full_name,
+            student.email,
+            student.mobile,
+            student.date_of_birth,
+            student.grade_level or "None",
+            student.academic_performance or "None",
+        ]
+        for student in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    write_excel(file, STUDENT_EXCEL_HEADER, progress.counted(rows))
+
+
+@exporter("students.excel_analytics", "xlsx", "students")
+def write_students_excel_analytics(queryset, file, progress):
+    write_excel(file, STUDENT_CSV_HEADER, progress.counted(student_analysis_rows(queryset)))
+
+
+@exporter("students.parquet", "parquet", "students")
+def write_students_parquet(queryset, file, progress):
+    write_student_records(file, "parquet", queryset, progress=progress.advance)
+
+
+@exporter("students.arrow", "arrow", "students")
+def write_students_arrow(queryset, file, progress):
+    write_student_records(file, "arrow", queryset, progress=progress.advance)
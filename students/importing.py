@@ -0,0 +1,459 @@
+"""
+Bulk import of full student records (user, student, subjects, grades and the
+health, economic and technology profiles) from CSV-style rows.
+
+Rows are parsed into plain dicts by ``students.parsing`` (pure Python, no
+database access, optionally in worker processes) and written a chunk at a time
+by ``StudentImporter``: users and subjects are resolved with one ``IN`` query
+per chunk, new students and profiles are written with ``bulk_create`` and
+existing ones with ``students.bulk.update_rows`` (an ``UPDATE ... FROM
+(VALUES ...)`` per batch) inside the chunk's transaction, grades go through
+``Grade.objects.bulk_ingest`` and academic performance is recomputed once per
+chunk with the bulk engine.
+
+Every chunk reports how long it spent in each stage (parse, validate, write,
+recompute) and how many queries it ran; ``ImportProgress`` aggregates them into
+rates, an ETA and a final summary.
+"""
+
+import multiprocessing
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from queue import Empty
+
+from django.db import connection, connections, transaction
+
+from accounts.models import User
+from .bulk import update_rows
+from .export_jobs import expire_exports
+from .models import (
+    Student,
+    Subject,
+    Grade,
+    HealthInformation,
+    EconomicSituation,
+    SocialMediaAndTechnology,
+)
+from .parsing import parse_chunk, parse_shard, plan_shards, skip_done
+from .performance import recompute_academic_performance
+from .search import schedule_search_refresh
+from .utils import chunked
+
+
+# =============================================================================
+# Bulk writer
+# =============================================================================
+
+# Outcome of one written chunk. Every row from ``first_row`` to ``last_row`` has
+# been processed, except those skipped as already done and blank lines.
+ChunkResult = namedtuple(
+    "ChunkResult", "first_row last_row seen imported unchanged rejects timings queries"
+)
+
+# Stages timed for every chunk: parsing and validating rows (``parse_row``),
+# de-duplicating them and detecting unchanged rows, writing them, and
+# recomputing academic performance.
+STAGES = ("parse", "validate", "write", "recompute")
+
+PROFILE_MODELS = {
+    "health": HealthInformation,
+    "economic": EconomicSituation,
+    "tech": SocialMediaAndTechnology,
+}
+
+
+class StudentImporter:
+    """
+    Writes parsed records to the database a chunk at a time.
+
+    ``write_chunk()`` tries the whole chunk in one transaction; if that fails
+    (e.g. a duplicate email), it retries the chunk row by row so that only the
+    offending rows are rejected. Rows whose content hash matches the one stored
+    on their student at the last import are skipped. A changed row replaces its
+    student's grades in the subjects it has grades for; other grades are kept.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self._timings = Counter()
+
+    @contextmanager
+    def _timed(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings[stage] += time.perf_counter() - started
+
+    def write_chunk(self, records):
+        """
+        Write a list of ``(row_number, record)`` pairs. Returns ``(imported,
+        unchanged, errors)`` where ``errors`` is a list of ``(row_number, message)``.
+        """
+        try:
+            with transaction.atomic():
+                unchanged = self._write([record for _, record in records])
+            return len(records) - unchanged, unchanged, []
+        except Exception:
+            if len(records) == 1:
+                raise
+        imported, unchanged, errors = 0, 0, []
+        for row_number, record in records:
+            try:
+                with transaction.atomic():
+                    skipped = self._write([record])
+                imported += 1 - skipped
+                unchanged += skipped
+            except Exception as e:
+                errors.append((row_number, str(e)))
+        return imported, unchanged, errors
+
+    def _write(self, records):
+        """Write the records and return how many rows were skipped as unchanged."""
+        with self._timed("validate"):
+            records = self._merge_duplicates(records)
+            records, unchanged = self._skip_unchanged(records)
+        if not records:
+            return unchanged
+        with self._timed("write"):
+            students = self._write_records(records)
+            # Bulk writes send no signals, so expire the stored exports and
+            # refresh the search documents here.
+            expire_exports()
+            schedule_search_refresh(student.pk for student in students.values())
+        with self._timed("recompute"):
+            recompute_academic_performance(
+                Student.objects.filter(pk__in=[student.pk for student in students.values()]),
+                chunk_size=self.batch_size,
+            )
+        return unchanged
+
+    def _write_records(self, records):
+        """Upsert the users, subjects, students, profiles and grades; returns the students by username."""
+        users = self._resolve_users(records)
+        subjects = self._resolve_subjects(records)
+        students, updated = self._upsert_students(records, users)
+        self._remove_replaced_grades(records, students, updated, subjects)
+        self._set_subjects(records, students, subjects)
+        for key, model in PROFILE_MODELS.items():
+            self._upsert_profiles(model, key, records, students)
+        Grade.objects.bulk_ingest(
+            [
+                {"student_id": students[username].pk, "subject_id": subjects[name].pk, "score": score}
+                for username, record in records.items()
+                for name, score in record["grades"]
+            ],
+            batch_size=self.batch_size,
+            recompute=False,
+        )
+        return students
+
+    @staticmethod
+    def _merge_duplicates(records):
+        """
+        Collapse records for the same user: each row is the whole truth for its
+        student, so the last one wins.
+        """
+        merged = {}
+        for record in records:
+            previous = merged.get(record["username"])
+            merged[record["username"]] = {
+                **record, "row_count": previous["row_count"] + 1 if previous else 1,
+            }
+        return merged
+
+    @staticmethod
+    def _skip_unchanged(records):
+        """Drop the records whose student was last imported from identical rows."""
+        imported_hashes = dict(
+            Student.objects.filter(user__username__in=list(records)).values_list('user__username', 'import_hash')
+        )
+        changed, unchanged = {}, 0
+        for username, record in records.items():
+            if imported_hashes.get(username) == record["row_hash"]:
+                unchanged += record["row_count"]
+            else:
+                changed[username] = record
+        return changed, unchanged
+
+    def _resolve_users(self, records):
+        users = {}
+        for user in User.objects.filter(username__in=list(records)).order_by('pk'):
+            users.setdefault(user.username, user)
+        missing = [
+            User(username=username, email=record["email"])
+            for username, record in records.items() if username not in users
+        ]
+        for user in User.objects.bulk_create(missing, batch_size=self.batch_size):
+            users[user.username] = user
+        return users
+
+    def _resolve_subjects(self, records):
+        names = set()
+        for record in records.values():
+            names.update(record["subjects"] or [])
+            names.update(name for name, _ in record["grades"])
+        subjects = {subject.name: subject for subject in Subject.objects.filter(name__in=names)}
+        missing = [Subject(name=name) for name in names if name not in subjects]
+        if missing:
+            Subject.objects.bulk_create(missing, batch_size=self.batch_size, ignore_conflicts=True)
+            subjects.update(
+                (subject.name, subject)
+                for subject in Subject.objects.filter(name__in=[s.name for s in missing])
+            )
+        return subjects
+
+    def _upsert_students(self, records, users):
+        existing = {
+            student.user_id: student
+            for student in Student.objects.filter(user_id__in=[user.pk for user in users.values()])
+        }
+        students, to_create, to_update = {}, [], []
+        for username, record in records.items():
+            user = users[username]
+            student = existing.get(user.pk)
+            if student is None:
+                student = Student(user=user, import_hash=record["row_hash"], **record["student"])
+                to_create.append(student)
+            else:
+                for field, value in record["student"].items():
+                    setattr(student, field, value)
+                student.import_hash = record["row_hash"]
+                to_update.append(student)
+            students[username] = student
+        Student.objects.bulk_create(to_create, batch_size=self.batch_size)
+        update_rows(Student, to_update, [*record["student"], "import_hash"], self.batch_size)
+        return students, to_update
+
+    def _remove_replaced_grades(self, records, students, updated, subjects):
+        """
+        Delete the grades a changed row replaces: those of its student in the
+        subjects the row has grades for. Grades in other subjects (e.g. entered
+        by a teacher) and their history are kept.
+        """
+        updated = {student.pk for student in updated}
+        replaced = {
+            (students[username].pk, subjects[name].pk)
+            for username, record in records.items()
+            if students[username].pk in updated
+            for name, _ in record["grades"]
+        }
+        if not replaced:
+            return
+        Grade.objects.filter(
+            student_id__in=updated, subject_id__in={subject_id for _, subject_id in replaced}
+        ).bulk_remove(batch_size=self.batch_size, pairs=replaced)
+
+    def _set_subjects(self, records, students, subjects):
+        Through = Student.subjects.through
+        student_ids = [
+            students[username].pk for username, record in records.items() if record["subjects"] is not None
+        ]
+        if not student_ids:
+            return
+        Through.objects.filter(student_id__in=student_ids).delete()
+        links = {
+            (students[username].pk, subjects[name].pk)
+            for username, record in records.items()
+            for name in record["subjects"] or []
+        }
+        Through.objects.bulk_create(
+            [Through(student_id=student_id, subject_id=subject_id) for student_id, subject_id in links],
+            batch_size=self.batch_size,
+        )
+
+    def _upsert_profiles(self, model, key, records, students):
+        existing = {
+            profile.student_id: profile
+            for profile in model.objects.filter(student_id__in=[student.pk for student in students.values()])
+        }
+        to_create, to_update = [], []
+        for username, record in records.items():
+            student = students[username]
+            profile = existing.get(student.pk)
+            if profile is None:
+                to_create.append(model(student=student, **record[key]))
+            else:
+                for field, value in record[key].items():
+                    setattr(profile, field, value)
+                to_update.append(profile)
+        model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            update_rows(model, to_update, list(next(iter(records.values()))[key]), self.batch_size)
+
+    def write_parsed(self, records, rejects, parse_seconds=0.0):
+        """
+        Write the output of ``parse_chunk()`` and return a ``ChunkResult`` whose
+        ``rejects`` also include the rows that failed to write.
+        """
+        row_numbers = [row_number for row_number, _, _ in records] + [row_number for row_number, _, _ in rejects]
+        imported = unchanged = 0
+        self._timings = Counter(parse=parse_seconds)
+        queries = QueryCounter()
+        if records:
+            with connection.execute_wrapper(queries):
+                imported, unchanged, errors = self.write_chunk(
+                    [(row_number, record) for row_number, record, _ in records]
+                )
+            rows = {row_number: row for row_number, _, row in records}
+            rejects = rejects + [(row_number, message, rows[row_number]) for row_number, message in errors]
+        return ChunkResult(
+            first_row=min(row_numbers),
+            last_row=max(row_numbers),
+            seen=len(row_numbers),
+            imported=imported,
+            unchanged=unchanged,
+            rejects=rejects,
+            timings=dict(self._timings),
+            queries=queries.count,
+        )
+
+    def import_rows(self, numbered_rows, chunk_size=1000, done_ranges=()):
+        """
+        Parse and write ``(row_number, row)`` pairs ``chunk_size`` rows at a time,
+        skipping the rows inside ``done_ranges``. Yields a ``ChunkResult`` after
+        every chunk.
+        """
+        for chunk in chunked(skip_done(numbered_rows, done_ranges), chunk_size):
+            started = time.perf_counter()
+            records, rejects = parse_chunk(chunk)
+            yield self.write_parsed(records, rejects, time.perf_counter() - started)
+
+    def import_shards(self, path, workers, chunk_size=1000, limit=0, done_ranges=()):
+        """
+        Like ``import_rows()`` for the CSV file at ``path``, but parsed by
+        ``workers`` processes, one per byte-range shard of the file. This process
+        writes the chunks as they arrive; the queue between the two stages holds at
+        most two chunks per worker, which bounds memory use. Parse timings are
+        measured in the workers, so they overlap with the other stages.
+        """
+        fieldnames, shards = plan_shards(path, workers, limit)
+        context = multiprocessing.get_context()
+        queue = context.Queue(maxsize=2 * len(shards))
+        processes = [
+            context.Process(
+                target=parse_shard,
+                args=(path, fieldnames, start, end, first_line, chunk_size, queue, done_ranges),
+                daemon=True,
+            )
+            for start, end, first_line in shards
+        ]
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        for process in processes:
+            process.start()
+        try:
+            running = len(processes)
+            while running:
+                try:
+                    item = queue.get(timeout=1)
+                except Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("A parsing worker exited unexpectedly.")
+                    continue
+                if item is None:
+                    running -= 1
+                elif isinstance(item, str):
+                    raise RuntimeError(f"A parsing worker failed:\n{item}")
+                else:
+                    yield self.write_parsed(*item)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+
+class QueryCounter:
+    """``connection.execute_wrapper()`` callable that counts the queries run."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+# =============================================================================
+# Progress reporting
+# =============================================================================
+
+class ImportProgress:
+    """
+    Aggregates ``ChunkResult``s into totals, rates, per-stage timings and an
+    ETA. ``expected`` is the estimated number of rows left to process, if known.
+    """
+
+    def __init__(self, expected=None):
+        self.expected = expected
+        self.started = time.perf_counter()
+        self.rows = self.imported = self.unchanged = self.rejected = 0
+        self.chunks = self.queries = 0
+        self.timings = Counter({stage: 0.0 for stage in STAGES})
+
+    def add(self, chunk):
+        self.rows += chunk.seen
+        self.imported += chunk.imported
+        self.unchanged += chunk.unchanged
+        self.rejected += len(chunk.rejects)
+        self.chunks += 1
+        self.queries += chunk.queries
+        self.timings.update(chunk.timings)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left, or ``None`` if unknown."""
+        if not self.expected or not self.rows:
+            return None
+        return max(self.expected - self.rows, 0) / self.rows_per_second
+
+    def stage_shares(self):
+        total = sum(self.timings.values())
+        return {stage: (seconds / total if total else 0.0) for stage, seconds in self.timings.items()}
+
+    def line(self):
+        """One-line progress report."""
+        done = f"{self.rows}"
+        if self.expected:
+            done += f"/{self.expected} rows ({min(self.rows / self.expected, 1):.0%})"
+        else:
+            done += " rows"
+        stages = " ".join(f"{stage} {share:.0%}" for stage, share in self.stage_shares().items())
+        eta = self.eta
+        return (
+            f"Processed {done} | {self.rows_per_second:.0f} rows/s | "
+            f"{self.imported} imported, {self.unchanged} unchanged, {self.rejected} failed | "
+            f"{self.queries / max(self.chunks, 1):.0f} queries/chunk | {stages}"
+            + (f" | ETA {_duration(eta)}" if eta is not None else "")
+        )
+
+    def summary(self):
+        """Final figures as a JSON-serializable dict."""
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "unchanged": self.unchanged,
+            "rejected": self.rejected,
+            "chunks": self.chunks,
+            "queries": self.queries,
+            "queries_per_chunk": round(self.queries / self.chunks, 1) if self.chunks else 0,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+        }
+
+
+def _duration(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.columnar import columnar_format, write_student_records
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        "Export full student records (student, subjects, grades, health, economic and "
+        "technology profiles) to a Parquet (.parquet) or Arrow IPC (.arrow) file that "
+        "import_full_students can read back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file; the format is taken from its extension')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of students per record batch'
+        )
+        parser.add_argument(
+            '--active-only',
+            action='store_true',
+            help='Only export students marked as active'
+        )
+
+    def handle(self, *args, **options):
+        file_format = columnar_format(options['path'])
+        if file_format is None:
+            raise CommandError("The output file must end in .parquet, .pq, .arrow, .ipc or .feather.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        queryset = Student.objects.active() if options['active_only'] else Student.objects.all()
+        started = time.perf_counter()
+        written = write_student_records(options['path'], file_format, queryset, options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {written} students to {options['path']} in {elapsed:.2f}s."
+        ))
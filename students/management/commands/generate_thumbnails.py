@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from students.models import Student
+from students.thumbnails import generate_profile_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generate profile image thumbnails for students that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate thumbnails for every student with a profile image'
+        )
+
+    def handle(self, *args, **options):
+        students = Student.objects.exclude(profile_image="").exclude(profile_image__isnull=True)
+        if not options['all']:
+            students = students.filter(profile_image_hash="")
+
+        generated = failed = 0
+        for student_id in students.order_by().values_list('pk', flat=True).iterator():
+            try:
+                if generate_profile_thumbnails(student_id):
+                    generated += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Error generating thumbnails for student {student_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated thumbnails for {generated} students ({failed} failed)."
+        ))
@@ -1,248 +1,233 @@
 import csv
+import json
 import os
-from decimal import Decimal
-from datetime import datetime
+import time
+from itertools import islice
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.utils import timezone
 
-# Set the Django settings module environment variable
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SchoolHub.settings')
-import django
-django.setup()
+from students.columnar import columnar_format, count_rows, iter_columnar_rows, read_schema
+from students.importing import ImportProgress, StudentImporter
+from students.models import ImportCheckpoint
+from students.parsing import count_data_lines, file_hash, read_header
+from students.synthetic import is_manifest, read_manifest
 
-from accounts.models import User
-from students.models import (
-    Student,
-    Subject,
-    Grade,
-    HealthInformation,
-    EconomicSituation,
-    SocialMediaAndTechnology,
-)
 
 class Command(BaseCommand):
-    help = "Import the first 5000 rows from cleaned_student_data.csv into Student and related models."
-
-    def parse_date(self, s):
-        """Convert a string in 'YYYY-MM-DD' format to a date object."""
-        try:
-            return datetime.strptime(s, "%Y-%m-%d").date()
-        except Exception:
-            return None
-
-    def parse_decimal(self, s):
-        """Convert a string to a Decimal. Returns 0.0 if conversion fails."""
-        try:
-            return Decimal(s)
-        except Exception:
-            return Decimal("0.0")
-
-    def parse_float(self, s):
-        """Convert a string to a float. Returns 0.0 if conversion fails."""
-        try:
-            return float(s)
-        except Exception:
-            return 0.0
-
-    def str_to_bool(self, s):
-        """Convert a string to a boolean value. Returns True if the string indicates 'yes', 'true', or '1'."""
-        if isinstance(s, str):
-            return s.strip().lower() in ['yes', 'true', '1']
-        return bool(s)
+    help = (
+        "Import students and their related records (subjects, grades, health, "
+        "economic and technology profiles) from a CSV, Parquet or Arrow file, or every shard "
+        "listed in a manifest, in bulk chunks. "
+        "Progress is checkpointed, so re-running an interrupted import resumes it, "
+        "and rows unchanged since the last import are skipped. "
+        "A changed row replaces its student's grades in the subjects it has grades for; "
+        "grades in other subjects are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=os.path.join(settings.BASE_DIR, 'students', 'cleaned_student_data.csv'),
+            help='Path to the CSV, Parquet (.parquet) or Arrow IPC (.arrow) file, or to the '
+                 '.manifest.json of a sharded file from generate_students_csv '
+                 '(default: students/cleaned_student_data.csv)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of rows parsed and written per transaction'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=5000,
+            help='Maximum number of rows to import from each file (0 for no limit)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes parsing byte-range shards of a CSV file in parallel '
+                 '(requires one record per line)'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='CSV file to write rejected rows to (default: <path>.rejects.csv)'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the checkpoint of a previous run of the same file and start over'
+        )
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            help='Only print the final summary (rejected rows still go to the rejects file)'
+        )
+        parser.add_argument(
+            '--progress-interval',
+            type=float,
+            default=5.0,
+            help='Seconds between progress lines (default: 5)'
+        )
+        parser.add_argument(
+            '--json-summary',
+            metavar='PATH',
+            help="Write the final summary as JSON to PATH ('-' for standard output)"
+        )
 
     def handle(self, *args, **options):
-        # Define the path to the cleaned CSV file
-<<<<<<< HEAD
-        csv_path = r"C:\Users\Hawraa\laptop\school_management_system\students\cleaned_student_data.csv"
-=======
-        csv_path = r"C:\Users\laptop\laptop\school_management_system\students\cleaned_student_data.csv"
-
->>>>>>> 3fc5ec8b7b89c971293bb2d9cc3f9ccc9cef658e
-        if not os.path.exists(csv_path):
-            raise CommandError(f"The file {csv_path} does not exist.")
-
-        # Delete all existing Student records for testing purposes
-        Student.objects.all().delete()
-        self.stdout.write("All existing Student records have been deleted for testing purposes.")
-
-        # Open the CSV file and read its content using DictReader
-        with open(csv_path, mode='r', encoding='utf-8', newline='') as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-            # Limit to the first 5000 rows
-            rows = rows[:5000]
-
-            success_count = 0
-            error_count = 0
-
-            for idx, row in enumerate(rows):
-                self.stdout.write(f"Processing row {idx+1}...")
-                try:
-                    with transaction.atomic():
-                        # Process user information
-                        username = row.get('user', '').strip()
-                        if not username:
-                            raise ValueError("Missing 'user' field.")
-                        email = row.get('email', f"{username}@example.com").strip()
-                        user_obj, created = User.objects.get_or_create(
-                            username=username,
-                            defaults={'email': email}
-                        )
-
-                        # Process Student data
-                        enrollment_date = self.parse_date(row.get('enrollment_date', ''))
-                        dob = self.parse_date(row.get('date_of_birth', ''))
-                        if not enrollment_date or not dob:
-                            raise ValueError("Missing enrollment_date or date_of_birth.")
-                        gender = row.get('gender', 'Male').strip()
-                        student_defaults = {
-                            "full_name": row.get('full_name', '').strip(),
-                            "enrollment_date": enrollment_date,
-                            "date_of_birth": dob,
-                            "gender": gender if gender in ["Male", "Female"] else "Male",
-                            "nationality": row.get('nationality', 'Not Specified').strip(),
-                            "address": row.get('address', 'Not Specified').strip(),
-                            "profile_image": row.get('profile_image', '').strip(),
-                            "email": email,
-                            "mobile": row.get('mobile', '').strip(),
-                            "emergency_contact_name": row.get('emergency_contact_name', 'Not Specified').strip(),
-                            "emergency_contact": row.get('emergency_contact', 'Not Specified').strip(),
-                            "guardian_relationship": row.get('guardian_relationship', 'Other').strip(),
-                            "guardian_address": row.get('guardian_address', 'Not Specified').strip(),
-                            "guardian_employment_status": row.get('guardian_employment_status', 'Employed').strip(),
-                            "guardian_monthly_income": self.parse_decimal(row.get('guardian_monthly_income', '0')),
-                            "guardian_education": row.get('guardian_education', 'Not Specified').strip(),
-                            "grade_level": row.get('grade_level', '').strip(),
-                            "attendance_percentage": self.parse_float(row.get('attendance_percentage', '0')),
-                            "awards": row.get('awards', '').strip(),
-                            "seat_zone": row.get('seat_zone', 'Middle').strip(),
-                        }
-                        student_obj, stu_created = Student.objects.update_or_create(
-                            user=user_obj,
-                            defaults=student_defaults
-                        )
-                        if stu_created:
-                            self.stdout.write(f"Created student: {student_obj.full_name}")
-                        else:
-                            self.stdout.write(f"Updated student: {student_obj.full_name}")
-
-                        # Process Subjects
-                        subjects_str = row.get('subjects', '').strip()
-                        if subjects_str:
-                            student_obj.subjects.clear()
-                            for subj_name in subjects_str.split(','):
-                                subj_name = subj_name.strip()
-                                if subj_name:
-                                    subj_obj, _ = Subject.objects.get_or_create(name=subj_name)
-                                    student_obj.subjects.add(subj_obj)
-
-                        # Process Grades (formatted as "subject:score;subject:score;...")
-                        grades_str = row.get('grades', '').strip()
-                        if grades_str:
-                            for grade_item in grades_str.split(';'):
-                                if ':' in grade_item:
-                                    subj, score = grade_item.split(':', 1)
-                                    subj = subj.strip()
-                                    score = self.parse_decimal(score.strip())
-                                    if subj:
-                                        subj_obj, _ = Subject.objects.get_or_create(name=subj)
-                                        Grade.objects.create(
-                                            student=student_obj,
-                                            subject=subj_obj,
-                                            score=score
-                                        )
-
-                        # Process HealthInformation data
-                        raw_family_pressures = row.get('family_pressures', '').strip()
-                        if raw_family_pressures.lower() in ["", "not specified"]:
-                            raw_family_pressures = "None"
-                        health_defaults = {
-                            "has_chronic_illness": self.str_to_bool(row.get('has_chronic_illness', '')),
-                            "general_health_status": row.get('general_health_status', 'good').strip(),
-                            "last_medical_checkup": self.parse_date(row.get('last_medical_checkup', '')),
-                            "weight": self.parse_float(row.get('weight', '0')),
-                            "height": self.parse_float(row.get('height', '0')),
-                            "academic_stress": row.get('academic_stress', 'Moderate').strip(),
-                            "motivation": row.get('motivation', 'Moderate').strip(),
-                            "depression": self.str_to_bool(row.get('depression', '')),
-                            "sleep_disorder": row.get('sleep_disorder', 'None').strip(),
-                            "study_life_balance": row.get('study_life_balance', 'Needs Improvement').strip(),
-                            "family_pressures": raw_family_pressures,
-                        }
-                        HealthInformation.objects.update_or_create(
-                            student=student_obj,
-                            defaults=health_defaults
-                        )
-
-                        # Process EconomicSituation data
-                        econ_defaults = {
-                            "is_orphan": self.str_to_bool(row.get('is_orphan', '')),
-                            "father_occupation": row.get('father_occupation', '').strip(),
-                            "mother_occupation": row.get('mother_occupation', '').strip(),
-                            "parents_marital_status": row.get('parents_marital_status', '').strip(),
-                            "family_income_level": self.parse_decimal(row.get('family_income_level', '0')),
-                            "income_source": row.get('income_source', 'Other').strip(),
-                            "monthly_expenses": self.parse_decimal(row.get('monthly_expenses', '0')),
-                            "housing_status": row.get('housing_status', '').strip(),
-                            "access_to_electricity": self.str_to_bool(row.get('access_to_electricity', '')),
-                            "has_access_to_water": self.str_to_bool(row.get('has_access_to_water', '')),
-                            "access_to_internet": self.str_to_bool(row.get('access_to_internet', '')),
-                            "has_private_study_room": self.str_to_bool(row.get('has_private_study_room', '')),
-                            "number_of_rooms_in_home": int(row.get('number_of_rooms_in_home', '0') or 0),
-                            "daily_food_availability": self.str_to_bool(row.get('daily_food_availability', '')),
-                            "has_school_uniform": self.str_to_bool(row.get('has_school_uniform', '')),
-                            "has_stationery": self.str_to_bool(row.get('has_stationery', '')),
-                            "receives_scholarship": self.str_to_bool(row.get('receives_scholarship', '')),
-                            "receives_private_tutoring": self.str_to_bool(row.get('receives_private_tutoring', '')),
-                            "daily_study_hours": self.parse_float(row.get('daily_study_hours', '0')),
-                            "works_after_school": self.str_to_bool(row.get('works_after_school', '')),
-                            "work_hours_per_week": self.parse_float(row.get('work_hours_per_week', '0')),
-                            "responsible_for_household_tasks": self.str_to_bool(row.get('responsible_for_household_tasks', '')),
-                            "transportation_mode": row.get('transportation_mode', '').strip(),
-                            "distance_to_school": self.parse_float(row.get('distance_to_school', '0')),
-                            "has_health_insurance": self.str_to_bool(row.get('has_health_insurance', '')),
-                            "household_size": int(row.get('household_size', '1') or 1),
-                            "sibling_rank": int(row.get('sibling_rank', '0') or 0),
-                        }
-                        EconomicSituation.objects.update_or_create(
-                            student=student_obj,
-                            defaults=econ_defaults
-                        )
-
-                        # Process SocialMediaAndTechnology data
-                        raw_smi = row.get('social_media_impact_on_studies', '').strip()
-                        if raw_smi.lower() in ["", "not specified"]:
-                            raw_smi = "None"
-                        raw_ctw = row.get('content_type_watched', '').strip()
-                        if raw_ctw.lower() in ["", "not specified"]:
-                            raw_ctw = "None"
-                        tech_defaults = {
-                            "has_electronic_device": self.str_to_bool(row.get('has_electronic_device', '')),
-                            "device_usage_purpose": row.get('device_usage_purpose', 'Other').strip(),
-                            "has_social_media_accounts": self.str_to_bool(row.get('has_social_media_accounts', '')),
-                            "daily_screen_time": self.parse_float(row.get('daily_screen_time', '0')),
-                            "social_media_impact_on_studies": raw_smi,
-                            "content_type_watched": raw_ctw,
-                            "social_media_impact_on_sleep": row.get('social_media_impact_on_sleep', 'None').strip(),
-                            "social_media_impact_on_focus": row.get('social_media_impact_on_focus', 'Neutral').strip(),
-                            "plays_video_games": self.str_to_bool(row.get('plays_video_games', '')),
-                            "daily_gaming_hours": self.parse_float(row.get('daily_gaming_hours', '0')),
-                            "aware_of_cybersecurity": self.str_to_bool(row.get('aware_of_cybersecurity', '')),
-                            "experienced_electronic_extortion": self.str_to_bool(row.get('experienced_electronic_extortion', '')),
-                        }
-                        SocialMediaAndTechnology.objects.update_or_create(
-                            student=student_obj,
-                            defaults=tech_defaults
-                        )
-
-                        success_count += 1
-
-                except Exception as e:
-                    error_count += 1
-                    self.stderr.write(f"Error in row {idx+1}: {e}")
-
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"The file {path} does not exist.")
+        if is_manifest(path):
+            if options['rejects']:
+                raise CommandError("--rejects takes a single file; each shard of a manifest gets <shard>.rejects.csv.")
+            paths = read_manifest(path)
+            if not paths:
+                raise CommandError(f"{path} lists no shard files.")
+            missing = [shard for shard in paths if not os.path.exists(shard)]
+            if missing:
+                raise CommandError(f"Shard files listed in {path} do not exist: {', '.join(missing)}")
+        else:
+            paths = [path]
+        if options['workers'] > 1 and any(columnar_format(shard) for shard in paths):
+            raise CommandError("--workers only applies to CSV files; Parquet and Arrow files are read typed.")
+
+        # Get every file's checkpoint first, so the ETA covers all of them.
+        files = [(shard, self.checkpoint(shard, options)) for shard in paths]
+        remaining = 0
+        for shard, checkpoint in files:
+            total_rows = count_rows(shard) if columnar_format(shard) else count_data_lines(shard)
+            if options['limit']:
+                total_rows = min(total_rows, options['limit'])
+            remaining += max(total_rows - self.rows_done(checkpoint), 0)
+        progress = ImportProgress(expected=remaining)
+
+        importer = StudentImporter(batch_size=options['chunk_size'])
+        rejects_paths = []
+        for shard, checkpoint in files:
+            rejected = progress.rejected
+            rejects_path = self.import_file(importer, shard, checkpoint, progress, options)
+            if progress.rejected > rejected:
+                rejects_paths.append(rejects_path)
+
+        summary = progress.summary()
+        stage_seconds = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in summary['stage_seconds'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Import completed: {progress.imported} rows imported successfully, "
+            f"{progress.unchanged} unchanged, {progress.rejected} rows failed "
+            f"out of {progress.rows} total rows in {summary['elapsed_seconds']:.1f}s "
+            f"({summary['rows_per_second']:.0f} rows/s; {stage_seconds}; "
+            f"{summary['queries_per_chunk']} queries/chunk)."
+        ))
+        for rejects_path in rejects_paths:
+            self.stdout.write(f"Rejected rows were written to {rejects_path}")
+
+        if options['json_summary']:
+            summary.update({
+                'file': os.path.abspath(path),
+                'file_hash': files[0][1].file_hash if len(files) == 1 else None,
+                'shards': [os.path.abspath(shard) for shard in paths] if is_manifest(path) else None,
+                'format': columnar_format(paths[0]) or 'csv',
+                'workers': options['workers'],
+                'chunk_size': options['chunk_size'],
+                'rejects_files': rejects_paths,
+                'finished_at': timezone.now().isoformat(),
+            })
+            if options['json_summary'] == '-':
+                self.stdout.write(json.dumps(summary, indent=2))
+            else:
+                with open(options['json_summary'], 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, indent=2)
+
+    def checkpoint(self, path, options):
+        """The checkpoint of ``path``, or a new one (also with ``--restart``)."""
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            file_hash=file_hash(path),
+            defaults={'file_name': os.path.basename(path)},
+        )
+        if options['restart'] and not created:
+            checkpoint.delete()
+            checkpoint = ImportCheckpoint.objects.create(
+                file_hash=checkpoint.file_hash, file_name=os.path.basename(path)
+            )
+        elif checkpoint.done_ranges:
             self.stdout.write(
-                f"Import completed: {success_count} rows imported successfully, "
-                f"{error_count} rows failed out of {len(rows)} total rows."
+                f"Resuming the import of {os.path.basename(path)} started at "
+                f"{checkpoint.started_at:%Y-%m-%d %H:%M}: {self.rows_done(checkpoint)} rows already done."
+            )
+        return checkpoint
+
+    def import_file(self, importer, path, checkpoint, progress, options):
+        """Import one CSV, Parquet or Arrow file. Returns the path of its rejects CSV."""
+        columnar = columnar_format(path)
+        done_ranges = checkpoint.done_ranges
+        rejects_path = options['rejects'] or f"{path}.rejects.csv"
+        if columnar:
+            rows = iter_columnar_rows(path, options['chunk_size'])
+            if options['limit']:
+                rows = islice(rows, options['limit'])
+            chunks = importer.import_rows(rows, options['chunk_size'], done_ranges)
+            self.consume(chunks, read_schema(path).names, checkpoint, progress, rejects_path, options)
+        elif options['workers'] > 1:
+            fieldnames = read_header(path)[0]
+            chunks = importer.import_shards(
+                path, options['workers'], options['chunk_size'], options['limit'], done_ranges
             )
+            self.consume(chunks, fieldnames, checkpoint, progress, rejects_path, options)
+        else:
+            # Stream the file: only one chunk of rows is held in memory at a time.
+            with open(path, mode='r', encoding='utf-8-sig', newline='') as file:
+                reader = csv.DictReader(file)
+                rows = ((reader.line_num, row) for row in reader)
+                if options['limit']:
+                    rows = islice(rows, options['limit'])
+                chunks = importer.import_rows(rows, options['chunk_size'], done_ranges)
+                self.consume(chunks, reader.fieldnames or [], checkpoint, progress, rejects_path, options)
+
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=['completed_at', 'updated_at'])
+        return rejects_path
+
+    @staticmethod
+    def rows_done(checkpoint):
+        return checkpoint.rows_imported + checkpoint.rows_unchanged + checkpoint.rows_rejected
+
+    def consume(self, chunks, fieldnames, checkpoint, progress, rejects_path, options):
+        """
+        Checkpoint every written chunk, print a progress line every
+        ``--progress-interval`` seconds, and collect rejected rows into the rejects
+        CSV, which is only created once there is something to write (and appended
+        to when resuming).
+        """
+        rejects_file = writer = None
+        last_report = time.perf_counter()
+        try:
+            for chunk in chunks:
+                progress.add(chunk)
+                if chunk.rejects and writer is None:
+                    append = bool(checkpoint.rows_rejected) and os.path.exists(rejects_path)
+                    rejects_file = open(rejects_path, mode='a' if append else 'w', encoding='utf-8', newline='')
+                    writer = csv.writer(rejects_file)
+                    if not append:
+                        writer.writerow(['row', 'error', *fieldnames])
+                for row_number, message, row in chunk.rejects:
+                    if not options['quiet']:
+                        self.stderr.write(f"Error in row {row_number}: {message}")
+                    writer.writerow([row_number, message, *(row.get(name, '') for name in fieldnames)])
+                if rejects_file is not None:
+                    rejects_file.flush()
+                checkpoint.mark_done(
+                    chunk.first_row, chunk.last_row, chunk.imported, chunk.unchanged, len(chunk.rejects)
+                )
+                if not options['quiet'] and time.perf_counter() - last_report >= options['progress_interval']:
+                    self.stdout.write(progress.line())
+                    last_report = time.perf_counter()
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
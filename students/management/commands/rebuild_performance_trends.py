@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from students.models import CENT, Grade, StudentPerformanceTrend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every StudentPerformanceTrend from scratch from the grades table "
+        "and report any drift in the running aggregates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift, do not write the rebuilt trends'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of trends written per bulk query'
+        )
+
+    def expected_trends(self):
+        """Return {(student_id, semester): (grade_count, percentage_sum, gpa_sum)} from the grades."""
+        totals = (
+            Grade.objects.order_by()
+            .values('student_id', 'semester')
+            .annotate(
+                grade_count=Count('percentage'),
+                percentage_sum=Sum('percentage'),
+                gpa_sum=Sum('gpa_points'),
+            )
+        )
+        return {
+            (row['student_id'], row['semester']): (
+                row['grade_count'],
+                row['percentage_sum'] or Decimal("0"),
+                row['gpa_sum'] or Decimal("0"),
+            )
+            for row in totals.iterator()
+        }
+
+    @staticmethod
+    def average(total, count):
+        return (Decimal(total) / count).quantize(CENT) if count else Decimal("0.00")
+
+    def drifted(self, trend, count, percentage_sum, gpa_sum):
+        return (
+            trend.grade_count != count
+            or trend.percentage_sum != percentage_sum
+            or trend.gpa_sum != gpa_sum
+            # Averages are written through float expressions, so allow a cent of rounding.
+            or abs((trend.average_percentage or 0) - self.average(percentage_sum, count)) > CENT
+            or abs((trend.gpa or 0) - self.average(gpa_sum, count)) > CENT
+        )
+
+    def handle(self, *args, **options):
+        expected = self.expected_trends()
+        to_update = []
+        checked = 0
+
+        for trend in StudentPerformanceTrend.objects.order_by().iterator(chunk_size=options['batch_size']):
+            checked += 1
+            count, percentage_sum, gpa_sum = expected.pop(
+                (trend.student_id, trend.semester), (0, Decimal("0"), Decimal("0"))
+            )
+            if not self.drifted(trend, count, percentage_sum, gpa_sum):
+                continue
+            if options['verbosity'] >= 2:
+                self.stdout.write(
+                    f"Drift for student {trend.student_id} ({trend.semester}): "
+                    f"count {trend.grade_count} -> {count}, "
+                    f"percentage sum {trend.percentage_sum} -> {percentage_sum}, "
+                    f"GPA sum {trend.gpa_sum} -> {gpa_sum}"
+                )
+            trend.grade_count = count
+            trend.percentage_sum = percentage_sum
+            trend.gpa_sum = gpa_sum
+            trend.average_percentage = self.average(percentage_sum, count)
+            trend.gpa = self.average(gpa_sum, count)
+            to_update.append(trend)
+
+        # Whatever is left has grades but no trend row at all.
+        to_create = [
+            StudentPerformanceTrend(
+                student_id=student_id,
+                semester=semester,
+                grade_count=count,
+                percentage_sum=percentage_sum,
+                gpa_sum=gpa_sum,
+                average_percentage=self.average(percentage_sum, count),
+                gpa=self.average(gpa_sum, count),
+            )
+            for (student_id, semester), (count, percentage_sum, gpa_sum) in expected.items()
+        ]
+        if options['verbosity'] >= 2:
+            for trend in to_create:
+                self.stdout.write(f"Missing trend for student {trend.student_id} ({trend.semester})")
+
+        summary = (
+            f"Checked {checked} trends: {len(to_update)} drifted, {len(to_create)} missing."
+        )
+        if options['dry_run']:
+            self.stdout.write(summary + " Dry run, nothing written.")
+            return
+
+        with transaction.atomic():
+            StudentPerformanceTrend.objects.bulk_update(
+                to_update,
+                ['grade_count', 'percentage_sum', 'gpa_sum', 'average_percentage', 'gpa'],
+                batch_size=options['batch_size'],
+            )
+            StudentPerformanceTrend.objects.bulk_create(to_create, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(summary + " Trends rebuilt."))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.search import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search document (name, email, mobile, and the subjects, teachers and update "
+        "reasons of their grades) of every student, "
+        "for example after changing students with raw SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of students rebuilt per transaction'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+
+        started = time.perf_counter()
+        count = rebuild_search_documents(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the search documents of {count} students in {time.perf_counter() - started:.1f}s."
+        ))
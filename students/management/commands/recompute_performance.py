@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.models import Student
+from students.performance import recompute_academic_performance
+
+
+class Command(BaseCommand):
+    help = "Recompute academic performance for all (or only active) students using the bulk engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of students loaded and written back per chunk'
+        )
+        parser.add_argument(
+            '--active-only',
+            action='store_true',
+            help='Only recompute students marked as active'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+
+        queryset = Student.objects.active() if options['active_only'] else Student.objects.all()
+        started = time.perf_counter()
+        processed, updated = recompute_academic_performance(queryset, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed academic performance for {processed} students "
+            f"({updated} changed) in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.export_jobs import requeue_stale_jobs, run_export
+from students.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending export jobs: all of them with EXPORT_JOB_RUNNER = 'worker', otherwise the ones "
+        "left pending or interrupted when a web process stopped. With --watch, keep polling for new jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            type=float,
+            metavar='SECONDS',
+            help='Keep running, checking for pending jobs every SECONDS'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            metavar='SECONDS',
+            help='Run again the running jobs that have made no progress for SECONDS '
+                 '(default: the EXPORT_JOB_STALE_AFTER setting)'
+        )
+
+    def handle(self, *args, **options):
+        if options['watch'] is not None and options['watch'] <= 0:
+            raise CommandError("--watch must be positive.")
+
+        while True:
+            requeued = requeue_stale_jobs(options['stale_after'])
+            if requeued:
+                self.stdout.write(f"Requeued {len(requeued)} interrupted export jobs.")
+
+            pending = ExportJob.objects.filter(status=ExportJob.Status.PENDING).order_by('created_at')
+            for job_id in pending.values_list('pk', flat=True):
+                started = time.perf_counter()
+                if not run_export(job_id):
+                    continue
+                job = ExportJob.objects.get(pk=job_id)
+                message = f"Export job {job.pk} ({job.exporter}): {job.processed} rows, {job.get_status_display().lower()} in {time.perf_counter() - started:.1f}s."
+                if job.status == ExportJob.Status.DONE:
+                    self.stdout.write(self.style.SUCCESS(message))
+                else:
+                    self.stderr.write(f"{message} {job.error}")
+
+            if options['watch'] is None:
+                break
+            time.sleep(options['watch'])
@@ -0,0 +1,88 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importing import ImportProgress, StudentImporter
+from students.synthetic import StudentDataGenerator, plan_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic students (users, students, subjects, health, economic "
+        "and technology profiles, grades and performance trends) generated in memory and written "
+        "with bulk operations, without going through a CSV file. Re-running with the same --seed "
+        "skips the students that are already there."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=1000,
+            help='Number of students to generate'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed; reuse the printed seed to generate the same students again'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of students generated and written per transaction'
+        )
+        parser.add_argument(
+            '--locale',
+            default='en_US',
+            help='Faker locale of the names, addresses and jobs (default: en_US)'
+        )
+        parser.add_argument(
+            '--as-of',
+            type=date.fromisoformat,
+            help='Date that birth, enrollment and checkup dates are counted back from (default: today)'
+        )
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            help='Only print the final summary'
+        )
+
+    def handle(self, *args, **options):
+        if options['students'] < 0 or options['chunk_size'] < 1:
+            raise CommandError("--students must not be negative and --chunk-size must be positive.")
+
+        start = time.perf_counter()
+        generator = StudentDataGenerator(
+            seed=options['seed'], locale=options['locale'], as_of=options['as_of']
+        )
+        generate_seconds = time.perf_counter() - start
+
+        def rows():
+            nonlocal generate_seconds
+            for index, first, size in plan_chunks(options['students'], options['chunk_size']):
+                started = time.perf_counter()
+                table = generator.chunk(index, first, size).to_pylist()
+                generate_seconds += time.perf_counter() - started
+                yield from enumerate(table, first + 1)
+
+        importer = StudentImporter(batch_size=options['chunk_size'])
+        progress = ImportProgress(expected=options['students'])
+        for chunk in importer.import_rows(rows(), options['chunk_size']):
+            progress.add(chunk)
+            for row_number, message, _ in chunk.rejects:
+                self.stderr.write(f"Error in student {row_number}: {message}")
+            if not options['quiet']:
+                self.stdout.write(progress.line())
+
+        summary = progress.summary()
+        stage_seconds = ", ".join(
+            f"{stage} {seconds:.1f}s"
+            for stage, seconds in {"generate": generate_seconds, **summary['stage_seconds']}.items()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {progress.imported} students ({progress.unchanged} already present, "
+            f"{progress.rejected} failed) in {time.perf_counter() - start:.1f}s "
+            f"({stage_seconds}; {summary['queries_per_chunk']} queries/chunk; seed {generator.seed})."
+        ))
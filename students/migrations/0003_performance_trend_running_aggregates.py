@@ -0,0 +1,70 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:32
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def backfill_running_aggregates(apps, schema_editor):
+    """Drop duplicate trends and fill the running sums from the existing grades."""
+    Grade = apps.get_model('students', 'Grade')
+    StudentPerformanceTrend = apps.get_model('students', 'StudentPerformanceTrend')
+
+    duplicates = (
+        StudentPerformanceTrend.objects.values('student_id', 'semester')
+        .annotate(keep=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for dup in duplicates:
+        StudentPerformanceTrend.objects.filter(
+            student_id=dup['student_id'], semester=dup['semester']
+        ).exclude(id=dup['keep']).delete()
+
+    totals = (
+        Grade.objects.values('student_id', 'semester')
+        .order_by()
+        .annotate(
+            grade_count=Count('percentage'),
+            percentage_sum=Sum('percentage'),
+            gpa_sum=Sum('gpa_points'),
+        )
+    )
+    for row in totals.iterator():
+        count = row['grade_count']
+        StudentPerformanceTrend.objects.update_or_create(
+            student_id=row['student_id'],
+            semester=row['semester'],
+            defaults={
+                'grade_count': count,
+                'percentage_sum': row['percentage_sum'] or Decimal('0'),
+                'gpa_sum': row['gpa_sum'] or Decimal('0'),
+                'average_percentage': (row['percentage_sum'] or 0) / count if count else 0,
+                'gpa': (row['gpa_sum'] or 0) / count if count else 0,
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentperformancetrend',
+            name='gpa_sum',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='studentperformancetrend',
+            name='grade_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentperformancetrend',
+            name='percentage_sum',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12),
+        ),
+        migrations.RunPython(backfill_running_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_performance_trend_running_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='studentperformancetrend',
+            constraint=models.UniqueConstraint(fields=('student', 'semester'), name='unique_student_semester_trend'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_studentperformancetrend_unique_student_semester_trend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='profile_image_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the profile image; keys its generated thumbnails', max_length=64),
+        ),
+    ]
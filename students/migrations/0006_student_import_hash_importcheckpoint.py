@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_student_profile_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(max_length=64, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('done_ranges', models.JSONField(blank=True, default=list)),
+                ('rows_imported', models.PositiveIntegerField(default=0)),
+                ('rows_unchanged', models.PositiveIntegerField(default=0)),
+                ('rows_rejected', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Import Checkpoint',
+                'verbose_name_plural': 'Import Checkpoints',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the CSV row this student was last imported from', max_length=64),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TABLE = "students_studentsearchdocument"
+
+POSTGRESQL_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX {TABLE}_tsv ON {TABLE} USING gin (to_tsvector('simple'::regconfig, text))",
+    f"CREATE INDEX {TABLE}_trgm ON {TABLE} USING gin (text gin_trgm_ops)",
+]
+
+# An external-content FTS5 table over the documents, kept in sync by triggers.
+SQLITE_INDEXES = [
+    f"CREATE VIRTUAL TABLE {TABLE}_fts USING fts5("
+    f"text, content='{TABLE}', content_rowid='student_id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {TABLE}_ai AFTER INSERT ON {TABLE} BEGIN "
+    f"INSERT INTO {TABLE}_fts(rowid, text) VALUES (new.student_id, new.text); END",
+    f"CREATE TRIGGER {TABLE}_ad AFTER DELETE ON {TABLE} BEGIN "
+    f"INSERT INTO {TABLE}_fts({TABLE}_fts, rowid, text) VALUES ('delete', old.student_id, old.text); END",
+    f"CREATE TRIGGER {TABLE}_au AFTER UPDATE ON {TABLE} BEGIN "
+    f"INSERT INTO {TABLE}_fts({TABLE}_fts, rowid, text) VALUES ('delete', old.student_id, old.text); "
+    f"INSERT INTO {TABLE}_fts(rowid, text) VALUES (new.student_id, new.text); END",
+]
+
+
+def create_indexes(apps, schema_editor):
+    statements = {"postgresql": POSTGRESQL_INDEXES, "sqlite": SQLITE_INDEXES}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TABLE}_tsv")
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TABLE}_trgm")
+    elif vendor == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}_fts")
+
+
+def build_documents(apps, schema_editor):
+    """Same text as students.search.refresh_search_documents(), for the existing students."""
+    Student = apps.get_model("students", "Student")
+    Grade = apps.get_model("students", "Grade")
+    StudentSearchDocument = apps.get_model("students", "StudentSearchDocument")
+    students = Student.objects.order_by("pk").values_list("pk", "full_name", "email", "mobile")
+    last = 0
+    while chunk := list(students.filter(pk__gt=last)[:2000]):
+        last = chunk[-1][0]
+        subjects = {}
+        grades = Grade.objects.filter(student_id__in=[row[0] for row in chunk]).order_by()
+        for student_id, name in grades.values_list("student_id", "subject__name").distinct():
+            subjects.setdefault(student_id, []).append(name)
+        StudentSearchDocument.objects.bulk_create(
+            StudentSearchDocument(
+                student_id=pk,
+                text=" ".join(value for value in [*fields, *sorted(subjects.get(pk, []))] if value),
+            )
+            for pk, *fields in chunk
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchDocument',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='students.student')),
+                ('text', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Student Search Document',
+                'verbose_name_plural': 'Student Search Documents',
+            },
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
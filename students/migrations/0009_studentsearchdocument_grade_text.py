@@ -0,0 +1,105 @@
+# Generated by Django 5.1.5 on 2026-10-17 21:04
+
+from django.db import migrations, models
+
+TABLE = "students_studentsearchdocument"
+
+# Full-text index over both columns for the admin search; student_search keeps using {TABLE}_tsv.
+POSTGRESQL_INDEXES = [
+    f"CREATE INDEX {TABLE}_grade_tsv ON {TABLE} "
+    f"USING gin (to_tsvector('simple'::regconfig, text || ' ' || grade_text))",
+]
+
+
+def sqlite_fts(columns):
+    """The FTS5 table over ``columns`` of the documents and the triggers keeping it in sync."""
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"DROP TRIGGER IF EXISTS {TABLE}_ai",
+        f"DROP TRIGGER IF EXISTS {TABLE}_ad",
+        f"DROP TRIGGER IF EXISTS {TABLE}_au",
+        f"DROP TABLE IF EXISTS {TABLE}_fts",
+        f"CREATE VIRTUAL TABLE {TABLE}_fts USING fts5("
+        f"{names}, content='{TABLE}', content_rowid='student_id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {TABLE}_ai AFTER INSERT ON {TABLE} BEGIN "
+        f"INSERT INTO {TABLE}_fts(rowid, {names}) VALUES (new.student_id, {new}); END",
+        f"CREATE TRIGGER {TABLE}_ad AFTER DELETE ON {TABLE} BEGIN "
+        f"INSERT INTO {TABLE}_fts({TABLE}_fts, rowid, {names}) VALUES ('delete', old.student_id, {old}); END",
+        f"CREATE TRIGGER {TABLE}_au AFTER UPDATE ON {TABLE} BEGIN "
+        f"INSERT INTO {TABLE}_fts({TABLE}_fts, rowid, {names}) VALUES ('delete', old.student_id, {old}); "
+        f"INSERT INTO {TABLE}_fts(rowid, {names}) VALUES (new.student_id, {new}); END",
+        f"INSERT INTO {TABLE}_fts({TABLE}_fts) VALUES ('rebuild')",
+    ]
+
+
+def build_grade_texts(apps, schema_editor):
+    """Same grade text as students.search.refresh_search_documents(), for the existing documents."""
+    Grade = apps.get_model("students", "Grade")
+    GradeHistory = apps.get_model("students", "GradeHistory")
+    StudentSearchDocument = apps.get_model("students", "StudentSearchDocument")
+    documents = StudentSearchDocument.objects.order_by("pk").values_list("pk", flat=True)
+    last = 0
+    while chunk := list(documents.filter(pk__gt=last)[:2000]):
+        last = chunk[-1]
+        texts = {}
+        grades = Grade.objects.filter(student_id__in=chunk, teacher__full_name__gt="").order_by()
+        for student_id, name in grades.values_list("student_id", "teacher__full_name").distinct():
+            texts.setdefault(student_id, [[], []])[0].append(name)
+        histories = GradeHistory.objects.filter(grade__student_id__in=chunk, reason_for_update__gt="").order_by()
+        for student_id, reason in histories.values_list("grade__student_id", "reason_for_update").distinct():
+            texts.setdefault(student_id, [[], []])[1].append(reason)
+        StudentSearchDocument.objects.bulk_update(
+            [
+                StudentSearchDocument(student_id=pk, grade_text=" ".join([*sorted(teachers), *sorted(reasons)]))
+                for pk, (teachers, reasons) in texts.items()
+            ],
+            ["grade_text"],
+        )
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRESQL_INDEXES:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        for sql in sqlite_fts(["text", "grade_text"]):
+            schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TABLE}_grade_tsv")
+    elif vendor == "sqlite":
+        # The triggers read grade_text, so they must go before the column.
+        for trigger in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {TABLE}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}_fts")
+
+
+def restore_text_index(apps, schema_editor):
+    """Backwards, once the column is removed: the FTS5 table of 0008."""
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in sqlite_fts(["text"]):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_studentsearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_text_index),
+        migrations.AddField(
+            model_name='studentsearchdocument',
+            name='grade_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(build_grade_texts, migrations.RunPython.noop),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
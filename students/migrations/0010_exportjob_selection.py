@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:12
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    """Pickled queries cannot be turned into selections, so unfinished jobs have to be started again."""
+    ExportJob = apps.get_model("students", "ExportJob")
+    ExportJob.objects.filter(status__in=["pending", "running"]).update(
+        status="failed", reusable=False, error="Interrupted by an upgrade; please export again."
+    )
+    # Their fingerprints no longer match new jobs for the same selection.
+    ExportJob.objects.update(reusable=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_studentsearchdocument_grade_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        # A default lets the column be added back to the existing rows backwards.
+        migrations.AlterField(
+            model_name='exportjob',
+            name='query',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='selection',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -11,14 +11,20 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Avg
+from django.core.files import File
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.apps import apps
-from PIL import Image
+import numpy as np
 
 from teachers.models import Teacher  # Used in the Grade model
 
+from .bulk import update_rows
+from .recompute import schedule_recompute
+from .thumbnails import profile_image_url, schedule_profile_thumbnails
+from .utils import chunked
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -120,11 +126,114 @@ GPA_VALUES = {
     "F": Decimal("0.0"),
 }
 
+# Factor encodings, weights and thresholds of the academic performance index.
+# Shared by Student.calculate_academic_performance() and the bulk engine in
+# students.performance so that both always produce the same result.
+LEVEL_SCORES = {"Low": 0.0, "Moderate": 0.5, "High": 1.0}
+STUDY_LIFE_BALANCE_SCORES = {"Needs Improvement": 0.0, "Moderate": 0.5, "Good": 1.0}
+FAMILY_PRESSURE_SCORES = {"None": 1.0, "Low": 0.75, "Moderate": 0.5, "High": 0.25}
+SOCIAL_MEDIA_IMPACT_SCORES = {"Negative": 1.0, "Neutral": 0.5, "Positive": 0.0}
+CONTENT_TYPE_SCORES = {
+    "Educational": 1.0, "News": 0.8, "Sports": 0.7, "Entertainment": 0.5, "Gaming": 0.3, "Other": 0.6,
+}
+INCOME_CATEGORY_SCORES = {"Low": 0.0, "Middle": 0.5, "High": 1.0}
+
+# Weights for each factor (total weights sum to 1.0)
+PERFORMANCE_WEIGHTS = {
+    "attendance": 0.20,
+    "score": 0.35,
+    "study": 0.10,
+    "motivation": 0.10,
+    "stress": 0.05,       # Using (1 - stress_val) in calculation (high stress reduces performance)
+    "depression": 0.05,   # Absence of depression is beneficial
+    "balance": 0.05,
+    "pressures": 0.02,
+    "gaming": 0.03,       # gaming_val is already inverted (more gaming reduces performance)
+    "social_media": 0.02, # Using inverted social media impact (sm_val)
+    "content": 0.01,
+    "income": 0.02,
+}
+
+PERFORMANCE_THRESHOLDS = [
+    (0.85, "Excellent"),
+    (0.75, "Very Good"),
+    (0.65, "Good"),
+    (0.50, "Average"),
+]
+DEFAULT_PERFORMANCE_CATEGORY = "Needs Improvement"
+
 # A custom QuerySet for Student
 class StudentQuerySet(models.QuerySet):
     def active(self):
         return self.filter(is_active=True)
 
+    def with_weighted_average(self):
+        """
+        Annotate each student with ``weighted_average_score``: the credit-hour
+        weighted average of their grade scores (``None`` when they have no grades),
+        computed by the database in the same query as the students themselves.
+        """
+        average = (
+            Grade.objects.filter(student=OuterRef("pk"))
+            .order_by()
+            .values("student")
+            .annotate(
+                # Like the per-student calculation, 0 when no graded subject has credit hours.
+                average=Coalesce(
+                    Cast(Sum(_weighted_score()), models.FloatField()) / NullIf(Sum("subject__credit_hours"), 0),
+                    0.0,
+                    output_field=models.FloatField(),
+                )
+            )
+            .values("average")[:1]
+        )
+        return self.annotate(weighted_average_score=Subquery(average, output_field=models.FloatField()))
+
+def _weighted_score():
+    """A grade's score multiplied by its subject's credit hours."""
+    return ExpressionWrapper(
+        F("score") * F("subject__credit_hours"),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+class TrackedFieldsMixin:
+    """
+    Remembers the database values of ``tracked_fields`` so that ``save()`` can
+    tell which of them were actually changed on the instance.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _tracked_value(self, name):
+        value = self.__dict__[name]
+        # File fields hold mutable FieldFile objects; compare them by file name.
+        return value.name if isinstance(value, File) else value
+
+    def _snapshot_tracked_fields(self, update_fields=None):
+        # Deferred fields are absent from __dict__ and are simply not tracked.
+        names = [name for name in self.tracked_fields if name in self.__dict__]
+        loaded = getattr(self, "_loaded_values", None)
+        if update_fields is None or loaded is None:
+            self._loaded_values = {name: self._tracked_value(name) for name in names}
+        else:
+            # Fields left out of a save(update_fields=...) still differ from the database.
+            loaded.update((name, self._tracked_value(name)) for name in names if name in update_fields)
+
+    def get_dirty_fields(self):
+        """Return the tracked fields whose value differs from the one loaded from the database."""
+        loaded = getattr(self, "_loaded_values", None)
+        if self._state.adding or loaded is None:
+            return set(self.tracked_fields)
+        return {
+            name for name in self.tracked_fields
+            if name in self.__dict__ and (name not in loaded or loaded[name] != self._tracked_value(name))
+        }
+
 # =============================================================================
 # Optional Models
 # =============================================================================
@@ -169,8 +278,14 @@ class Disability(models.Model):
 # Student Model
 # =============================================================================
 
-class Student(models.Model):
+class Student(TrackedFieldsMixin, models.Model):
     """Represents a student with personal, academic, and guardian information."""
+    # Student columns that feed calculate_academic_performance().
+    PERFORMANCE_INPUT_FIELDS = {"attendance_percentage"}
+    # Student columns in the text of its StudentSearchDocument.
+    SEARCH_DOCUMENT_FIELDS = {"full_name", "email", "mobile"}
+    tracked_fields = ("attendance_percentage", "profile_image", "full_name", "email", "mobile")
+
     GRADE_LEVEL_CHOICES = [
         ("Grade 10", "Grade 10"),
         ("Grade 11", "Grade 11"),
@@ -204,6 +319,18 @@ class Student(models.Model):
     nationality = models.CharField(max_length=100, null=True, blank=True)
     address = models.TextField()
     profile_image = models.ImageField(upload_to="student_profiles/", null=True, blank=True)
+    profile_image_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 of the profile image; keys its generated thumbnails"
+    )
+    import_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 of the CSV row this student was last imported from"
+    )
     email = models.EmailField(unique=True, db_index=True)
     mobile = models.CharField(max_length=100, null=True, blank=True, db_index=True)
     emergency_contact_name = models.CharField(
@@ -285,43 +412,67 @@ class Student(models.Model):
 
     # -------------------------- UPDATED SAVE() --------------------------
     def save(self, *args, **kwargs):
-        # Save the student instance first if creating a new instance to set self.pk.
-        creating_new = self.pk is None
-        if creating_new:
-            super().save(*args, **kwargs)
-        # Calculate academic performance using the new weighted formula.
-        self.academic_performance, _ = self.calculate_academic_performance()
-        # Remove force_insert from kwargs if present to avoid duplicate insertion.
-        if 'force_insert' in kwargs:
-            kwargs.pop('force_insert')
-        # Save again to persist the updated academic performance.
+        # Only recompute academic performance when one of its inputs changed,
+        # and persist it in the same INSERT/UPDATE as the rest of the row.
+        update_fields = kwargs.get("update_fields")
+        dirty = self.get_dirty_fields()
+        if update_fields is not None:
+            dirty &= set(update_fields)
+        if dirty & self.PERFORMANCE_INPUT_FIELDS:
+            self.academic_performance, _ = self.calculate_academic_performance()
+            if update_fields is not None and "academic_performance" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "academic_performance"]
+        if "profile_image" in dirty:
+            # Thumbnails for the new image are generated off-request.
+            self.profile_image_hash = ""
+            if update_fields is not None and "profile_image_hash" not in kwargs["update_fields"]:
+                kwargs["update_fields"] = [*kwargs["update_fields"], "profile_image_hash"]
         super().save(*args, **kwargs)
-        # Resize profile image if necessary.
-        if self.profile_image:
-            # Check if the image name starts with "http" (i.e., it's a URL)
-            if self.profile_image.name.lower().startswith("http"):
-                # Skip image processing if it's a URL.
-                pass
-            else:
-                try:
-                    img = Image.open(self.profile_image.path)
-                    if img.height > 300 or img.width > 300:
-                        img.thumbnail((300, 300))
-                        img.save(self.profile_image.path)
-                except Exception:
-                    logger.exception("Error processing profile image for student: %s", self.full_name)
+        self._snapshot_tracked_fields(kwargs.get("update_fields"))
+        if "profile_image" in dirty and self.profile_image:
+            schedule_profile_thumbnails(self.pk)
+
+    def get_profile_image_url(self, size="profile"):
+        """
+        URL of the profile image at one of ``THUMBNAIL_SIZES`` ("avatar" or
+        "profile"), falling back to the original until its thumbnails are ready.
+        """
+        return profile_image_url(self, size)
     # -------------------------------------------------------------------
 
+    def refresh_academic_performance(self):
+        """
+        Recompute academic performance after a change to one of its related inputs
+        (grades, health, economic or technology information) and persist it with a
+        single ``UPDATE ... SET academic_performance``. Returns the category.
+        """
+        # A weighted_average_score annotation predates the change; query afresh.
+        self.__dict__.pop("weighted_average_score", None)
+        category, _ = self.calculate_academic_performance()
+        if category != self.academic_performance:
+            self.academic_performance = category
+            self.save(update_fields=["academic_performance"])
+        return category
+
     def get_average_score(self):
-        """Calculate the weighted average score from related Grade objects."""
-        grades_qs = self.grades.all().select_related('subject')
-        total_weight = 0
-        total_score = 0
-        for grade in grades_qs:
-            credit = grade.subject.credit_hours
-            total_score += grade.score * credit
-            total_weight += credit
-        return float(total_score / total_weight) if total_weight else 0.0
+        """
+        Calculate the credit-hour weighted average score of the student's grades.
+
+        Uses the ``weighted_average_score`` annotation when the student was loaded
+        through ``Student.objects.with_weighted_average()``, otherwise runs a single
+        aggregate query.
+        """
+        if hasattr(self, "weighted_average_score"):
+            return self.weighted_average_score or 0.0
+        if self.pk is None:
+            return 0.0
+        totals = self.grades.aggregate(
+            total_score=Sum(_weighted_score()),
+            total_weight=Sum("subject__credit_hours"),
+        )
+        if not totals["total_weight"]:
+            return 0.0
+        return float(totals["total_score"] / totals["total_weight"])
 
     def get_family_income_level_category(self):
         """Return 'Low', 'Middle', or 'High' based on family income level."""
@@ -352,11 +503,11 @@ class Student(models.Model):
         
         # 2. Encode psychosocial factors from HealthInformation
         if hasattr(self, 'health_information') and self.health_information:
-            motivation_val = {"Low": 0.0, "Moderate": 0.5, "High": 1.0}.get(self.health_information.motivation, 0.5)
-            stress_val = {"Low": 0.0, "Moderate": 0.5, "High": 1.0}.get(self.health_information.academic_stress, 0.5)
+            motivation_val = LEVEL_SCORES.get(self.health_information.motivation, 0.5)
+            stress_val = LEVEL_SCORES.get(self.health_information.academic_stress, 0.5)
             depression_val = 0.0 if not self.health_information.depression else 1.0
-            balance_val = {"Needs Improvement": 0.0, "Moderate": 0.5, "Good": 1.0}.get(self.health_information.study_life_balance, 0.5)
-            pressure_val = {"None": 1.0, "Low": 0.75, "Moderate": 0.5, "High": 0.25}.get(self.health_information.family_pressures, 0.5)
+            balance_val = STUDY_LIFE_BALANCE_SCORES.get(self.health_information.study_life_balance, 0.5)
+            pressure_val = FAMILY_PRESSURE_SCORES.get(self.health_information.family_pressures, 0.5)
         else:
             motivation_val = 0.5
             stress_val = 0.5
@@ -369,10 +520,9 @@ class Student(models.Model):
             daily_gaming_hours = self.tech_and_social.daily_gaming_hours
             # If the student does not game, consider negative impact as 0 (beneficial)
             gaming_val = 1 - min(daily_gaming_hours / 5.0, 1.0) if daily_gaming_hours > 0 else 1.0
-            sm_impact_val = {"Negative": 1.0, "Neutral": 0.5, "Positive": 0.0}.get(self.tech_and_social.social_media_impact_on_studies, 0.0)
+            sm_impact_val = SOCIAL_MEDIA_IMPACT_SCORES.get(self.tech_and_social.social_media_impact_on_studies, 0.0)
             sm_val = 1 - sm_impact_val  # Invert social media impact: higher negative impact gives a lower value
-            content_val = {"Educational": 1.0, "News": 0.8, "Sports": 0.7, "Entertainment": 0.5,
-                           "Gaming": 0.3, "Other": 0.6}.get(self.tech_and_social.content_type_watched, 0.0)
+            content_val = CONTENT_TYPE_SCORES.get(self.tech_and_social.content_type_watched, 0.0)
         else:
             gaming_val = 1.0
             sm_val = 1.0
@@ -383,25 +533,10 @@ class Student(models.Model):
             self.get_family_income_level_category()
             if hasattr(self, 'economic_situation') and self.economic_situation else "Low"
         )
-        income_val = {"Low": 0.0, "Middle": 0.5, "High": 1.0}.get(income_category, 0.5)
+        income_val = INCOME_CATEGORY_SCORES.get(income_category, 0.5)
         
-        # 5. Weights for each factor (total weights sum to 1.0)
-        weights = {
-            "attendance": 0.20,
-            "score": 0.35,
-            "study": 0.10,
-            "motivation": 0.10,
-            "stress": 0.05,       # Using (1 - stress_val) in calculation (high stress reduces performance)
-            "depression": 0.05,   # Absence of depression is beneficial
-            "balance": 0.05,
-            "pressures": 0.02,
-            "gaming": 0.03,       # gaming_val is already inverted (more gaming reduces performance)
-            "social_media": 0.02, # Using inverted social media impact (sm_val)
-            "content": 0.01,
-            "income": 0.02
-        }
-        
-        # 6. Compute performance index (ranging from 0.0 to 1.0)
+        # 5. Compute performance index (ranging from 0.0 to 1.0)
+        weights = PERFORMANCE_WEIGHTS
         perf_index = (
             weights["attendance"] * norm_attendance +
             weights["score"] * norm_score +
@@ -417,18 +552,12 @@ class Student(models.Model):
             weights["income"] * income_val
         )
         
-       # 7. Determine performance category based on thresholds
-
-        if perf_index >= 0.85:
-          performance_category = "Excellent"
-        elif perf_index >= 0.75:
-          performance_category = "Very Good"
-        elif perf_index >= 0.65:
-          performance_category = "Good"
-        elif perf_index >= 0.50:
-          performance_category = "Average"
-        else:
-          performance_category = "Needs Improvement"
+        # 6. Determine performance category based on thresholds
+        performance_category = DEFAULT_PERFORMANCE_CATEGORY
+        for threshold, category in PERFORMANCE_THRESHOLDS:
+            if perf_index >= threshold:
+                performance_category = category
+                break
         return performance_category, perf_index
 
 
@@ -437,8 +566,152 @@ class Student(models.Model):
 # Grade Model
 # =============================================================================
 
-class Grade(models.Model):
+CENT = Decimal("0.01")
+
+def compute_grade_metrics(scores, max_scores):
+    """
+    Vectorized equivalent of ``Grade.calculate_grade_metrics()``.
+
+    Takes sequences of scores and max scores (Decimals with two decimal places) and
+    returns ``(percentages, grade_levels, gpa_points)`` lists. Everything is done in
+    integer hundredths so grade boundaries and the half-even rounding of the stored
+    percentage match the Decimal arithmetic of the per-object method exactly.
+    """
+    score_cents = np.array([int(score * 100) for score in scores], dtype=np.int64)
+    max_cents = np.array([int(max_score * 100) for max_score in max_scores], dtype=np.int64)
+    valid = max_cents > 0
+    safe_max = np.where(valid, max_cents, 1)
+
+    # Percentage in hundredths, rounded half to even.
+    quotient, remainder = np.divmod(score_cents * 10000, safe_max)
+    round_up = (2 * remainder > safe_max) | ((2 * remainder == safe_max) & (quotient % 2 == 1))
+    percentage_cents = np.where(valid, quotient + round_up, 0)
+
+    # percentage >= threshold  <=>  score * 100 >= threshold * max_score (exactly).
+    conditions = [
+        np.where(valid, score_cents * 100 >= threshold * max_cents, threshold <= 0)
+        for _, threshold in SORTED_GRADE_THRESHOLDS
+    ]
+    grade_levels = np.select(conditions, [grade for grade, _ in SORTED_GRADE_THRESHOLDS], default="")
+
+    percentages = [Decimal(int(value)) * CENT for value in percentage_cents]
+    gpa_points = [GPA_VALUES.get(str(level), Decimal("0.0")) for level in grade_levels]
+    return percentages, [str(level) for level in grade_levels], gpa_points
+
+class GradeQuerySet(models.QuerySet):
+    def bulk_ingest(self, rows, batch_size=1000, recompute=True):
+        """
+        Create many grades at once.
+
+        ``rows`` is an iterable of dicts of Grade field values (e.g. ``student`` or
+        ``student_id``, ``subject`` or ``subject_id``, ``score`` and optionally
+        ``max_score``, ``exam_type``, ``semester``, ``teacher``, ``weight``).
+        Percentage, grade letter and GPA points are computed for all rows in one
+        vectorized pass, the grades are inserted with ``bulk_create``, and then each
+        affected trend and student is updated once. Pass ``recompute=False`` when
+        the caller recomputes academic performance itself. Returns the created grades.
+        """
+        from .export_jobs import expire_exports
+        from .performance import recompute_academic_performance
+        from .search import schedule_search_refresh
+
+        grades = [self.model(**row) for row in rows]
+        if not grades:
+            return []
+        for grade in grades:
+            grade.score = Decimal(str(grade.score)).quantize(CENT)
+            grade.max_score = Decimal(str(grade.max_score)).quantize(CENT)
+        percentages, grade_levels, gpa_points = compute_grade_metrics(
+            [grade.score for grade in grades], [grade.max_score for grade in grades]
+        )
+        deltas = {}
+        for grade, percentage, grade_level, gpa in zip(grades, percentages, grade_levels, gpa_points):
+            grade.percentage, grade.grade_level, grade.gpa_points = percentage, grade_level, gpa
+            total = deltas.setdefault((grade.student_id, grade.semester), [Decimal("0"), Decimal("0"), 0])
+            total[0] += percentage
+            total[1] += gpa
+            total[2] += 1
+
+        with transaction.atomic(using=self.db):
+            created = self.bulk_create(grades, batch_size=batch_size)
+            StudentPerformanceTrend.objects.apply_grade_deltas(deltas, batch_size=batch_size)
+            if recompute:
+                recompute_academic_performance(
+                    Student.objects.filter(pk__in={student_id for student_id, _ in deltas}),
+                    chunk_size=batch_size,
+                )
+            schedule_search_refresh({student_id for student_id, _ in deltas})
+            expire_exports()
+        return created
+
+    def delete(self):
+        """
+        Delete the grades and withdraw them from their trends with one batched
+        update, instead of one per grade from the post_delete signal.
+        """
+        from .export_jobs import expire_exports
+
+        deltas = {
+            (row["student_id"], row["semester"]): (-row["percentage_sum"], -row["gpa_sum"], -row["grade_count"])
+            for row in self.filter(percentage__isnull=False).order_by().values("student_id", "semester").annotate(
+                grade_count=Count("percentage"),
+                percentage_sum=Sum("percentage"),
+                gpa_sum=Coalesce(Sum("gpa_points"), Decimal("0")),
+            )
+        }
+        with transaction.atomic(using=self.db):
+            # Queued once for the queryset; the post_delete of each grade finds it queued.
+            expire_exports()
+            result = super().delete()
+            StudentPerformanceTrend.objects.apply_grade_deltas(deltas)
+        for student_id in {student_id for student_id, _ in deltas}:
+            schedule_recompute(student_id)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_remove(self, batch_size=1000, pairs=None):
+        """
+        Delete the grades and their history with raw DELETEs of ``batch_size``
+        grades, without the collector or any signals. The grades are read once
+        and every trend they belong to is updated once, after the deletes.
+        ``pairs``, if given, limits the removal to the grades whose ``(student_id,
+        subject_id)`` is in it. Stored exports are expired once; the caller
+        refreshes search documents and academic performance itself. Returns the
+        number of grades deleted.
+        """
+        from .export_jobs import expire_exports
+
+        grade_ids, deltas = [], {}
+        rows = self.order_by().values_list("pk", "student_id", "subject_id", "semester", "percentage", "gpa_points")
+        for pk, student_id, subject_id, semester, percentage, gpa_points in rows:
+            if pairs is not None and (student_id, subject_id) not in pairs:
+                continue
+            grade_ids.append(pk)
+            if percentage is not None:
+                total = deltas.setdefault((student_id, semester), [Decimal("0"), Decimal("0"), 0])
+                total[0] -= percentage
+                total[1] -= gpa_points or 0
+                total[2] -= 1
+        with transaction.atomic(using=self.db):
+            for batch in chunked(grade_ids, batch_size):
+                GradeHistory.objects.filter(grade_id__in=batch)._raw_delete(self.db)
+                self.model._base_manager.filter(pk__in=batch)._raw_delete(self.db)
+            StudentPerformanceTrend.objects.apply_grade_deltas(deltas, batch_size=batch_size)
+            expire_exports()
+        return len(grade_ids)
+
+    bulk_remove.alters_data = True
+    bulk_remove.queryset_only = True
+
+class Grade(TrackedFieldsMixin, models.Model):
     """Represents a student's grade in a specific subject."""
+    # Values that determine the grade's contribution to its StudentPerformanceTrend.
+    tracked_fields = ("student_id", "semester", "percentage", "gpa_points")
+
+    objects = GradeQuerySet.as_manager()
+
     student = models.ForeignKey(
         Student,
         on_delete=models.CASCADE,
@@ -496,24 +769,77 @@ class Grade(models.Model):
 
     def save(self, *args, **kwargs):
         self.calculate_grade_metrics()
+        previous = None if self._state.adding else getattr(self, "_loaded_values", None)
         super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+        self.update_trend(previous)
         self.update_performance()
 
+    def update_trend(self, previous=None):
+        """
+        Apply this grade's contribution to its StudentPerformanceTrend.
+
+        ``previous`` holds the tracked values as loaded from the database when an
+        existing grade is being updated; ``None`` means the grade is new.
+        """
+        Trend = StudentPerformanceTrend.objects
+        if previous is not None and set(previous) != set(self.tracked_fields):
+            # Some inputs were deferred, so the old contribution is unknown.
+            Trend.rebuild(self.student_id, self.semester)
+            return
+        if previous and previous["student_id"] == self.student_id and previous["semester"] == self.semester:
+            Trend.apply_grade_delta(
+                self.student_id, self.semester,
+                *_grade_contribution(self.__dict__, sign=1, previous=previous),
+            )
+            return
+        if previous:
+            Trend.apply_grade_delta(
+                previous["student_id"], previous["semester"], *_grade_contribution(previous, sign=-1)
+            )
+            schedule_recompute(previous["student_id"])
+        Trend.apply_grade_delta(self.student_id, self.semester, *_grade_contribution(self.__dict__, sign=1))
+
+    def remove_from_trend(self):
+        """Withdraw this (deleted) grade's contribution from its StudentPerformanceTrend."""
+        previous = getattr(self, "_loaded_values", None)
+        if previous is None or set(previous) != set(self.tracked_fields):
+            StudentPerformanceTrend.objects.rebuild(self.student_id, self.semester)
+        else:
+            StudentPerformanceTrend.objects.apply_grade_delta(
+                previous["student_id"], previous["semester"], *_grade_contribution(previous, sign=-1)
+            )
+        schedule_recompute(self.student_id)
+
     def update_performance(self):
-        """Update or create the StudentPerformanceTrend based on this grade."""
-        StudentPerformanceTrend = apps.get_model('students', 'StudentPerformanceTrend')
-        grades = self.student.grades.filter(semester=self.semester).aggregate(
-            avg_percentage=Avg("percentage"), avg_gpa=Avg("gpa_points")
+        """
+        Schedule the academic performance of this grade's student to be
+        recalculated once the current transaction commits.
+        """
+        schedule_recompute(self.student_id)
+
+def _grade_contribution(values, sign, previous=None):
+    """
+    Return the ``(percentage, gpa_points, count)`` a grade adds to its trend
+    (``sign=1``) or removes from it (``sign=-1``), net of ``previous`` if given.
+    """
+    def contribution(vals):
+        if vals["percentage"] is None:
+            return Decimal("0"), Decimal("0"), 0
+        # As stored (two decimal places), so deltas add up to what rebuild() sums.
+        return (
+            Decimal(vals["percentage"]).quantize(CENT),
+            Decimal(vals["gpa_points"] or 0).quantize(CENT),
+            1,
         )
-        StudentPerformanceTrend.objects.update_or_create(
-            student=self.student,
-            semester=self.semester,
-            defaults={
-                "average_percentage": grades["avg_percentage"] or 0,
-                "gpa": grades["avg_gpa"] or 0,
-            }
+
+    percentage, gpa_points, count = contribution(values)
+    if previous is not None:
+        old_percentage, old_gpa_points, old_count = contribution(previous)
+        percentage, gpa_points, count = (
+            percentage - old_percentage, gpa_points - old_gpa_points, count - old_count
         )
-        self.student.save()
+    return sign * percentage, sign * gpa_points, sign * count
 
 # =============================================================================
 # Grade History Model
@@ -548,7 +874,7 @@ class GradeHistory(models.Model):
 # HealthInformation Model (Only Requested Fields)
 # =============================================================================
 
-class HealthInformation(models.Model):
+class HealthInformation(TrackedFieldsMixin, models.Model):
     """
     Represents the student's health and psychological information.
     Physical: has_chronic_illness, general_health_status, last_medical_checkup, weight, height.
@@ -580,6 +906,7 @@ class HealthInformation(models.Model):
         ("good", "Good"),
         ("needs follow up", "Needs Follow Up"),
     ]
+    tracked_fields = ("motivation", "academic_stress", "depression", "study_life_balance", "family_pressures")
 
     student = models.OneToOneField(
         Student,
@@ -632,12 +959,21 @@ class HealthInformation(models.Model):
     def __str__(self):
         return f"Health Information for {self.student}"
 
+    def save(self, *args, **kwargs):
+        dirty = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+        if dirty:
+            self.student.refresh_academic_performance()
+
 # =============================================================================
 # EconomicSituation Model
 # =============================================================================
 
-class EconomicSituation(models.Model):
+class EconomicSituation(TrackedFieldsMixin, models.Model):
     """Represents the student's economic situation."""
+    tracked_fields = ("daily_study_hours", "family_income_level")
+
     student = models.OneToOneField(
         Student,
         on_delete=models.CASCADE,
@@ -707,12 +1043,21 @@ class EconomicSituation(models.Model):
             return self.family_income_level < (self.monthly_expenses * 2)
         return False
 
+    def save(self, *args, **kwargs):
+        dirty = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+        if dirty:
+            self.student.refresh_academic_performance()
+
 # =============================================================================
 # SocialMediaAndTechnology Model
 # =============================================================================
 
-class SocialMediaAndTechnology(models.Model):
+class SocialMediaAndTechnology(TrackedFieldsMixin, models.Model):
     """Represents the student's usage of electronic devices and social media."""
+    tracked_fields = ("daily_gaming_hours", "social_media_impact_on_studies", "content_type_watched")
+
     student = models.OneToOneField(
         Student,
         on_delete=models.CASCADE,
@@ -764,12 +1109,140 @@ class SocialMediaAndTechnology(models.Model):
     def __str__(self):
         return f"Social Media and Technology for {self.student.full_name}"
 
+    def save(self, *args, **kwargs):
+        dirty = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+        if dirty:
+            self.student.refresh_academic_performance()
+
 # =============================================================================
 # StudentPerformanceTrend Model
 # =============================================================================
 
+class StudentPerformanceTrendQuerySet(models.QuerySet):
+    def apply_grade_delta(self, student_id, semester, percentage, gpa_points, count):
+        """
+        Adjust the running sums of one (student, semester) trend by a grade being
+        added (``count=1``), removed (``count=-1``) or changed (``count=0``) with a
+        single atomic ``UPDATE``, creating the trend for the first grade.
+        """
+        trends = self.filter(student_id=student_id, semester=semester)
+        grade_count = F("grade_count") + count
+        percentage_sum = F("percentage_sum") + percentage
+        gpa_sum = F("gpa_sum") + gpa_points
+        if trends.update(
+            grade_count=grade_count,
+            percentage_sum=percentage_sum,
+            gpa_sum=gpa_sum,
+            average_percentage=_running_average(percentage_sum, grade_count),
+            gpa=_running_average(gpa_sum, grade_count),
+        ) or count <= 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    student_id=student_id,
+                    semester=semester,
+                    grade_count=count,
+                    percentage_sum=percentage,
+                    gpa_sum=gpa_points,
+                    average_percentage=percentage / count,
+                    gpa=gpa_points / count,
+                )
+        except IntegrityError:
+            # Another transaction created the trend first; add to it instead.
+            self.apply_grade_delta(student_id, semester, percentage, gpa_points, count)
+
+    def apply_grade_deltas(self, deltas, batch_size=1000):
+        """
+        Batched ``apply_grade_delta`` for many trends at once. ``deltas`` maps
+        ``(student_id, semester)`` to ``(percentage, gpa_points, count)``.
+
+        Existing trends are locked and written with one ``UPDATE ... FROM
+        (VALUES ...)`` per batch (see ``students.bulk``), missing ones are
+        inserted with ``bulk_create``; if another transaction created one of
+        them concurrently, the missing ones fall back to ``apply_grade_delta``.
+        """
+        if not deltas:
+            return
+        pending = dict(deltas)
+        trends = self.select_for_update().filter(
+            student_id__in={student_id for student_id, _ in pending},
+            semester__in={semester for _, semester in pending},
+        )
+        changed = []
+        for trend in trends:
+            delta = pending.pop((trend.student_id, trend.semester), None)
+            if delta is None:
+                continue
+            percentage, gpa_points, count = delta
+            trend.grade_count += count
+            trend.percentage_sum += percentage
+            trend.gpa_sum += gpa_points
+            trend.average_percentage = _decimal_average(trend.percentage_sum, trend.grade_count)
+            trend.gpa = _decimal_average(trend.gpa_sum, trend.grade_count)
+            changed.append(trend)
+        update_rows(
+            self.model, changed, ["grade_count", "percentage_sum", "gpa_sum", "average_percentage", "gpa"],
+            batch_size=batch_size, using=self.db,
+        )
+
+        to_create = [
+            self.model(
+                student_id=student_id,
+                semester=semester,
+                grade_count=count,
+                percentage_sum=percentage,
+                gpa_sum=gpa_points,
+                average_percentage=_decimal_average(percentage, count),
+                gpa=_decimal_average(gpa_points, count),
+            )
+            for (student_id, semester), (percentage, gpa_points, count) in pending.items()
+            if count > 0
+        ]
+        try:
+            with transaction.atomic(using=self.db):
+                self.bulk_create(to_create, batch_size=batch_size)
+        except IntegrityError:
+            for trend in to_create:
+                self.apply_grade_delta(
+                    trend.student_id, trend.semester, trend.percentage_sum, trend.gpa_sum, trend.grade_count
+                )
+
+    def rebuild(self, student_id, semester):
+        """Recalculate one trend from scratch from the student's grades."""
+        totals = Grade.objects.filter(student_id=student_id, semester=semester).aggregate(
+            grade_count=Count("percentage"),
+            percentage_sum=Coalesce(Sum("percentage"), Decimal("0")),
+            gpa_sum=Coalesce(Sum("gpa_points"), Decimal("0")),
+        )
+        count = totals["grade_count"]
+        self.update_or_create(
+            student_id=student_id,
+            semester=semester,
+            defaults={
+                **totals,
+                "average_percentage": totals["percentage_sum"] / count if count else 0,
+                "gpa": totals["gpa_sum"] / count if count else 0,
+            }
+        )
+
+def _decimal_average(total, count):
+    return (Decimal(total) / count).quantize(CENT) if count else Decimal("0.00")
+
+def _running_average(total, count):
+    """``total / count`` as a database expression, or 0 once no grades remain."""
+    return Coalesce(Cast(total, models.FloatField()) / NullIf(count, 0), 0.0, output_field=models.FloatField())
+
 class StudentPerformanceTrend(models.Model):
-    """Represents the student's performance trend for a specific semester."""
+    """
+    Represents the student's performance trend for a specific semester.
+
+    ``percentage_sum``, ``gpa_sum`` and ``grade_count`` are running aggregates kept
+    up to date by Grade saves and deletes, so the averages never need to be
+    re-aggregated over all of the student's grades.
+    """
     student = models.ForeignKey(
         Student,
         on_delete=models.CASCADE,
@@ -778,10 +1251,140 @@ class StudentPerformanceTrend(models.Model):
     semester = models.CharField(max_length=100, choices=SemesterChoices.choices)
     average_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     gpa = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    percentage_sum = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    gpa_sum = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    grade_count = models.PositiveIntegerField(default=0)
+
+    objects = StudentPerformanceTrendQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Student Performance Trend"
         verbose_name_plural = "Student Performance Trends"
+        constraints = [
+            models.UniqueConstraint(fields=["student", "semester"], name="unique_student_semester_trend"),
+        ]
 
     def __str__(self):
         return f"Performance Trend for {self.student.full_name} - {self.semester}"
+
+# =============================================================================
+# ImportCheckpoint Model
+# =============================================================================
+
+class ImportCheckpoint(models.Model):
+    """
+    Progress of ``import_full_students`` for one CSV file, identified by the
+    SHA-256 of its content. ``done_ranges`` holds the ``[first, last]`` file line
+    ranges whose rows have been committed, so an interrupted run can resume where
+    it stopped, whatever the order the chunks were written in.
+    """
+    file_hash = models.CharField(max_length=64, unique=True)
+    file_name = models.CharField(max_length=255)
+    done_ranges = models.JSONField(default=list, blank=True)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_rejected = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Import Checkpoint"
+        verbose_name_plural = "Import Checkpoints"
+        ordering = ["-updated_at"]
+
+    def __str__(self):
+        return f"Import of {self.file_name} ({self.file_hash[:12]})"
+
+    def mark_done(self, first_row, last_row, imported=0, unchanged=0, rejected=0):
+        """Record that rows ``first_row`` to ``last_row`` have been committed."""
+        ranges = sorted([*self.done_ranges, [first_row, last_row]])
+        merged = [ranges[0]]
+        for first, last in ranges[1:]:
+            if first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        self.done_ranges = merged
+        self.rows_imported += imported
+        self.rows_unchanged += unchanged
+        self.rows_rejected += rejected
+        self.save(update_fields=[
+            "done_ranges", "rows_imported", "rows_unchanged", "rows_rejected", "updated_at"
+        ])
+
+
+class StudentSearchDocument(models.Model):
+    """
+    The text ``student_search`` matches for a student: name, email, mobile and
+    the subjects of their grades. ``grade_text`` adds the teachers of their
+    grades and the reasons their grades were updated, which only the admin
+    search matches. Kept current by ``students.search`` and indexed there for
+    full-text and trigram search (PostgreSQL) or FTS5 (SQLite).
+    """
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name="search_document"
+    )
+    text = models.TextField()
+    grade_text = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Student Search Document"
+        verbose_name_plural = "Student Search Documents"
+
+    def __str__(self):
+        return f"Search document of student {self.student_id}"
+
+
+class ExportJob(models.Model):
+    """
+    An export produced outside the request by ``students.exports``: the
+    registered ``exporter`` writes the rows of the ``selection`` (see
+    ``students.export_jobs.queryset_selection()``) to ``file`` in media
+    storage, recording its progress, and a ``heartbeat_at``, as it goes.
+
+    ``fingerprint`` identifies the exporter and selection. A finished job stays
+    ``reusable`` until a change to the exported models clears the flag, so an
+    export of the same unchanged selection can be served from its file.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    exporter = models.CharField(max_length=50)
+    selection = models.JSONField(default=dict)
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    file = models.FileField(upload_to="exports/%Y/%m/", max_length=255, blank=True)
+    file_name = models.CharField(max_length=255, help_text="Name the file is downloaded as.")
+    reusable = models.BooleanField(default=False, db_index=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="export_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.get_status_display()})"
+
+    @property
+    def percent(self):
+        """Progress in percent, or ``None`` while the number of rows is unknown."""
+        if self.status == self.Status.DONE:
+            return 100
+        if not self.total:
+            return None
+        return min(100, self.processed * 100 // self.total)
@@ -0,0 +1,63 @@
+"""
+Work collected during a transaction and done once when it commits.
+
+``OnCommitBatch(flush)`` gathers items (e.g. student ids) from any number of
+calls on a thread and queues a single ``transaction.on_commit`` callback per
+transaction, which hands them all to ``flush``. Once queued, the batch is only
+referenced by that callback (the thread keeps a weak reference): when the
+transaction, or the savepoint the callback was queued in, is rolled back,
+Django discards the callback and the batch with its items, and the next call
+on the thread starts a new batch. Outside a transaction the batch is flushed
+straight away, as ``on_commit`` does.
+"""
+
+import threading
+import weakref
+
+from django.db import transaction
+
+
+class _Batch:
+    def __init__(self, owner):
+        self.owner = owner
+        self.items = set()
+
+    def run(self):
+        self.owner._forget(self)
+        self.owner.flush(self.items)
+
+
+class OnCommitBatch:
+    def __init__(self, flush):
+        self.flush = flush
+        self._local = threading.local()
+
+    def _batch(self):
+        ref = getattr(self._local, "ref", None)
+        batch = ref() if ref is not None else None
+        if batch is None:
+            # Held by the thread until the callback that flushes it is queued.
+            batch = self._local.held = _Batch(self)
+            self._local.ref = weakref.ref(batch)
+        return batch
+
+    def _forget(self, batch):
+        ref = getattr(self._local, "ref", None)
+        if ref is not None and ref() is batch:
+            self._local.ref = None
+
+    def add(self, items=(), register=True):
+        """
+        Add ``items`` to the thread's batch and, unless ``register`` is false,
+        make sure its flush is queued.
+        """
+        self._batch().items.update(items)
+        if register:
+            self.register()
+
+    def register(self):
+        """Queue the flush of the thread's batch, unless it already is."""
+        batch = self._batch()
+        if getattr(self._local, "held", None) is batch:
+            self._local.held = None
+            transaction.on_commit(batch.run)
@@ -0,0 +1,385 @@
+"""
+Parsing of full student records (user, student, subjects, grades and the
+health, economic and technology profiles) from CSV rows.
+
+Everything here is plain Python with no Django or database access, so it can
+run in worker processes: ``import_full_students --workers N`` splits the CSV
+into byte-range shards with ``plan_shards()`` and parses each one in its own
+process with ``parse_shard()``, while the main process writes the results.
+"""
+
+import csv
+import hashlib
+import time
+import traceback
+from bisect import bisect_right
+from datetime import date, datetime
+from decimal import Decimal
+
+from .utils import chunked
+
+
+# =============================================================================
+# Row parsing
+# =============================================================================
+
+# The helpers accept both CSV strings and the typed values read from Parquet or
+# Arrow files, which they pass through without any string parsing.
+
+def parse_date(s):
+    """Convert a string in 'YYYY-MM-DD' format to a date object."""
+    if isinstance(s, datetime):
+        return s.date()
+    if isinstance(s, date):
+        return s
+    try:
+        return datetime.strptime(s.strip(), "%Y-%m-%d").date()
+    except Exception:
+        return None
+
+
+def parse_decimal(s):
+    """Convert a string to a Decimal. Returns 0.0 if conversion fails."""
+    if isinstance(s, float):
+        s = repr(s)
+    try:
+        return Decimal(s)
+    except Exception:
+        return Decimal("0.0")
+
+
+def parse_float(s):
+    """Convert a string or number to a float. Returns 0.0 if conversion fails."""
+    try:
+        return float(s)
+    except Exception:
+        return 0.0
+
+
+def str_to_bool(s):
+    """Convert a string to a boolean value. Returns True if the string indicates 'yes', 'true', or '1'."""
+    if isinstance(s, str):
+        return s.strip().lower() in ['yes', 'true', '1']
+    return bool(s)
+
+
+def _text(row, key, default=""):
+    value = row.get(key)
+    return (default if value is None else str(value)).strip()
+
+
+def _int(row, key, default):
+    value = row.get(key)
+    if isinstance(value, int):
+        return value
+    return int(_text(row, key, str(default)) or default)
+
+
+def _none_if_unspecified(value):
+    return "None" if value.lower() in ["", "not specified"] else value
+
+
+def row_hash(row):
+    """SHA-256 of a raw row's content, used to skip rows unchanged since the last import."""
+    content = "\x1f".join(f"{key}={value}" for key, value in row.items())
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def parse_row(row):
+    """
+    Parse one raw CSV row, or a typed row read from a Parquet or Arrow file,
+    into a record dict ready for ``StudentImporter``.
+    Raises ``ValueError`` for rows that cannot be imported.
+    """
+    username = _text(row, 'user')
+    if not username:
+        raise ValueError("Missing 'user' field.")
+    email = _text(row, 'email', f"{username}@example.com")
+
+    enrollment_date = parse_date(row.get('enrollment_date'))
+    dob = parse_date(row.get('date_of_birth'))
+    if not enrollment_date or not dob:
+        raise ValueError("Missing enrollment_date or date_of_birth.")
+    gender = _text(row, 'gender', 'Male')
+
+    student = {
+        "full_name": _text(row, 'full_name'),
+        "enrollment_date": enrollment_date,
+        "date_of_birth": dob,
+        "gender": gender if gender in ["Male", "Female"] else "Male",
+        "nationality": _text(row, 'nationality', 'Not Specified'),
+        "address": _text(row, 'address', 'Not Specified'),
+        "profile_image": _text(row, 'profile_image'),
+        "email": email,
+        "mobile": _text(row, 'mobile'),
+        "emergency_contact_name": _text(row, 'emergency_contact_name', 'Not Specified'),
+        "emergency_contact": _text(row, 'emergency_contact', 'Not Specified'),
+        "guardian_relationship": _text(row, 'guardian_relationship', 'Other'),
+        "guardian_address": _text(row, 'guardian_address', 'Not Specified'),
+        "guardian_employment_status": _text(row, 'guardian_employment_status', 'Employed'),
+        "guardian_monthly_income": parse_decimal(row.get('guardian_monthly_income', '0')),
+        "guardian_education": _text(row, 'guardian_education', 'Not Specified'),
+        "grade_level": _text(row, 'grade_level'),
+        "attendance_percentage": parse_float(row.get('attendance_percentage', '0')),
+        "awards": _text(row, 'awards'),
+        "seat_zone": _text(row, 'seat_zone', 'Middle'),
+    }
+
+    # Subjects (comma separated, or a list); None means "leave the student's subjects alone".
+    subjects_value = row.get('subjects')
+    if isinstance(subjects_value, list):
+        subjects = [name.strip() for name in subjects_value if name and name.strip()] or None
+    else:
+        subjects_str = _text(row, 'subjects')
+        subjects = None
+        if subjects_str:
+            subjects = [name.strip() for name in subjects_str.split(',') if name.strip()]
+
+    # Grades (formatted as "subject:score;subject:score;...", or a list of
+    # {"subject": ..., "score": ...} structs)
+    grades_value = row.get('grades')
+    if isinstance(grades_value, list):
+        items = [(grade.get('subject') or '', grade.get('score')) for grade in grades_value]
+    else:
+        items = [item.split(':', 1) for item in _text(row, 'grades').split(';') if ':' in item]
+    grades = []
+    for subj, score in items:
+        subj = subj.strip()
+        if subj:
+            grades.append((subj, parse_decimal(score.strip() if isinstance(score, str) else score)))
+
+    health = {
+        "has_chronic_illness": str_to_bool(row.get('has_chronic_illness')),
+        "general_health_status": _text(row, 'general_health_status', 'good'),
+        "last_medical_checkup": parse_date(row.get('last_medical_checkup')),
+        "weight": parse_float(row.get('weight', '0')),
+        "height": parse_float(row.get('height', '0')),
+        "academic_stress": _text(row, 'academic_stress', 'Moderate'),
+        "motivation": _text(row, 'motivation', 'Moderate'),
+        "depression": str_to_bool(row.get('depression')),
+        "sleep_disorder": _text(row, 'sleep_disorder', 'None'),
+        "study_life_balance": _text(row, 'study_life_balance', 'Needs Improvement'),
+        "family_pressures": _none_if_unspecified(_text(row, 'family_pressures')),
+    }
+
+    economic = {
+        "is_orphan": str_to_bool(row.get('is_orphan')),
+        "father_occupation": _text(row, 'father_occupation'),
+        "mother_occupation": _text(row, 'mother_occupation'),
+        "parents_marital_status": _text(row, 'parents_marital_status'),
+        "family_income_level": parse_decimal(row.get('family_income_level', '0')),
+        "income_source": _text(row, 'income_source', 'Other'),
+        "monthly_expenses": parse_decimal(row.get('monthly_expenses', '0')),
+        "housing_status": _text(row, 'housing_status'),
+        "access_to_electricity": str_to_bool(row.get('access_to_electricity')),
+        "has_access_to_water": str_to_bool(row.get('has_access_to_water')),
+        "access_to_internet": str_to_bool(row.get('access_to_internet')),
+        "has_private_study_room": str_to_bool(row.get('has_private_study_room')),
+        "number_of_rooms_in_home": _int(row, 'number_of_rooms_in_home', 0),
+        "daily_food_availability": str_to_bool(row.get('daily_food_availability')),
+        "has_school_uniform": str_to_bool(row.get('has_school_uniform')),
+        "has_stationery": str_to_bool(row.get('has_stationery')),
+        "receives_scholarship": str_to_bool(row.get('receives_scholarship')),
+        "receives_private_tutoring": str_to_bool(row.get('receives_private_tutoring')),
+        "daily_study_hours": parse_float(row.get('daily_study_hours', '0')),
+        "works_after_school": str_to_bool(row.get('works_after_school')),
+        "work_hours_per_week": parse_float(row.get('work_hours_per_week', '0')),
+        "responsible_for_household_tasks": str_to_bool(row.get('responsible_for_household_tasks')),
+        "transportation_mode": _text(row, 'transportation_mode'),
+        "distance_to_school": parse_float(row.get('distance_to_school', '0')),
+        "has_health_insurance": str_to_bool(row.get('has_health_insurance')),
+        "household_size": _int(row, 'household_size', 1),
+        "sibling_rank": _int(row, 'sibling_rank', 0),
+    }
+
+    tech = {
+        "has_electronic_device": str_to_bool(row.get('has_electronic_device')),
+        "device_usage_purpose": _text(row, 'device_usage_purpose', 'Other'),
+        "has_social_media_accounts": str_to_bool(row.get('has_social_media_accounts')),
+        "daily_screen_time": parse_float(row.get('daily_screen_time', '0')),
+        "social_media_impact_on_studies": _none_if_unspecified(_text(row, 'social_media_impact_on_studies')),
+        "content_type_watched": _none_if_unspecified(_text(row, 'content_type_watched')),
+        "social_media_impact_on_sleep": _text(row, 'social_media_impact_on_sleep', 'None'),
+        "social_media_impact_on_focus": _text(row, 'social_media_impact_on_focus', 'Neutral'),
+        "plays_video_games": str_to_bool(row.get('plays_video_games')),
+        "daily_gaming_hours": parse_float(row.get('daily_gaming_hours', '0')),
+        "aware_of_cybersecurity": str_to_bool(row.get('aware_of_cybersecurity')),
+        "experienced_electronic_extortion": str_to_bool(row.get('experienced_electronic_extortion')),
+    }
+
+    return {
+        "row_hash": row_hash(row),
+        "username": username,
+        "email": email,
+        "student": student,
+        "subjects": subjects,
+        "grades": grades,
+        "health": health,
+        "economic": economic,
+        "tech": tech,
+    }
+
+
+def parse_chunk(numbered_rows):
+    """
+    Parse ``(row_number, row)`` pairs. Returns ``(records, rejects)``: the parsed
+    ``(row_number, record, row)`` triples and the ``(row_number, message, row)``
+    triples of the rows that could not be parsed.
+    """
+    records, rejects = [], []
+    for row_number, row in numbered_rows:
+        try:
+            records.append((row_number, parse_row(row), row))
+        except Exception as e:
+            rejects.append((row_number, str(e), row))
+    return records, rejects
+
+
+# =============================================================================
+# Byte-range shards and checkpoints
+# =============================================================================
+
+BLOCK_SIZE = 1 << 20
+
+
+def file_hash(path):
+    """SHA-256 of the file at ``path``, identifying it across import runs."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def skip_done(numbered_rows, done_ranges):
+    """Drop the ``(row_number, row)`` pairs inside the sorted ``[first, last]`` ``done_ranges``."""
+    if not done_ranges:
+        yield from numbered_rows
+        return
+    firsts = [first for first, _ in done_ranges]
+    for row_number, row in numbered_rows:
+        index = bisect_right(firsts, row_number) - 1
+        if index < 0 or row_number > done_ranges[index][1]:
+            yield row_number, row
+
+
+def read_header(path):
+    """Return the CSV's field names and the byte offset where the data starts."""
+    with open(path, 'rb') as f:
+        line = f.readline()
+        return next(csv.reader([line.decode('utf-8-sig')])), f.tell()
+
+
+def _offset_after_lines(f, start, count):
+    """Byte offset just past the ``count``-th line starting at ``start`` (or EOF)."""
+    f.seek(start)
+    position = start
+    while count:
+        block = f.read(BLOCK_SIZE)
+        if not block:
+            break
+        index = -1
+        while count:
+            index = block.find(b'\n', index + 1)
+            if index < 0:
+                break
+            count -= 1
+        if not count:
+            return position + index + 1
+        position += len(block)
+    return position
+
+
+def _count_lines(f, start, end):
+    f.seek(start)
+    lines, remaining = 0, end - start
+    while remaining > 0:
+        block = f.read(min(BLOCK_SIZE, remaining))
+        if not block:
+            break
+        lines += block.count(b'\n')
+        remaining -= len(block)
+    return lines
+
+
+def count_data_lines(path):
+    """Number of lines after the header of the CSV at ``path`` (blank lines included)."""
+    data_start = read_header(path)[1]
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        end = f.tell()
+        lines = _count_lines(f, data_start, end)
+        if end > data_start:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                lines += 1
+    return lines
+
+
+def plan_shards(path, count, limit=0):
+    """
+    Split the data lines of the CSV at ``path`` into at most ``count`` byte ranges
+    of similar size, each starting at the beginning of a line. With ``limit``,
+    only the first ``limit`` data lines are covered.
+
+    Returns ``(fieldnames, shards)`` where each shard is ``(start, end, first_line)``
+    and ``first_line`` is the file line number (the header being line 1) of its
+    first row. Sharding assumes one record per line, i.e. no quoted newlines.
+    """
+    fieldnames, data_start = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        end = f.tell()
+        if limit:
+            end = _offset_after_lines(f, data_start, limit)
+
+        boundaries = [data_start]
+        for i in range(1, count):
+            target = data_start + (end - data_start) * i // count
+            if target <= boundaries[-1]:
+                continue
+            # Move to the start of the line following the byte before ``target``.
+            f.seek(target - 1)
+            f.readline()
+            if boundaries[-1] < f.tell() < end:
+                boundaries.append(f.tell())
+        boundaries.append(end)
+
+        shards, first_line = [], 2
+        for start, stop in zip(boundaries, boundaries[1:]):
+            shards.append((start, stop, first_line))
+            first_line += _count_lines(f, start, stop)
+    return fieldnames, shards
+
+
+def read_shard_lines(path, start, end):
+    """Yield the decoded lines in the byte range ``[start, end)`` of ``path``."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def parse_shard(path, fieldnames, start, end, first_line, chunk_size, queue, done_ranges=()):
+    """
+    Worker process entry point: parse the rows of one shard outside
+    ``done_ranges`` and put ``(records, rejects, parse_seconds)`` chunks on
+    ``queue``, then ``None`` once done. If the worker fails, the
+    formatted traceback is put on the queue instead.
+    """
+    try:
+        reader = csv.DictReader(read_shard_lines(path, start, end), fieldnames=fieldnames)
+        numbered = ((first_line + reader.line_num - 1, row) for row in reader)
+        for chunk in chunked(skip_done(numbered, done_ranges), chunk_size):
+            started = time.perf_counter()
+            records, rejects = parse_chunk(chunk)
+            queue.put((records, rejects, time.perf_counter() - started))
+    except Exception:
+        queue.put(traceback.format_exc())
+    finally:
+        queue.put(None)
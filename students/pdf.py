@@ -0,0 +1,123 @@
+"""
+PDF documents of many records (students, reports) drawn as lines of text.
+
+Rendering is split into three steps:
+
+* layout: ``paginate()`` places the ``Line``s of every record on pages, in the
+  main process, as the records are read;
+* rendering: each page becomes one PDF text object (``page_code()``), which is
+  far cheaper than a ``drawString`` per line and is done for ranges of pages
+  in a process pool when ``workers > 1``;
+* assembly: the main process adds the rendered pages to one canvas in order.
+
+Every canvas, in the main process and in the workers, registers ``FONTS`` in
+the same order when it is created, so the font names used by the rendered
+pages refer to the same fonts in the final document.
+"""
+
+import multiprocessing
+from collections import namedtuple
+from io import BytesIO
+from itertools import islice
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+# One line of text: drawn at ``x`` with ``font`` at ``size``, followed by
+# ``advance`` points of vertical space.
+Line = namedtuple("Line", ["text", "font", "size", "x", "advance"])
+
+FONTS = ("Helvetica", "Helvetica-Bold")
+PAGE_SIZE = letter
+TOP = 750
+BOTTOM = 100
+PAGES_PER_TASK = 100
+
+
+def new_canvas(output, title=None):
+    """A canvas with the page size and fonts every page of these documents uses."""
+    pdf = canvas.Canvas(output, pagesize=PAGE_SIZE)
+    for font in FONTS:
+        pdf.setFont(font, 12)
+    if title:
+        pdf.setTitle(title)
+    return pdf
+
+
+def paginate(records):
+    """
+    Yield pages, as lists of ``(text, font, size, x, y)``, for ``records``, an
+    iterable of lists of ``Line``s. A line that would start below ``BOTTOM``
+    goes to the top of a new page.
+    """
+    page, y = [], TOP
+    for lines in records:
+        for line in lines:
+            if y < BOTTOM:
+                yield page
+                page, y = [], TOP
+            page.append((line.text, line.font, line.size, line.x, y))
+            y -= line.advance
+    if page:
+        yield page
+
+
+def page_code(pdf, page):
+    """The PDF operators drawing ``page`` as a single text object of ``pdf``."""
+    text = pdf.beginText()
+    font = None
+    for string, font_name, size, x, y in page:
+        if (font_name, size) != font:
+            text.setFont(font_name, size)
+            font = (font_name, size)
+        text.setTextOrigin(x, y)
+        text.textOut(string)
+    return text.getCode()
+
+
+# Canvas of a worker process, created once by ``_init_worker``.
+_worker_canvas = None
+
+
+def _init_worker():
+    global _worker_canvas
+    _worker_canvas = new_canvas(BytesIO())
+
+
+def _render_pages(pages):
+    return [page_code(_worker_canvas, page) for page in pages]
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def render_pdf(output, records, title=None, workers=1):
+    """
+    Write a PDF of ``records`` (an iterable of lists of ``Line``s) to
+    ``output``, a path or binary file object, rendering pages in ``workers``
+    processes. Returns the number of pages.
+    """
+    pdf = new_canvas(output, title)
+    pages = paginate(records)
+    if workers > 1:
+        pool = multiprocessing.get_context().Pool(workers, initializer=_init_worker)
+        rendered = pool.imap(_render_pages, _batches(pages, PAGES_PER_TASK))
+    else:
+        pool = None
+        rendered = ([page_code(pdf, page) for page in batch] for batch in _batches(pages, PAGES_PER_TASK))
+    count = 0
+    try:
+        for batch in rendered:
+            for code in batch:
+                pdf.addLiteral(code)
+                pdf.showPage()
+                count += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    pdf.save()
+    return count
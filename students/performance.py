@@ -0,0 +1,158 @@
+"""
+Bulk academic performance engine.
+
+``Student.calculate_academic_performance()`` works on one student at a time and
+issues a query per related model. ``recompute_academic_performance()`` instead
+loads every factor column for a whole queryset with a single ``values()`` query
+(joined across EconomicSituation, HealthInformation, SocialMediaAndTechnology and
+the weighted grade average), computes the index and category for all rows with
+NumPy arrays and writes the results back with chunked ``bulk_update``.
+"""
+
+import numpy as np
+from django.db.models import F
+
+from .export_jobs import expire_exports
+from .models import (
+    Student,
+    LEVEL_SCORES,
+    STUDY_LIFE_BALANCE_SCORES,
+    FAMILY_PRESSURE_SCORES,
+    SOCIAL_MEDIA_IMPACT_SCORES,
+    CONTENT_TYPE_SCORES,
+    INCOME_CATEGORY_SCORES,
+    PERFORMANCE_WEIGHTS,
+    PERFORMANCE_THRESHOLDS,
+    DEFAULT_PERFORMANCE_CATEGORY,
+)
+from .utils import chunked
+
+# Columns needed to compute the index, keyed by the name used in the arrays.
+FACTOR_COLUMNS = {
+    "pk": "pk",
+    "academic_performance": "academic_performance",
+    "attendance_percentage": "attendance_percentage",
+    "average_score": "weighted_average_score",
+    "daily_study_hours": "economic_situation__daily_study_hours",
+    "family_income_level": "economic_situation__family_income_level",
+    "motivation": "health_information__motivation",
+    "academic_stress": "health_information__academic_stress",
+    "depression": "health_information__depression",
+    "study_life_balance": "health_information__study_life_balance",
+    "family_pressures": "health_information__family_pressures",
+    "daily_gaming_hours": "tech_and_social__daily_gaming_hours",
+    "social_media_impact_on_studies": "tech_and_social__social_media_impact_on_studies",
+    "content_type_watched": "tech_and_social__content_type_watched",
+}
+
+
+def _encode(values, scores, default):
+    """Map an array of choice values to their scores, using ``default`` for anything else."""
+    encoded = np.full(len(values), default, dtype=np.float64)
+    for key, score in scores.items():
+        encoded[values == key] = score
+    return encoded
+
+
+def _as_float(values, default=0.0):
+    return np.array([default if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def compute_performance(columns):
+    """
+    Compute the academic performance index and category for many students at once.
+
+    ``columns`` maps each key of FACTOR_COLUMNS to a sequence with one entry per
+    student (``None`` where a related record is missing). Returns a tuple of
+    ``(index, categories)`` NumPy arrays matching the results of
+    ``Student.calculate_academic_performance()``.
+    """
+    def choices(name):
+        return np.array(columns[name], dtype=object)
+
+    # 1. Core academic metrics
+    norm_attendance = _as_float(columns["attendance_percentage"]) / 100.0
+    norm_score = _as_float(columns["average_score"]) / 100.0
+    norm_study = np.minimum(_as_float(columns["daily_study_hours"]) / 10.0, 1)
+
+    # 2. Psychosocial factors (missing values fall back to the same defaults as the model)
+    motivation_val = _encode(choices("motivation"), LEVEL_SCORES, 0.5)
+    stress_val = _encode(choices("academic_stress"), LEVEL_SCORES, 0.5)
+    depression_val = _as_float(columns["depression"])
+    balance_val = _encode(choices("study_life_balance"), STUDY_LIFE_BALANCE_SCORES, 0.5)
+    pressure_val = _encode(choices("family_pressures"), FAMILY_PRESSURE_SCORES, 0.5)
+
+    # 3. Technology/social factors
+    gaming_hours = _as_float(columns["daily_gaming_hours"])
+    gaming_val = np.where(gaming_hours > 0, 1 - np.minimum(gaming_hours / 5.0, 1.0), 1.0)
+    sm_val = 1 - _encode(choices("social_media_impact_on_studies"), SOCIAL_MEDIA_IMPACT_SCORES, 0.0)
+    content_val = _encode(choices("content_type_watched"), CONTENT_TYPE_SCORES, 0.0)
+
+    # 4. Socioeconomic factor (same bands as Student.get_family_income_level_category)
+    income = _as_float(columns["family_income_level"])
+    income_val = np.select(
+        [income < 500, income < 2000],
+        [INCOME_CATEGORY_SCORES["Low"], INCOME_CATEGORY_SCORES["Middle"]],
+        default=INCOME_CATEGORY_SCORES["High"],
+    )
+
+    weights = PERFORMANCE_WEIGHTS
+    index = (
+        weights["attendance"] * norm_attendance +
+        weights["score"] * norm_score +
+        weights["study"] * norm_study +
+        weights["motivation"] * motivation_val +
+        weights["stress"] * (1 - stress_val) +
+        weights["depression"] * (1 - depression_val) +
+        weights["balance"] * balance_val +
+        weights["pressures"] * pressure_val +
+        weights["gaming"] * gaming_val +
+        weights["social_media"] * sm_val +
+        weights["content"] * content_val +
+        weights["income"] * income_val
+    )
+    categories = np.select(
+        [index >= threshold for threshold, _ in PERFORMANCE_THRESHOLDS],
+        [category for _, category in PERFORMANCE_THRESHOLDS],
+        default=DEFAULT_PERFORMANCE_CATEGORY,
+    )
+    return index, categories
+
+
+def _recompute_chunk(rows):
+    columns = {key: [row[key] for row in rows] for key in FACTOR_COLUMNS}
+    _, categories = compute_performance(columns)
+    return [
+        Student(pk=pk, academic_performance=str(category))
+        for pk, current, category in zip(columns["pk"], columns["academic_performance"], categories)
+        if current != category
+    ]
+
+
+def recompute_academic_performance(queryset=None, chunk_size=2000):
+    """
+    Recompute ``academic_performance`` for every student in ``queryset`` (all
+    students by default), writing only the rows whose category changed.
+
+    Returns a ``(processed, updated)`` tuple.
+    """
+    if queryset is None:
+        queryset = Student.objects.all()
+    rows = (
+        queryset.order_by()
+        .with_weighted_average()
+        .values(
+            *[key for key, path in FACTOR_COLUMNS.items() if key == path],
+            **{key: F(path) for key, path in FACTOR_COLUMNS.items() if key != path},
+        )
+    )
+    processed = updated = 0
+    for chunk in chunked(rows.iterator(chunk_size=chunk_size), chunk_size):
+        changed = _recompute_chunk(chunk)
+        Student.objects.bulk_update(changed, ["academic_performance"], batch_size=chunk_size)
+        processed += len(chunk)
+        updated += len(changed)
+    if updated:
+        # bulk_update sends no signals.
+        expire_exports()
+    return processed, updated
@@ -0,0 +1,77 @@
+"""
+Coalesced recomputation of derived student performance data.
+
+Saving a grade used to recalculate the student's academic performance
+immediately, so entering 30 grades meant 30 full cascades. Instead,
+``schedule_recompute()`` adds the student to the thread's batch and every
+student of the batch is recalculated once when the surrounding transaction
+commits (see ``students.on_commit``). (Semester trends are kept current by
+Grade itself through running aggregates.)
+
+A rollback drops the batch along with its ids: the next transaction on the
+thread starts a new batch rather than inheriting them. Ids added inside a
+savepoint that is rolled back while the batch's flush stays queued outside it
+are still recalculated, which is harmless since recalculating only reads
+committed data.
+
+Batch operations can wrap their work in ``deferred_recompute()`` to suspend
+flushing altogether until the block exits.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.apps import apps
+
+from .on_commit import OnCommitBatch
+
+_state = threading.local()
+
+
+def _recompute(student_ids):
+    """
+    Recalculate the academic performance of ``student_ids`` with the bulk
+    engine (a query per 2000 students rather than several per student).
+    """
+    if not student_ids:
+        return
+
+    # Imported lazily: the performance engine depends on the models, which import this module.
+    from .performance import recompute_academic_performance
+
+    Student = apps.get_model('students', 'Student')
+    recompute_academic_performance(Student.objects.filter(pk__in=student_ids))
+
+
+_batch = OnCommitBatch(_recompute)
+
+
+def _suspended():
+    return getattr(_state, "suspended", 0)
+
+
+def schedule_recompute(student_id):
+    """Mark a student as needing their academic performance recalculated."""
+    _batch.add([student_id], register=not _suspended())
+
+
+@contextmanager
+def deferred_recompute():
+    """
+    Suspend recomputation for the duration of the block and flush every
+    pending student once on exit (after commit, if a transaction is still open).
+
+    Usage::
+
+        with deferred_recompute():
+            for row in rows:
+                Grade.objects.create(**row)
+    """
+    _state.suspended = _suspended() + 1
+    try:
+        yield
+    finally:
+        _state.suspended -= 1
+        # Rows saved before an error may already be committed, so flush either way.
+        if not _state.suspended:
+            _batch.register()
@@ -0,0 +1,244 @@
+"""
+Ranked, indexed student search.
+
+``student_search`` used to filter on ``full_name__icontains``, which scans the
+whole table, and rendered every match. It now searches
+``StudentSearchDocument``, one row per student holding their name, email,
+mobile and grade subjects, through the index of the database in use:
+
+* PostgreSQL: a GIN full-text index (``simple`` configuration, every word
+  matched as a prefix) and a GIN ``pg_trgm`` index for misspelled or partial
+  words, ranked by ``ts_rank`` plus word similarity;
+* SQLite: an FTS5 table over the documents, ranked by ``bm25``;
+* other databases: ``icontains`` on the document text, in student order.
+
+``SearchResults`` counts and slices the matches with ``LIMIT``/``OFFSET``, so
+it can be handed to a ``Paginator``. ``search_students()`` narrows a queryset
+to the students whose document, including the teachers and update reasons
+of their grades, matches; the admin searches with it instead of joining
+grades, teachers and grade histories. The indexes are created by migrations
+0008 and 0009. Documents are refreshed once per transaction for the students
+whose row, grades, grade teachers or grade histories changed
+(``schedule_search_refresh()``), and can be rebuilt with
+``manage.py rebuild_search_index``.
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Grade, GradeHistory, Student, StudentSearchDocument
+from .on_commit import OnCommitBatch
+from .utils import chunked
+
+TABLE = StudentSearchDocument._meta.db_table
+
+WORD = re.compile(r"\w+")
+
+
+def search_terms(query):
+    """The words of ``query``, lowercased, without punctuation or operators."""
+    return WORD.findall(query.lower())
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+class PostgresSearch:
+    # ``<%`` is pg_trgm's word similarity operator: the query is similar to some part of the text.
+    MATCH = (
+        f"FROM {TABLE} WHERE to_tsvector('simple'::regconfig, text) @@ to_tsquery('simple', %s) "
+        f"OR %s <%% text"
+    )
+
+    def __init__(self, terms):
+        self.tsquery = " & ".join(f"{term}:*" for term in terms)
+        self.text = " ".join(terms)
+
+    def students(self):
+        return RawSQL(
+            f"SELECT student_id FROM {TABLE} "
+            f"WHERE to_tsvector('simple'::regconfig, text || ' ' || grade_text) @@ to_tsquery('simple', %s)",
+            [self.tsquery],
+        )
+
+    def count(self, cursor):
+        cursor.execute(f"SELECT count(*) {self.MATCH}", [self.tsquery, self.text])
+        return cursor.fetchone()[0]
+
+    def ids(self, cursor, offset, limit):
+        cursor.execute(
+            f"SELECT student_id {self.MATCH} ORDER BY "
+            f"ts_rank(to_tsvector('simple'::regconfig, text), to_tsquery('simple', %s)) "
+            f"+ word_similarity(%s, text) DESC, student_id LIMIT %s OFFSET %s",
+            [self.tsquery, self.text, self.tsquery, self.text, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteSearch:
+    MATCH = f"FROM {TABLE}_fts WHERE {TABLE}_fts MATCH %s"
+
+    def __init__(self, terms):
+        # Quoted prefix terms, all required, in either column or only in ``text``.
+        self.terms = " ".join(f'"{term}"*' for term in terms)
+        self.match = f"text : ({self.terms})"
+
+    def students(self):
+        return RawSQL(f"SELECT rowid {self.MATCH}", [self.terms])
+
+    def count(self, cursor):
+        cursor.execute(f"SELECT count(*) {self.MATCH}", [self.match])
+        return cursor.fetchone()[0]
+
+    def ids(self, cursor, offset, limit):
+        cursor.execute(
+            f"SELECT rowid {self.MATCH} ORDER BY bm25({TABLE}_fts), rowid LIMIT %s OFFSET %s",
+            [self.match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class ContainsSearch:
+    def __init__(self, terms):
+        self.terms = terms
+        self.documents = StudentSearchDocument.objects.order_by("student_id")
+        for term in terms:
+            self.documents = self.documents.filter(text__icontains=term)
+
+    def students(self):
+        documents = StudentSearchDocument.objects.order_by()
+        for term in self.terms:
+            documents = documents.filter(Q(text__icontains=term) | Q(grade_text__icontains=term))
+        return documents.values("student_id")
+
+    def count(self, cursor):
+        return self.documents.count()
+
+    def ids(self, cursor, offset, limit):
+        return list(self.documents.values_list("student_id", flat=True)[offset:offset + limit])
+
+
+BACKENDS = {"postgresql": PostgresSearch, "sqlite": SQLiteSearch}
+
+
+class SearchResults:
+    """
+    The students matching ``query``, best first. Supports ``count()`` and
+    slicing, each of which runs one indexed query (plus one to load the
+    students of a slice), so a ``Paginator`` reads only the page it shows.
+    """
+
+    def __init__(self, query):
+        self.terms = search_terms(query)
+        self.backend = BACKENDS.get(connection.vendor, ContainsSearch)(self.terms) if self.terms else None
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if self.backend is None:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    self._count = self.backend.count(cursor)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError("SearchResults only supports slicing without a step.")
+        offset = index.start or 0
+        limit = (index.stop if index.stop is not None else self.count()) - offset
+        if self.backend is None or limit <= 0:
+            return []
+        with connection.cursor() as cursor:
+            ids = self.backend.ids(cursor, offset, limit)
+        students = Student.objects.in_bulk(ids)
+        return [students[pk] for pk in ids if pk in students]
+
+
+def search_students(queryset, query):
+    """
+    ``queryset`` narrowed to the students whose search document, grade text
+    included, matches every word of ``query`` (as a prefix, except on other
+    databases than PostgreSQL and SQLite). Unlike ``SearchResults`` this
+    keeps the queryset's ordering and runs as a subquery, for the admin.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    return queryset.filter(pk__in=BACKENDS.get(connection.vendor, ContainsSearch)(terms).students())
+
+
+# =============================================================================
+# Documents
+# =============================================================================
+
+def document_text(full_name, email, mobile, subjects):
+    return " ".join(value for value in [full_name, email, mobile, *sorted(subjects)] if value)
+
+
+def document_grade_text(teachers, reasons):
+    return " ".join(value for value in [*sorted(teachers), *sorted(reasons)] if value)
+
+
+def _texts_by_student(rows):
+    texts = {}
+    for student_id, text in rows:
+        texts.setdefault(student_id, []).append(text)
+    return texts
+
+
+def refresh_search_documents(student_ids, chunk_size=2000):
+    """Rebuild the search documents of ``student_ids``, a chunk of students per transaction."""
+    for chunk in chunked(student_ids, chunk_size):
+        grades = Grade.objects.filter(student_id__in=chunk).order_by()
+        subjects = _texts_by_student(grades.values_list("student_id", "subject__name").distinct())
+        teachers = _texts_by_student(
+            grades.filter(teacher__full_name__gt="").values_list("student_id", "teacher__full_name").distinct()
+        )
+        histories = GradeHistory.objects.filter(grade__student_id__in=chunk).order_by()
+        reasons = _texts_by_student(
+            histories.filter(reason_for_update__gt="").values_list("grade__student_id", "reason_for_update").distinct()
+        )
+        students = Student.objects.filter(pk__in=chunk).order_by().values_list("pk", "full_name", "email", "mobile")
+        documents = [
+            StudentSearchDocument(
+                student_id=pk,
+                text=document_text(*fields, subjects.get(pk, [])),
+                grade_text=document_grade_text(teachers.get(pk, []), reasons.get(pk, [])),
+            )
+            for pk, *fields in students
+        ]
+        with transaction.atomic():
+            StudentSearchDocument.objects.filter(student_id__in=chunk).delete()
+            StudentSearchDocument.objects.bulk_create(documents)
+
+
+def rebuild_search_documents(chunk_size=2000):
+    """Rebuild the search documents of every student. Returns the number of students."""
+    student_ids = Student.objects.order_by("pk").values_list("pk", flat=True)
+    count = 0
+    for chunk in chunked(student_ids.iterator(chunk_size=chunk_size), chunk_size):
+        refresh_search_documents(chunk, chunk_size)
+        count += len(chunk)
+    StudentSearchDocument.objects.exclude(student_id__in=Student.objects.values("pk")).delete()
+    return count
+
+
+def _refresh(student_ids):
+    if student_ids:
+        refresh_search_documents(sorted(student_ids))
+
+
+_refresh_batch = OnCommitBatch(_refresh)
+
+
+def schedule_search_refresh(student_ids):
+    """Refresh the search documents of ``student_ids`` once the current transaction commits."""
+    _refresh_batch.add(student_ids)
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .export_jobs import expire_exports
+from .models import Grade, GradeHistory, Student, Subject
+from .search import schedule_search_refresh
+from .typeahead import student_typeahead
+from teachers.models import Teacher
+
+# Deleting these cascades to the student's trends as well, so there is nothing to maintain.
+STUDENT_OWNERS = {"students.Student", settings.AUTH_USER_MODEL}
+
+
+@receiver(post_delete, sender=Grade)
+def remove_grade_from_trend(sender, instance, origin=None, **kwargs):
+    # Covers single deletes and cascades from Subject; GradeQuerySet.delete()
+    # updates the trends itself in one batch.
+    if origin is not None:
+        model = origin.model if isinstance(origin, QuerySet) else type(origin)
+        if model._meta.label in STUDENT_OWNERS or model is Grade and isinstance(origin, QuerySet):
+            return
+    instance.remove_from_trend()
+
+
+@receiver(post_save, sender=Student)
+def refresh_student_search_document(sender, instance, update_fields=None, **kwargs):
+    # Student.save() snapshots the tracked fields after post_save, so they are still dirty here.
+    dirty = instance.get_dirty_fields()
+    if update_fields is not None:
+        dirty &= update_fields
+    if dirty & Student.SEARCH_DOCUMENT_FIELDS:
+        schedule_search_refresh([instance.pk])
+
+
+@receiver(post_save, sender=Student)
+def update_student_typeahead(sender, instance, **kwargs):
+    pk, full_name, email = instance.pk, instance.full_name, instance.email
+    transaction.on_commit(lambda: student_typeahead.update(pk, full_name, email))
+
+
+@receiver(post_delete, sender=Student)
+def remove_student_typeahead(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: student_typeahead.remove(pk))
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def refresh_grade_search_document(sender, instance, **kwargs):
+    # Documents list the subjects of the student's grades.
+    schedule_search_refresh([instance.student_id])
+
+
+@receiver(post_save, sender=Subject)
+def refresh_subject_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        schedule_search_refresh(
+            Grade.objects.filter(subject=instance).order_by().values_list("student_id", flat=True).distinct()
+        )
+
+
+@receiver(post_save, sender=Teacher)
+def refresh_teacher_search_documents(sender, instance, created, **kwargs):
+    # Documents list the teachers of the student's grades.
+    if not created:
+        schedule_search_refresh(
+            Grade.objects.filter(teacher=instance).order_by().values_list("student_id", flat=True).distinct()
+        )
+
+
+@receiver(pre_delete, sender=Teacher)
+def refresh_deleted_teacher_search_documents(sender, instance, **kwargs):
+    # Before the delete sets the grades' teacher to NULL, which sends no signal for the grades.
+    refresh_teacher_search_documents(sender, instance, created=False)
+
+
+@receiver(post_save, sender=GradeHistory)
+@receiver(post_delete, sender=GradeHistory)
+def refresh_grade_history_search_document(sender, instance, **kwargs):
+    # Documents list the reasons of the student's grade updates. A grade deleted
+    # along with its history refreshes the document itself.
+    schedule_search_refresh(Grade.objects.filter(pk=instance.grade_id).values_list("student_id", flat=True))
+
+
+# Models whose rows appear in the exports: changing one makes the stored export files stale.
+EXPORTED_MODELS = [
+    "students.Student",
+    "students.Grade",
+    "students.Subject",
+    "students.HealthInformation",
+    "students.EconomicSituation",
+    "students.SocialMediaAndTechnology",
+    "reports.Report",
+]
+
+
+def expire_stored_exports(sender, **kwargs):
+    expire_exports()
+
+
+for model in EXPORTED_MODELS:
+    post_save.connect(expire_stored_exports, sender=model, dispatch_uid=f"expire_exports_saved_{model}")
+    post_delete.connect(expire_stored_exports, sender=model, dispatch_uid=f"expire_exports_deleted_{model}")
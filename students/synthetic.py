@@ -0,0 +1,382 @@
+"""
+Synthetic full student records for load and scale testing.
+
+The columns are the ones ``import_full_students`` reads. Every column of a
+chunk is drawn as one NumPy array from a seeded generator, and the free-text
+columns (names, addresses, jobs, ...) are picked from pools that Faker fills
+once per generator instead of once per row. Usernames are made unique by
+suffixing the row number rather than with ``fake.unique``, whose cost grows
+with the number of values already used.
+
+The same seed, locale, chunk size and ``as_of`` date always give the same
+rows, and each chunk depends only on the seed and its index, so chunks can be
+generated in any order and in any process: ``write_shards()`` splits them into
+shard files written in parallel, listed in a JSON manifest.
+
+Like ``students.parsing``, this module has no Django dependency.
+"""
+
+import json
+import multiprocessing
+import os
+from datetime import date
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from faker import Faker
+
+SUBJECTS = [
+    "Mathematics", "Art", "Physics", "Chemistry",
+    "History", "English Language", "Geography", "Biology",
+]
+
+# Approximate academic performance of a student -> range of their base score.
+PERFORMANCE_LEVELS = {
+    "Excellent": (80, 95),
+    "Good": (65, 80),
+    "Average": (50, 65),
+    "Needs Improvement": (30, 50),
+}
+PERFORMANCE_WEIGHTS = [0.15, 0.35, 0.35, 0.15]
+
+GRADE_TYPE = pa.struct([
+    ("subject", pa.string()),
+    ("score", pa.decimal128(5, 2)),
+])
+
+FILE_FORMATS = ["csv", "parquet", "arrow"]
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+class StudentDataGenerator:
+    """
+    Generate chunks of student rows as Arrow tables.
+
+    ``typed`` chunks (for Parquet and Arrow) have ``subjects`` as a list of
+    names and ``grades`` as a list of ``{subject, score}`` structs; untyped
+    chunks (for CSV) have them as the ``"a, b"`` and ``"a:90; b:75"`` strings
+    the CSV importer expects.
+    """
+
+    def __init__(self, seed=None, locale="en_US", pool_size=5000, as_of=None,
+                 subjects=SUBJECTS, subjects_per_student=(2, len(SUBJECTS))):
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.locale = locale
+        self.as_of = np.datetime64(as_of or date.today(), "D")
+        self.subjects = pa.array(subjects)
+        self.subjects_per_student = subjects_per_student
+        self.pools = self._build_pools(locale, pool_size)
+
+    def _build_pools(self, locale, size):
+        fake = Faker(locale)
+        fake.seed_instance(self.seed)
+
+        def pool(make):
+            return pa.array([make() for _ in range(size)])
+
+        return {
+            "user": pool(fake.user_name),
+            "name": pool(fake.name),
+            "country": pool(fake.country),
+            "address": pool(lambda: fake.address().replace("\n", ", ")),
+            "image": pool(fake.image_url),
+            "phone": pool(fake.phone_number),
+            "job": pool(fake.job),
+            "domain": pool(fake.free_email_domain),
+        }
+
+    # =========================================================================
+    # Columns
+    # =========================================================================
+
+    def chunk(self, index, start, size, typed=True):
+        """
+        Rows ``start`` to ``start + size`` as an Arrow table, drawn from a
+        generator seeded with ``(seed, index)``.
+        """
+        rng = np.random.default_rng([self.seed, index])
+
+        def pick(pool):
+            pool = self.pools[pool]
+            return pool.take(rng.integers(len(pool), size=size))
+
+        def choice(options, p=None):
+            return pa.array(options).take(rng.choice(len(options), size=size, p=p))
+
+        def flag(p=0.5):
+            return rng.random(size) < p
+
+        def uniform(low, high, decimals):
+            return np.round(rng.uniform(low, high, size), decimals)
+
+        def days_before(low, high):
+            return self.as_of - rng.integers(low, high, size=size)
+
+        row_numbers = pa.array(np.arange(start, start + size)).cast(pa.string())
+        # The row number follows the last ".", so pool names ending in digits can't collide.
+        user = pc.binary_join_element_wise(pick("user"), row_numbers, ".")
+        email = pc.binary_join_element_wise(user, pick("domain"), "@")
+
+        columns = {
+            # Personal information
+            "user": user,
+            "full_name": pick("name"),
+            "date_of_birth": days_before(16 * 365, 18 * 365 + 1),
+            "gender": choice(["Male", "Female"]),
+            "nationality": pick("country"),
+            "address": pick("address"),
+            "profile_image": pick("image"),
+            "email": email,
+            "mobile": pick("phone"),
+            "emergency_contact_name": pick("name"),
+            "emergency_contact": pick("phone"),
+            "enrollment_date": days_before(0, 3 * 365 + 1),
+            # Guardian information
+            "guardian_relationship": choice(["Father", "Mother", "Sibling", "Other"]),
+            "guardian_address": pick("address"),
+            "guardian_employment_status": choice(["Employed", "Unemployed", "Retired"]),
+            "guardian_monthly_income": uniform(1000.0, 5000.0, 2),
+            "guardian_education": choice(["Primary", "Secondary", "Bachelor's", "Master's", "PhD"]),
+            # Academic information
+            "grade_level": choice(["Grade 10", "Grade 11", "Grade 12"]),
+            "subjects": None,
+            "attendance_percentage": uniform(75, 100, 2),
+            "awards": choice(["Honor Roll", "Excellence Award", "Outstanding Achievement", "Not Specified"]),
+            "seat_zone": choice(["Front", "Middle", "Back", "Side"]),
+            "grades": None,
+        }
+        columns["subjects"], columns["grades"] = self._subjects_and_grades(rng, size, typed)
+
+        stress = ["Low", "Moderate", "High"]
+        columns.update({
+            # Health information
+            "has_chronic_illness": flag(),
+            "general_health_status": choice(["good", "needs follow up"]),
+            "last_medical_checkup": days_before(0, 2 * 365 + 1),
+            "weight": uniform(50, 90, 1),
+            "height": uniform(155, 185, 1),
+            "academic_stress": choice(stress),
+            "motivation": choice(stress),
+            "depression": flag(),
+            "sleep_disorder": choice(["Not Specified", "Low", "Moderate", "High"]),
+            "study_life_balance": choice(["Needs Improvement", "Moderate", "Good"]),
+            "family_pressures": choice(["Not Specified", "Low", "Moderate", "High"]),
+        })
+
+        works_after_school = flag()
+        access_to_internet = flag()
+        columns.update({
+            # Economic situation
+            "is_orphan": flag(),
+            "father_occupation": pick("job"),
+            "mother_occupation": pick("job"),
+            "parents_marital_status": choice(["Married", "Divorced", "Separated", "Widowed", "Single"]),
+            "family_income_level": uniform(500, 5000, 2),
+            "income_source": choice(["Salary", "Business", "Aid", "Other"]),
+            "monthly_expenses": uniform(500, 3000, 2),
+            "housing_status": choice(["Owned", "Rented", "Shared", "Temporary Shelter", "Not Specified"]),
+            "access_to_electricity": np.ones(size, dtype=bool),
+            "has_access_to_water": np.ones(size, dtype=bool),
+            "access_to_internet": access_to_internet,
+            "has_private_study_room": flag(),
+            "number_of_rooms_in_home": rng.integers(2, 6, size=size),
+            "daily_food_availability": flag(),
+            "has_school_uniform": flag(),
+            "has_stationery": flag(),
+            "receives_scholarship": flag(),
+            "receives_private_tutoring": flag(),
+            "daily_study_hours": uniform(2, 6, 1),
+            "works_after_school": works_after_school,
+            "work_hours_per_week": np.where(works_after_school, rng.integers(1, 11, size=size), 0),
+            "responsible_for_household_tasks": flag(),
+            "transportation_mode": choice(["Bus", "Car", "Bicycle", "Walking", "Not Specified"]),
+            "distance_to_school": uniform(0.5, 5, 1),
+            "has_health_insurance": flag(),
+            "household_size": rng.integers(3, 8, size=size),
+            "sibling_rank": rng.integers(1, 4, size=size),
+        })
+
+        # Without a device or internet access there is no screen time and no
+        # social media, and without social media none of its impacts.
+        has_electronic_device = flag()
+        online = has_electronic_device & access_to_internet
+        social = flag() & online
+        plays_video_games = flag()
+        impacts = ["Positive", "Negative", "Neutral", "Not Specified"]
+
+        def when_social(values, otherwise):
+            return pc.if_else(pa.array(social), values, otherwise)
+
+        columns.update({
+            # Social media and technology
+            "has_electronic_device": has_electronic_device,
+            "device_usage_purpose": pc.if_else(
+                pa.array(online), choice(["Education", "Entertainment", "Gaming", "Work", "Other"]), "Not Specified"
+            ),
+            "has_social_media_accounts": social,
+            "daily_screen_time": np.where(online, uniform(1, 4, 1), 0.0),
+            "social_media_impact_on_studies": when_social(choice(impacts), "Not Specified"),
+            "content_type_watched": when_social(
+                choice(["Educational", "Entertainment", "News", "Sports", "Gaming", "Other"]), "Not Specified"
+            ),
+            "social_media_impact_on_sleep": when_social(choice(impacts), "Not Specified"),
+            "social_media_impact_on_focus": when_social(choice(impacts), "Not Specified"),
+            "plays_video_games": plays_video_games,
+            "daily_gaming_hours": np.where(plays_video_games, uniform(0.5, 2, 1), 0.0),
+            "aware_of_cybersecurity": flag(),
+            "experienced_electronic_extortion": social & flag(),
+        })
+        return pa.table(columns)
+
+    def _subjects_and_grades(self, rng, size, typed):
+        """
+        A random subset of the subjects for every student, with a score per
+        subject drawn around a base score picked from the student's
+        performance level.
+        """
+        subject_count = len(self.subjects)
+        low, high = self.subjects_per_student
+        counts = rng.integers(low, high + 1, size=size)
+        # Shuffle the subject indices of every row and keep the first ``count``.
+        order = np.argsort(rng.random((size, subject_count)), axis=1)
+        keep = np.arange(subject_count) < counts[:, None]
+        subject_index = order[keep]
+        offsets = pa.array(np.concatenate([[0], np.cumsum(counts)]), pa.int32())
+
+        ranges = np.array(list(PERFORMANCE_LEVELS.values()), dtype=float)
+        level = rng.choice(len(ranges), size=size, p=PERFORMANCE_WEIGHTS)
+        base = rng.uniform(ranges[level, 0], ranges[level, 1])
+        scores = np.clip(np.round(rng.normal(base[:, None], 5, (size, subject_count)), 2), 0, 100)
+        scores = pa.array(scores[keep])
+
+        names = self.subjects.take(subject_index)
+        if typed:
+            grades = pa.StructArray.from_arrays(
+                [names, pc.cast(scores, GRADE_TYPE.field("score").type, safe=False)],
+                fields=list(GRADE_TYPE),
+            )
+            return pa.ListArray.from_arrays(offsets, names), pa.ListArray.from_arrays(offsets, grades)
+        pairs = pc.binary_join_element_wise(names, scores.cast(pa.string()), ":")
+        return (
+            pc.binary_join(pa.ListArray.from_arrays(offsets, names), ", "),
+            pc.binary_join(pa.ListArray.from_arrays(offsets, pairs), "; "),
+        )
+
+    # =========================================================================
+    # Writing
+    # =========================================================================
+
+    def tables(self, chunks, typed=True):
+        """Yield a table for every ``(index, start, size)`` chunk of ``plan_chunks()``."""
+        for index, start, size in chunks:
+            yield self.chunk(index, start, size, typed)
+
+    def write(self, path, num_records, file_format="csv", chunk_size=50000, chunks=None):
+        """
+        Write ``num_records`` rows to ``path`` as CSV, Parquet or Arrow IPC, one
+        chunk at a time (only ``chunks`` of them if given, for a shard).
+        Returns the number of rows written.
+        """
+        if chunks is None:
+            chunks = plan_chunks(num_records, chunk_size)
+        typed = file_format != "csv"
+        writer = _open_writer(path, file_format, self.chunk(0, 0, 0, typed).schema)
+        written = 0
+        with writer:
+            for table in self.tables(chunks, typed):
+                writer.write_table(table)
+                written += table.num_rows
+        return written
+
+    def write_shards(self, path, num_records, file_format="csv", chunk_size=50000, shards=2, workers=1):
+        """
+        Write ``num_records`` rows as ``shards`` files next to ``path``, using
+        ``workers`` processes, plus a manifest listing them (see
+        ``manifest_path()``), which ``import_full_students`` accepts in place of
+        a data file. Shards are cut at chunk boundaries and chunks keep their
+        seeds, so at a given chunk size the rows are the same for any number of
+        shards. Returns the manifest as a dict.
+        """
+        # Every shard needs at least one chunk.
+        chunk_size = max(1, min(chunk_size, -(-num_records // shards)))
+        chunks = plan_chunks(num_records, chunk_size)
+        # Contiguous runs of chunks, as even as possible.
+        per_shard, extra = divmod(len(chunks), shards)
+        bounds = [shard * per_shard + min(shard, extra) for shard in range(shards + 1)]
+        tasks = [
+            (self, shard_path(path, shard, shards), file_format, chunks[bounds[shard]:bounds[shard + 1]])
+            for shard in range(shards)
+        ]
+
+        if workers > 1:
+            with multiprocessing.get_context().Pool(min(workers, shards)) as pool:
+                written = pool.starmap(_write_shard, tasks)
+        else:
+            written = [_write_shard(*task) for task in tasks]
+
+        manifest = {
+            "format": file_format,
+            "seed": self.seed,
+            "locale": self.locale,
+            "as_of": str(self.as_of),
+            "chunk_size": chunk_size,
+            "num_records": num_records,
+            "shards": [
+                {
+                    "path": os.path.basename(shard_file),
+                    "first_row": task_chunks[0][1] if task_chunks else num_records,
+                    "rows": rows,
+                }
+                for (_, shard_file, _, task_chunks), rows in zip(tasks, written)
+            ],
+        }
+        with open(manifest_path(path), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def plan_chunks(num_records, chunk_size):
+    """``(index, start, size)`` of every chunk of ``num_records`` rows."""
+    return [
+        (index, start, min(chunk_size, num_records - start))
+        for index, start in enumerate(range(0, num_records, chunk_size))
+    ]
+
+
+def shard_path(path, shard, shards):
+    """``data.csv`` -> ``data-00001-of-00004.csv``."""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{shard:05d}-of-{shards:05d}{ext}"
+
+
+def manifest_path(path):
+    """``data.csv`` -> ``data.manifest.json``."""
+    return f"{os.path.splitext(path)[0]}{MANIFEST_SUFFIX}"
+
+
+def is_manifest(path):
+    return path.endswith(MANIFEST_SUFFIX)
+
+
+def read_manifest(path):
+    """The paths of the shard files listed in the manifest at ``path``, in order."""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(os.path.abspath(path))
+    return [os.path.join(directory, shard["path"]) for shard in manifest["shards"]]
+
+
+def _write_shard(generator, path, file_format, chunks):
+    return generator.write(path, 0, file_format, chunks=chunks)
+
+
+def _open_writer(path, file_format, schema):
+    if file_format == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    if file_format == "arrow":
+        return pa.ipc.new_file(path, schema)
+    return pacsv.CSVWriter(path, schema, write_options=pacsv.WriteOptions(quoting_style="needed"))
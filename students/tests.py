@@ -1,3 +1,1222 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import ROUND_HALF_EVEN, Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import pyarrow as pa
+import pyarrow.parquet as pq
+from docx import Document
+from openpyxl import load_workbook
+
+from accounts.models import User
+
+from students.models import (
+    CENT,
+    CONTENT_TYPE_SCORES,
+    FAMILY_PRESSURE_SCORES,
+    LEVEL_SCORES,
+    SOCIAL_MEDIA_IMPACT_SCORES,
+    STUDY_LIFE_BALANCE_SCORES,
+    EconomicSituation,
+    ExportJob,
+    Grade,
+    HealthInformation,
+    ImportCheckpoint,
+    SocialMediaAndTechnology,
+    Student,
+    StudentPerformanceTrend,
+    StudentSearchDocument,
+    Subject,
+    compute_grade_metrics,
+)
+from students.columnar import STUDENT_RECORD_SCHEMA
+from students.export_jobs import (
+    EXPORTERS,
+    Exporter,
+    enqueue_export,
+    get_exporter,
+    queryset_selection,
+    requeue_stale_jobs,
+    run_export,
+    selection_queryset,
+)
+from students.exports import (
+    STUDENT_CSV_HEADER,
+    STUDENT_EXCEL_HEADER,
+    STUDENT_ROSTER_COLUMNS,
+    STUDENT_ROSTER_DEFAULT_COLUMNS,
+)
+from students.importing import STAGES, ChunkResult, ImportProgress
+from students.parsing import file_hash
+from students.pdf import Line, render_pdf
+from students.performance import FACTOR_COLUMNS, compute_performance
+from students.recompute import deferred_recompute
+from students.search import BACKENDS, SearchResults, refresh_search_documents, search_students
+from students.synthetic import StudentDataGenerator, manifest_path, plan_chunks, read_manifest
+from students.typeahead import PrefixIndex, StudentTypeahead
+from students.word import FIELD_STYLE, PROFILE_SECTIONS
+
+
+def create_student(username, full_name, **fields):
+    user = User.objects.create(username=username, email=f"{username}@example.com")
+    return Student.objects.create(**{
+        "user": user,
+        "full_name": full_name,
+        "email": f"{username}@example.com",
+        "enrollment_date": date(2023, 9, 1),
+        "date_of_birth": date(2008, 1, 1),
+        "gender": "Female",
+        "address": "1 Main Street",
+        "emergency_contact": "0100000000",
+        "guardian_relationship": "Mother",
+        **fields,
+    })
+
+
+class ComputePerformanceTests(SimpleTestCase):
+    """compute_performance() against Student.calculate_academic_performance(), without a database."""
+
+    def random_student(self, rng):
+        student = Student(
+            attendance_percentage=rng.choice([0.0, 49.5, 75.0, 100.0, rng.uniform(0, 100)]),
+        )
+        student.weighted_average_score = rng.choice([None, 0.0, 64.99, 100.0, rng.uniform(0, 100)])
+        if rng.random() < 0.8:
+            student.economic_situation = EconomicSituation(
+                daily_study_hours=rng.choice([0.0, 10.0, 24.0, rng.uniform(0, 24)]),
+                family_income_level=rng.choice(
+                    [None, Decimal("0"), Decimal("499.99"), Decimal("500"), Decimal("1999.99"), Decimal("2000"),
+                     Decimal(rng.randint(0, 500000)) / 100]
+                ),
+            )
+        if rng.random() < 0.8:
+            student.health_information = HealthInformation(
+                motivation=rng.choice([*LEVEL_SCORES, "Unknown"]),
+                academic_stress=rng.choice([*LEVEL_SCORES, "Unknown"]),
+                depression=rng.random() < 0.5,
+                study_life_balance=rng.choice([*STUDY_LIFE_BALANCE_SCORES, "Unknown"]),
+                family_pressures=rng.choice([*FAMILY_PRESSURE_SCORES, "Unknown"]),
+            )
+        if rng.random() < 0.8:
+            student.tech_and_social = SocialMediaAndTechnology(
+                daily_gaming_hours=rng.choice([0.0, 5.0, 8.0, rng.uniform(0, 8)]),
+                social_media_impact_on_studies=rng.choice([*SOCIAL_MEDIA_IMPACT_SCORES, "None"]),
+                content_type_watched=rng.choice([*CONTENT_TYPE_SCORES, "Unknown"]),
+            )
+        return student
+
+    @staticmethod
+    def factor_row(student):
+        """The FACTOR_COLUMNS values recompute_academic_performance() would read for ``student``."""
+        row = {"pk": None, "academic_performance": None}
+        for key, path in FACTOR_COLUMNS.items():
+            if key in row:
+                continue
+            value = student
+            for name in path.split("__"):
+                value = getattr(value, name, None)
+            row[key] = value
+        return row
+
+    def test_matches_per_student_calculation(self):
+        rng = random.Random(2024)
+        students = [self.random_student(rng) for _ in range(500)]
+        rows = [self.factor_row(student) for student in students]
+        columns = {key: [row[key] for row in rows] for key in FACTOR_COLUMNS}
+
+        index, categories = compute_performance(columns)
+
+        for position, student in enumerate(students):
+            expected_category, expected_index = student.calculate_academic_performance()
+            with self.subTest(student=position):
+                self.assertAlmostEqual(index[position], expected_index, places=9)
+                self.assertEqual(categories[position], expected_category)
+
+    def test_missing_profiles_use_the_model_defaults(self):
+        student = Student(attendance_percentage=80.0)
+        student.weighted_average_score = None
+        columns = {key: [value] for key, value in self.factor_row(student).items()}
+
+        index, categories = compute_performance(columns)
+
+        expected_category, expected_index = student.calculate_academic_performance()
+        self.assertAlmostEqual(index[0], expected_index, places=9)
+        self.assertEqual(categories[0], expected_category)
+
+
+class ComputeGradeMetricsTests(SimpleTestCase):
+    """compute_grade_metrics() against Grade.calculate_grade_metrics(), without a database."""
+
+    def test_matches_per_grade_calculation(self):
+        rng = random.Random(2024)
+        pairs = [
+            # Grade boundaries, zero and negative maximums, and half-cent percentages.
+            (Decimal("90.00"), Decimal("100.00")),
+            (Decimal("89.99"), Decimal("100.00")),
+            (Decimal("0.00"), Decimal("100.00")),
+            (Decimal("5.00"), Decimal("0.00")),
+            (Decimal("1.00"), Decimal("3.00")),
+            (Decimal("2.00"), Decimal("3.00")),
+            (Decimal("0.01"), Decimal("8.00")),
+            (Decimal("120.00"), Decimal("100.00")),
+        ]
+        for _ in range(2000):
+            max_score = Decimal(rng.randint(1, 20000)) / 100
+            pairs.append((Decimal(rng.randint(0, int(max_score * 100))) / 100, max_score))
+
+        percentages, grade_levels, gpa_points = compute_grade_metrics(
+            [score for score, _ in pairs], [max_score for _, max_score in pairs]
+        )
+
+        for position, (score, max_score) in enumerate(pairs):
+            grade = Grade(score=score, max_score=max_score)
+            grade.calculate_grade_metrics()
+            with self.subTest(score=score, max_score=max_score):
+                # The percentage as the DecimalField stores it.
+                self.assertEqual(percentages[position], grade.percentage.quantize(CENT, rounding=ROUND_HALF_EVEN))
+                self.assertEqual(grade_levels[position], grade.grade_level)
+                self.assertEqual(gpa_points[position], grade.gpa_points)
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex.build([
+            (1, "Aaron Bell", "aaron@example.com"),
+            (2, "Zoë  Ánderson", "zoe@example.com"),
+            (3, "Anna Annabel", None),
+        ])
+
+    def ids(self, query, limit=10):
+        return [result["id"] for result in self.index.lookup(query, limit)]
+
+    def test_lookup_matches_any_word_and_the_email(self):
+        self.assertEqual(self.ids("bell"), [1])
+        self.assertEqual(self.ids("aaron b"), [1])
+        self.assertEqual(self.ids("zoe@"), [2])
+        self.assertEqual(self.ids("ell"), [])
+        self.assertEqual(
+            self.index.lookup("bell"), [{"id": 1, "full_name": "Aaron Bell", "email": "aaron@example.com"}]
+        )
+
+    def test_lookup_ignores_case_accents_and_spacing(self):
+        self.assertEqual(self.ids("ZOE  and"), [2])
+        self.assertEqual(self.ids("anderson"), [2])
+
+    def test_lookup_lists_each_student_once_in_key_order_up_to_the_limit(self):
+        self.assertEqual(self.ids("a"), [1, 2, 3])
+        self.assertEqual(self.ids("ann"), [3])
+        self.assertEqual(self.ids("a", limit=2), [1, 2])
+        self.assertEqual(self.ids("   "), [])
+
+    def test_add_remove_and_rename(self):
+        self.index.add(4, "Bella Stone", "bella@example.com")
+        self.assertEqual(self.ids("bel"), [1, 4])
+        self.index.add(1, "Aaron Smith", "aaron@example.com")
+        self.assertEqual(self.ids("bel"), [4])
+        self.assertEqual(self.ids("smith"), [1])
+        self.index.remove(4)
+        self.index.remove(99)
+        self.assertEqual(self.ids("bel"), [])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.index._entries), len(PrefixIndex.build([
+            (1, "Aaron Smith", "aaron@example.com"),
+            (2, "Zoë  Ánderson", "zoe@example.com"),
+            (3, "Anna Annabel", None),
+        ])._entries))
+
+
+@override_settings(TYPEAHEAD_MAX_AGE=60)
+class StudentTypeaheadTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("students.typeahead.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("students.typeahead.connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loads = []
+        self.typeahead = StudentTypeahead()
+        self.typeahead._load = self.load
+        self.students = [(1, "Aaron Bell", "aaron@example.com")]
+        self.loaded = threading.Event()
+        self.loaded.set()
+
+    def load(self):
+        self.loaded.wait(timeout=5)
+        self.loads.append(self.now)
+        return PrefixIndex.build(self.students)
+
+    def wait_for_rebuild(self):
+        for thread in threading.enumerate():
+            if thread.name == "student-typeahead":
+                thread.join()
+
+    def test_builds_on_first_lookup_and_applies_updates(self):
+        self.assertEqual(self.loads, [])
+        self.assertEqual(len(self.typeahead.lookup("aaron")), 1)
+        self.typeahead.update(2, "Aaron Cole", None)
+        self.typeahead.remove(1)
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [2])
+        self.assertEqual(self.loads, [1000.0])
+
+    def test_rebuilds_in_the_background_once_older_than_the_max_age(self):
+        self.typeahead.lookup("aaron")
+        self.students = [(2, "Aaron Cole", None)]
+        self.now += 60
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [1])
+        self.wait_for_rebuild()
+        self.assertEqual(self.loads, [1000.0])
+
+        self.now += 1
+        self.loaded.clear()
+        # The old index keeps serving while the new one is loaded.
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [1])
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [1])
+        self.loaded.set()
+        self.wait_for_rebuild()
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [2])
+        self.assertEqual(self.loads, [1000.0, 1061.0])
+
+    def test_changes_during_a_rebuild_are_replayed_on_the_new_index(self):
+        self.typeahead.lookup("aaron")
+        self.students = [(2, "Aaron Cole", None), (3, "Aaron Diaz", None)]
+        self.now += 61
+        self.loaded.clear()
+        self.typeahead.lookup("aaron")
+        self.typeahead.update(4, "Aaron Evans", None)
+        self.typeahead.remove(3)
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [1, 4])
+        self.loaded.set()
+        self.wait_for_rebuild()
+        self.assertEqual([result["id"] for result in self.typeahead.lookup("aaron")], [2, 4])
+        self.assertEqual(self.loads, [1000.0, 1061.0])
+
+
+class SearchTests(TestCase):
+    """search_students() and SearchResults through the backend of the test database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.smith = create_student("jsmith", "Jane Smith", mobile="0123456789")
+        cls.smithers = create_student("wsmithers", "Waylon Smithers")
+        cls.brown = create_student("cbrown", "Charlie Brown")
+        Grade.objects.create(student=cls.brown, subject=Subject.objects.create(name="Chemistry"), score=Decimal("70"))
+
+    def setUp(self):
+        # Documents are refreshed when the transaction commits, which a TestCase never does.
+        refresh_search_documents([self.smith.pk, self.smithers.pk, self.brown.pk])
+
+    def search(self, query):
+        return set(search_students(Student.objects.all(), query).values_list("pk", flat=True))
+
+    def test_matches_every_word_as_a_prefix(self):
+        self.assertEqual(self.search("smith"), {self.smith.pk, self.smithers.pk})
+        self.assertEqual(self.search("jane smi"), {self.smith.pk})
+        self.assertEqual(self.search("chem"), {self.brown.pk})
+        self.assertEqual(self.search("jane brown"), set())
+
+    def test_punctuation_only_matches_nothing(self):
+        self.assertEqual(self.search("'\"*"), set())
+        self.assertEqual(SearchResults("--").count(), 0)
+
+    def test_results_count_and_slice(self):
+        results = SearchResults("smith")
+        self.assertEqual(results.count(), 2)
+        self.assertEqual({student.pk for student in results[0:2]}, {self.smith.pk, self.smithers.pk})
+        self.assertEqual(len(results[1:5]), 1)
+        self.assertEqual(results[2:4], [])
+
+
+@mock.patch.dict(BACKENDS, clear=True)
+class ContainsSearchTests(SearchTests):
+    """The same searches through ContainsSearch, the backend of other databases."""
+
+    def test_matches_every_word_as_a_prefix(self):
+        self.assertEqual(self.search("smith"), {self.smith.pk, self.smithers.pk})
+        self.assertEqual(self.search("jane smi"), {self.smith.pk})
+        # Substrings match as well.
+        self.assertEqual(self.search("mith"), {self.smith.pk, self.smithers.pk})
+
+
+class StudentAdminSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.smith = create_student("jsmith", "Jane Smith")
+        cls.obrien = create_student("dobrien", "Dara O'Brien-Ryan")
+
+    def setUp(self):
+        refresh_search_documents([self.smith.pk, self.obrien.pk])
+        self.model_admin = admin.site._registry[Student]
+        self.request = RequestFactory().get("/admin/students/student/")
+        self.request.resolver_match = None
+
+    def search(self, term):
+        queryset, may_have_duplicates = self.model_admin.get_search_results(
+            self.request, Student.objects.all(), term
+        )
+        self.assertFalse(may_have_duplicates)
+        return set(queryset.values_list("pk", flat=True))
+
+    def test_blank_term_returns_every_student(self):
+        self.assertEqual(self.search("  "), {self.smith.pk, self.obrien.pk})
+
+    def test_prefix_matches(self):
+        self.assertEqual(self.search("smi"), {self.smith.pk})
+        self.assertEqual(self.search("o'brien"), {self.obrien.pk})
+
+    def test_falls_back_to_substrings(self):
+        self.assertEqual(self.search("mith"), {self.smith.pk})
+        self.assertEqual(self.search("-"), {self.obrien.pk})
+        self.assertEqual(self.search("xyz"), set())
+
+
+class TrackedFieldsTests(TestCase):
+    """Dirty-field tracking and the single-write Student.save()."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student("jsmith", "Jane Smith", attendance_percentage=90.0)
+
+    def setUp(self):
+        self.student = Student.objects.get(pk=self.student.pk)
+
+    def student_updates(self, queries):
+        return [query["sql"] for query in queries if query["sql"].startswith(f'UPDATE "{Student._meta.db_table}"')]
+
+    def test_loaded_instance_is_clean_until_a_tracked_field_changes(self):
+        self.assertEqual(self.student.get_dirty_fields(), set())
+        self.student.full_name = "Jane Smith-Jones"
+        self.student.grade_level = "Grade 12"
+        self.assertEqual(self.student.get_dirty_fields(), {"full_name"})
+        self.student.save()
+        self.assertEqual(self.student.get_dirty_fields(), set())
+
+    def test_new_and_deferred_instances(self):
+        self.assertEqual(Student().get_dirty_fields(), set(Student.tracked_fields))
+        student = Student.objects.only("pk", "full_name").get(pk=self.student.pk)
+        self.assertEqual(student.get_dirty_fields(), set())
+        # Its database value is unknown, so an assigned deferred field counts as changed.
+        student.attendance_percentage = 10.0
+        self.assertEqual(student.get_dirty_fields(), {"attendance_percentage"})
+
+    def test_unchanged_inputs_skip_the_performance_calculation(self):
+        self.student.full_name = "Jane Smith-Jones"
+        with mock.patch.object(Student, "calculate_academic_performance") as calculate:
+            self.student.save()
+        calculate.assert_not_called()
+
+    def test_changed_attendance_is_saved_with_the_performance_in_one_update(self):
+        self.student.attendance_percentage = 20.0
+        with self.captureOnCommitCallbacks(), CaptureQueriesContext(connection) as queries:
+            self.student.save()
+        updates = self.student_updates(queries.captured_queries)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"academic_performance"', updates[0])
+        self.assertEqual(
+            Student.objects.get(pk=self.student.pk).academic_performance,
+            self.student.calculate_academic_performance()[0],
+        )
+
+    def test_update_fields_adds_the_performance_and_leaves_other_fields_dirty(self):
+        self.student.attendance_percentage = 20.0
+        self.student.full_name = "Jane Smith-Jones"
+        with CaptureQueriesContext(connection) as queries:
+            self.student.save(update_fields=["attendance_percentage"])
+        self.assertIn('"academic_performance"', self.student_updates(queries.captured_queries)[0])
+        self.assertEqual(self.student.get_dirty_fields(), {"full_name"})
+        self.assertEqual(Student.objects.get(pk=self.student.pk).full_name, "Jane Smith")
+
+    def test_profiles_refresh_the_performance_only_when_an_input_changes(self):
+        health = HealthInformation.objects.create(student=self.student, motivation="Low")
+        health = HealthInformation.objects.get(pk=health.pk)
+        with mock.patch.object(Student, "refresh_academic_performance") as refresh:
+            health.save()
+            refresh.assert_not_called()
+            health.motivation = "High"
+            health.save()
+            refresh.assert_called_once_with()
+
+
+class RecomputeTests(TestCase):
+    """Grade saves recompute each student's performance once, when the transaction commits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subject = Subject.objects.create(name="Mathematics")
+        cls.jane = create_student("jsmith", "Jane Smith", attendance_percentage=95.0)
+        cls.john = create_student("jdoe", "John Doe", attendance_percentage=95.0)
+
+    def recomputed(self, recompute):
+        return [set(call.args[0].values_list("pk", flat=True)) for call in recompute.call_args_list]
+
+    def grade(self, student, score):
+        return Grade.objects.create(student=student, subject=self.subject, score=Decimal(score))
+
+    def test_grades_of_a_transaction_are_recomputed_once(self):
+        with mock.patch("students.performance.recompute_academic_performance") as recompute:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                for score in ("40", "55", "70"):
+                    self.grade(self.jane, score)
+                self.grade(self.john, "90")
+                recompute.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.recomputed(recompute), [{self.jane.pk, self.john.pk}])
+
+    def test_recompute_writes_the_performance(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.jane, "20")
+        jane = Student.objects.get(pk=self.jane.pk)
+        self.assertEqual(jane.academic_performance, jane.calculate_academic_performance()[0])
+
+    def test_rolled_back_grades_are_not_recomputed(self):
+        with mock.patch("students.performance.recompute_academic_performance") as recompute:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                try:
+                    with transaction.atomic():
+                        self.grade(self.jane, "40")
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                self.grade(self.john, "90")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.recomputed(recompute), [{self.john.pk}])
+
+    def test_deferred_recompute_flushes_on_exit(self):
+        with mock.patch("students.performance.recompute_academic_performance") as recompute:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with deferred_recompute():
+                    queued = len(connection.run_on_commit)
+                    self.grade(self.jane, "40")
+                    self.grade(self.john, "90")
+                    self.assertEqual(len(connection.run_on_commit), queued)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.recomputed(recompute), [{self.jane.pk, self.john.pk}])
+
+
+class PerformanceTrendTests(TestCase):
+    """The running aggregates of StudentPerformanceTrend against rebuild() after each kind of change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.maths = Subject.objects.create(name="Mathematics")
+        cls.physics = Subject.objects.create(name="Physics")
+        cls.jane = create_student("jsmith", "Jane Smith")
+        cls.john = create_student("jdoe", "John Doe")
+
+    def grade(self, student, score, semester="Fall", subject=None, **fields):
+        return Grade.objects.create(
+            student=student, subject=subject or self.maths, score=Decimal(score), semester=semester, **fields
+        )
+
+    def trends(self):
+        return {
+            (trend.student_id, trend.semester): trend
+            for trend in StudentPerformanceTrend.objects.filter(grade_count__gt=0)
+        }
+
+    def assertTrendsMatchRebuild(self):
+        running = self.trends()
+        for student_id, semester in Grade.objects.values_list("student_id", "semester").distinct():
+            StudentPerformanceTrend.objects.rebuild(student_id, semester)
+        rebuilt = self.trends()
+        self.assertEqual(running.keys(), rebuilt.keys())
+        for key, trend in running.items():
+            with self.subTest(trend=key):
+                expected = rebuilt[key]
+                self.assertEqual(trend.grade_count, expected.grade_count)
+                self.assertEqual(trend.percentage_sum, expected.percentage_sum)
+                self.assertEqual(trend.gpa_sum, expected.gpa_sum)
+                self.assertAlmostEqual(trend.average_percentage, expected.average_percentage, delta=Decimal("0.01"))
+                self.assertAlmostEqual(trend.gpa, expected.gpa, delta=Decimal("0.01"))
+
+    def test_add(self):
+        self.grade(self.jane, "91.5")
+        self.grade(self.jane, "64", max_score=Decimal("80"))
+        self.grade(self.jane, "40", semester="Spring")
+        self.grade(self.john, "77.25")
+        self.assertTrendsMatchRebuild()
+
+    def test_edit(self):
+        grade = self.grade(self.jane, "91.5")
+        other = self.grade(self.jane, "55")
+        grade = Grade.objects.get(pk=grade.pk)
+        grade.score = Decimal("48")
+        grade.save()
+        self.assertTrendsMatchRebuild()
+        # Moved to another semester, then to another student.
+        grade.semester = "Summer"
+        grade.save()
+        self.assertTrendsMatchRebuild()
+        grade.student = self.john
+        grade.save()
+        self.assertTrendsMatchRebuild()
+        # Saved from an instance whose inputs were deferred.
+        other = Grade.objects.only("pk", "score").get(pk=other.pk)
+        other.score = Decimal("99")
+        other.save()
+        self.assertTrendsMatchRebuild()
+
+    def test_delete(self):
+        grades = [self.grade(student, score) for student in (self.jane, self.john) for score in ("80", "60", "45")]
+        grades[0].delete()
+        self.assertTrendsMatchRebuild()
+        Grade.objects.filter(pk__in=[grades[1].pk, grades[3].pk]).delete()
+        self.assertTrendsMatchRebuild()
+        Grade.objects.filter(pk=grades[4].pk).bulk_remove()
+        self.assertTrendsMatchRebuild()
+        self.grade(self.john, "70", subject=self.physics)
+        self.physics.delete()
+        self.assertTrendsMatchRebuild()
+        Grade.objects.all().delete()
+        self.assertEqual(self.trends(), {})
+
+    def test_bulk_ingest_and_remove(self):
+        self.grade(self.jane, "50")
+        Grade.objects.bulk_ingest([
+            {"student": self.jane, "subject": self.physics, "score": Decimal("88")},
+            {"student": self.john, "subject": self.maths, "score": Decimal("71"), "semester": "Spring"},
+            {"student": self.john, "subject": self.physics, "score": Decimal("33.5"), "semester": "Spring"},
+        ])
+        self.assertTrendsMatchRebuild()
+        Grade.objects.filter(student=self.john).bulk_remove(pairs={(self.john.pk, self.physics.pk)})
+        self.assertTrendsMatchRebuild()
+
+
+class ImportFullStudentsTests(TestCase):
+    """import_full_students on a small generated CSV: checkpoints, unchanged rows, rejects and grade replacement."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.directory.cleanup)
+        path = os.path.join(cls.directory.name, "generated.csv")
+        call_command(
+            "generate_students_csv", num=6, seed=7, output=path, locale="en_US", as_of=date(2025, 1, 1),
+            stdout=io.StringIO(),
+        )
+        with open(path, encoding="utf-8", newline="") as file:
+            reader = csv.DictReader(file)
+            cls.fieldnames, cls.rows = reader.fieldnames, list(reader)
+
+    def write_csv(self, rows, name="students.csv"):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, self.fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def import_csv(self, path, **options):
+        call_command(
+            "import_full_students", path, quiet=True, chunk_size=2, stdout=io.StringIO(), stderr=io.StringIO(),
+            **options,
+        )
+        return ImportCheckpoint.objects.get(file_hash=file_hash(path))
+
+    def grades(self, row):
+        return {
+            (grade.subject.name, grade.score)
+            for grade in Grade.objects.filter(student__email=row["email"]).select_related("subject")
+        }
+
+    def imported(self):
+        return {
+            student.email: (student.full_name, student.attendance_percentage, self.grades({"email": student.email}))
+            for student in Student.objects.all()
+        }
+
+    def csv_grades(self, row):
+        return {
+            (subject.strip(), Decimal(score))
+            for subject, score in (item.split(":") for item in row["grades"].split(";"))
+        }
+
+    def test_imports_every_row(self):
+        checkpoint = self.import_csv(self.write_csv(self.rows))
+        self.assertEqual(Student.objects.count(), 6)
+        self.assertEqual(checkpoint.done_ranges, [[2, 7]])
+        self.assertEqual((checkpoint.rows_imported, checkpoint.rows_unchanged, checkpoint.rows_rejected), (6, 0, 0))
+        self.assertIsNotNone(checkpoint.completed_at)
+        for row in self.rows:
+            self.assertEqual(self.grades(row), self.csv_grades(row))
+
+    def test_imports_every_shard_of_a_manifest(self):
+        path = os.path.join(self.directory.name, "sharded.csv")
+        call_command(
+            "generate_students_csv", num=6, seed=7, output=path, locale="en_US", as_of=date(2025, 1, 1),
+            shards=2, stdout=io.StringIO(),
+        )
+        call_command(
+            "import_full_students", manifest_path(path), quiet=True, stdout=io.StringIO(), stderr=io.StringIO()
+        )
+        emails = set()
+        for shard in read_manifest(manifest_path(path)):
+            with open(shard, encoding="utf-8", newline="") as file:
+                emails.update(row["email"] for row in csv.DictReader(file))
+        self.assertEqual(len(emails), 6)
+        self.assertEqual(set(Student.objects.values_list("email", flat=True)), emails)
+        self.assertEqual(ImportCheckpoint.objects.filter(completed_at__isnull=False).count(), 2)
+
+    def test_worker_processes_import_the_same_records(self):
+        rows = [dict(row) for row in self.rows]
+        rows[4]["enrollment_date"] = ""
+        path = self.write_csv(rows)
+        checkpoint = self.import_csv(path, workers=2)
+        self.assertEqual(checkpoint.done_ranges, [[2, 7]])
+        self.assertEqual((checkpoint.rows_imported, checkpoint.rows_rejected), (5, 1))
+        parallel = self.imported()
+        Student.objects.all().delete()
+        self.import_csv(path, restart=True)
+        self.assertEqual(self.imported(), parallel)
+
+    def test_json_summary(self):
+        rows = [dict(row) for row in self.rows]
+        rows[0]["date_of_birth"] = ""
+        path = self.write_csv(rows)
+        summary_path = os.path.join(self.directory.name, "summary.json")
+        self.import_csv(path, json_summary=summary_path)
+        with open(summary_path, encoding="utf-8") as file:
+            summary = json.load(file)
+        self.assertEqual(
+            {name: summary[name] for name in ("rows", "imported", "unchanged", "rejected", "chunks")},
+            {"rows": 6, "imported": 5, "unchanged": 0, "rejected": 1, "chunks": 3},
+        )
+        self.assertEqual(list(summary["stage_seconds"]), list(STAGES))
+        self.assertGreater(summary["queries"], 0)
+        self.assertEqual(summary["queries_per_chunk"], round(summary["queries"] / 3, 1))
+        self.assertEqual((summary["format"], summary["file_hash"]), ("csv", file_hash(path)))
+        self.assertEqual(summary["rejects_files"], [f"{path}.rejects.csv"])
+
+    def test_progress_line_and_eta(self):
+        progress = ImportProgress(expected=100)
+        progress.add(ChunkResult(2, 41, 40, 38, 1, [(7, "Bad row", {})], {"write": 3.0, "recompute": 1.0}, 12))
+        line = progress.line()
+        self.assertIn("Processed 40/100 rows (40%)", line)
+        self.assertIn("38 imported, 1 unchanged, 1 failed", line)
+        self.assertIn("12 queries/chunk", line)
+        self.assertIn("write 75% recompute 25%", line)
+        with mock.patch.object(ImportProgress, "rows_per_second", 20.0):
+            self.assertEqual(progress.eta, 3.0)
+
+    def test_resumes_after_the_checkpointed_rows(self):
+        path = self.write_csv(self.rows)
+        ImportCheckpoint.objects.create(
+            file_hash=file_hash(path), file_name="students.csv", done_ranges=[[2, 4]], rows_imported=3
+        )
+        checkpoint = self.import_csv(path)
+        self.assertEqual(
+            set(Student.objects.values_list("email", flat=True)), {row["email"] for row in self.rows[3:]}
+        )
+        self.assertEqual(checkpoint.done_ranges, [[2, 7]])
+        self.assertEqual(checkpoint.rows_imported, 6)
+
+    def test_skips_unchanged_rows(self):
+        path = self.write_csv(self.rows)
+        self.import_csv(path)
+        checkpoint = self.import_csv(path, restart=True)
+        self.assertEqual((checkpoint.rows_imported, checkpoint.rows_unchanged), (0, 6))
+
+        rows = [dict(row) for row in self.rows]
+        rows[1]["attendance_percentage"] = "12.5"
+        checkpoint = self.import_csv(self.write_csv(rows, "changed.csv"))
+        self.assertEqual((checkpoint.rows_imported, checkpoint.rows_unchanged), (1, 5))
+        self.assertEqual(Student.objects.get(email=rows[1]["email"]).attendance_percentage, 12.5)
+
+    def test_writes_rejected_rows_to_the_rejects_file(self):
+        rows = [dict(row) for row in self.rows]
+        rows[2]["date_of_birth"] = ""
+        rejects = os.path.join(self.directory.name, "rejects.csv")
+        checkpoint = self.import_csv(self.write_csv(rows), rejects=rejects)
+        self.assertEqual((checkpoint.rows_imported, checkpoint.rows_rejected), (5, 1))
+        self.assertFalse(Student.objects.filter(email=rows[2]["email"]).exists())
+        with open(rejects, encoding="utf-8", newline="") as file:
+            header, *rejected = csv.reader(file)
+        self.assertEqual(header, ["row", "error", *self.fieldnames])
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(rejected[0][0], "4")
+        self.assertEqual(rejected[0][2:], [rows[2][name] for name in self.fieldnames])
+
+    def test_changed_row_replaces_the_grades_of_its_subjects(self):
+        self.import_csv(self.write_csv(self.rows))
+        row = dict(self.rows[0])
+        student = Student.objects.get(email=row["email"])
+        kept = Grade.objects.create(
+            student=student, subject=Subject.objects.create(name="Music"), score=Decimal("66")
+        )
+        # A second grade in one of the row's subjects, entered since the import.
+        subject = row["grades"].split(":")[0].strip()
+        Grade.objects.create(student=student, subject=Subject.objects.get(name=subject), score=Decimal("12"))
+
+        row["grades"] = "; ".join(
+            f"{name}:{'88.5' if name == subject else score}" for name, score in sorted(self.csv_grades(row))
+        )
+        self.import_csv(self.write_csv([row, *self.rows[1:]], "changed.csv"))
+        self.assertEqual(self.grades(row), self.csv_grades(row) | {("Music", Decimal("66"))})
+        self.assertTrue(Grade.objects.filter(pk=kept.pk).exists())
+        for trend in StudentPerformanceTrend.objects.filter(student=student):
+            grades = Grade.objects.filter(student=student, semester=trend.semester)
+            self.assertEqual(trend.grade_count, grades.count())
+            self.assertEqual(trend.percentage_sum, sum(grade.percentage for grade in grades))
+
+
+class CountingProgress:
+    """The progress an exporter reports, without an export job."""
+
+    def __init__(self):
+        self.processed = 0
+
+    def advance(self, count=1):
+        self.processed += count
+
+    def counted(self, rows):
+        for row in rows:
+            yield row
+            self.advance()
+
+
+class ExporterTests(TestCase):
+    """The files written by each registered exporter."""
+
+    @classmethod
+    def setUpTestData(cls):
+        maths = Subject.objects.create(name="Mathematics")
+        physics = Subject.objects.create(name="Physics")
+        cls.jane = create_student("jsmith", "Jane Smith", attendance_percentage=92.5, mobile="0123456789")
+        cls.john = create_student("jdoe", "John Doe", attendance_percentage=61.0)
+        cls.jane.subjects.set([maths, physics])
+        HealthInformation.objects.create(student=cls.jane, motivation="High", depression=True)
+        EconomicSituation.objects.create(
+            student=cls.jane, daily_study_hours=2.5, family_income_level=Decimal("1200.00"), housing_status="Owned"
+        )
+        Grade.objects.create(student=cls.jane, subject=maths, score=Decimal("88.50"))
+        Grade.objects.create(student=cls.jane, subject=physics, score=Decimal("71.00"))
+        cls.students = Student.objects.order_by("pk")
+
+    def export(self, name, queryset=None):
+        progress = CountingProgress()
+        file = io.BytesIO()
+        get_exporter(name).write(self.students if queryset is None else queryset, file, progress)
+        return file.getvalue(), progress.processed
+
+    def test_students_csv(self):
+        with self.assertNumQueries(2):
+            content, processed = self.export("students.csv")
+        header, jane, john = csv.reader(io.StringIO(content.decode()))
+        self.assertEqual(processed, 2)
+        self.assertEqual(header, STUDENT_CSV_HEADER)
+        row = dict(zip(header, jane))
+        self.assertEqual(row["Full Name"], "Jane Smith")
+        self.assertEqual(row["Attendance Percentage"], "92.5")
+        self.assertEqual(row["Grades"], "Mathematics:88.50; Physics:71.00")
+        self.assertEqual((row["Motivation"], row["Depression"]), ("High", "True"))
+        self.assertEqual((row["Housing Status"], row["Daily Study Hours"]), ("Owned", "2.5"))
+        self.assertEqual(row["Daily Screen Time"], "N/A")
+        row = dict(zip(header, john))
+        self.assertEqual(row["Grades"], "")
+        self.assertEqual({row[name] for name in STUDENT_CSV_HEADER[5:]}, {"N/A"})
+
+    def test_students_excel(self):
+        content, processed = self.export("students.excel")
+        rows = list(load_workbook(io.BytesIO(content), read_only=True)["Students"].values)
+        self.assertEqual(processed, 2)
+        self.assertEqual(list(rows[0]), STUDENT_EXCEL_HEADER)
+        self.assertEqual(rows[1][:3], ("Jane Smith", "jsmith@example.com", "0123456789"))
+        self.assertEqual(rows[1][3].date(), date(2008, 1, 1))
+        self.assertEqual(rows[2][0], "John Doe")
+
+    def test_students_excel_analytics(self):
+        content, processed = self.export("students.excel_analytics")
+        header, jane, john = load_workbook(io.BytesIO(content), read_only=True)["Students"].values
+        self.assertEqual(processed, 2)
+        self.assertEqual(list(header), STUDENT_CSV_HEADER)
+        row = dict(zip(header, jane))
+        self.assertEqual(row["Grades"], "Mathematics:88.50; Physics:71.00")
+        self.assertEqual((row["Attendance Percentage"], row["Family Income Level"]), (92.5, 1200))
+        self.assertEqual(row["Daily Screen Time"], "N/A")
+        self.assertEqual(set(john[5:]), {"N/A"})
+
+    @mock.patch("reportlab.rl_config.pageCompression", 0)
+    def test_students_pdf(self):
+        content, processed = self.export("students.pdf")
+        self.assertEqual(processed, 2)
+        self.assertTrue(content.startswith(b"%PDF"))
+        self.assertIn(b"/Count 1", content)
+        self.assertIn(b"(Student Name: Jane Smith) Tj", content)
+        self.assertIn(b"(Student Name: John Doe) Tj", content)
+
+    @mock.patch("reportlab.rl_config.invariant", 1)
+    def test_pdf_pages_rendered_in_worker_processes_are_the_same(self):
+        records = [[Line(f"Student Name: {number}", "Helvetica", 12, 100, 20)] for number in range(150)]
+        documents = []
+        for workers in (1, 2):
+            file = io.BytesIO()
+            self.assertEqual(render_pdf(file, records, title="Students", workers=workers), 5)
+            documents.append(file.getvalue())
+        self.assertEqual(documents[0], documents[1])
+
+    def test_students_word(self):
+        with self.assertNumQueries(2):
+            content, processed = self.export("students.word")
+        document = Document(io.BytesIO(content))
+        self.assertEqual(processed, 2)
+        headings = [
+            (paragraph.style.name, paragraph.text) for paragraph in document.paragraphs
+            if paragraph.style.name.startswith("Heading")
+        ]
+        sections = [("Heading 3", heading) for heading, _, _ in PROFILE_SECTIONS]
+        self.assertEqual(headings, [
+            ("Heading 1", "Student Information"),
+            ("Heading 2", "Jane Smith"), *sections,
+            ("Heading 2", "John Doe"), *sections,
+        ])
+        fields = [paragraph.text for paragraph in document.paragraphs if paragraph.style.name == FIELD_STYLE]
+        self.assertIn("Full Name: Jane Smith", fields[0].splitlines())
+        self.assertIn("Grades: Mathematics: 88.50, Physics: 71.00", fields[0].splitlines())
+        self.assertIn("Motivation: High", fields[1].splitlines())
+        self.assertEqual(fields[3], "Social Media and Technology: Not Available")
+        self.assertIn("Grades: -", fields[4].splitlines())
+        self.assertEqual(
+            sum(run.element.xml.count('w:type="page"') for paragraph in document.paragraphs for run in paragraph.runs),
+            1,
+        )
+
+    def test_students_parquet_and_arrow(self):
+        readers = {
+            "students.parquet": lambda content: pq.read_table(pa.BufferReader(content)),
+            "students.arrow": lambda content: pa.ipc.open_file(pa.BufferReader(content)).read_all(),
+        }
+        for name, read in readers.items():
+            with self.subTest(exporter=name):
+                content, processed = self.export(name)
+                table = read(content)
+                self.assertEqual(processed, 2)
+                self.assertEqual(table.schema, STUDENT_RECORD_SCHEMA)
+                jane, john = table.to_pylist()
+                self.assertEqual(
+                    (jane["user"], jane["full_name"], jane["motivation"]), ("jsmith", "Jane Smith", "High")
+                )
+                self.assertEqual(jane["subjects"], ["Mathematics", "Physics"])
+                self.assertEqual(jane["grades"], [
+                    {"subject": "Mathematics", "score": Decimal("88.50")},
+                    {"subject": "Physics", "score": Decimal("71.00")},
+                ])
+                self.assertEqual((john["grades"], john["motivation"], john["housing_status"]), ([], None, None))
+
+    def test_parquet_export_imports_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "students.parquet")
+            with open(path, "wb") as file:
+                file.write(self.export("students.parquet")[0])
+            exported = {
+                student.email: (student.full_name, student.attendance_percentage) for student in self.students
+            }
+            Student.objects.all().delete()
+            call_command("import_full_students", path, quiet=True, stdout=io.StringIO(), stderr=io.StringIO())
+        students = Student.objects.order_by("pk")
+        self.assertEqual(
+            {student.email: (student.full_name, student.attendance_percentage) for student in students}, exported
+        )
+        jane = students.get(email="jsmith@example.com")
+        self.assertEqual(
+            sorted(jane.grades.values_list("subject__name", "score")),
+            [("Mathematics", Decimal("88.50")), ("Physics", Decimal("71.00"))],
+        )
+        self.assertEqual(jane.health_information.motivation, "High")
+        self.assertEqual(jane.economic_situation.housing_status, "Owned")
+
+    def test_roster_csv_has_the_selected_columns(self):
+        content, processed = self.export("students.roster_csv", self.students.values_list("full_name", "mobile"))
+        self.assertEqual(processed, 2)
+        self.assertEqual(
+            list(csv.reader(io.StringIO(content.decode()))),
+            [["Full Name", "Mobile"], ["Jane Smith", "0123456789"], ["John Doe", ""]],
+        )
+
+
+class ExportStudentsCsvViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.jane = create_student(
+            "jsmith", "Jane Smith", grade_level="Grade 10", enrollment_date=date(2024, 9, 1)
+        )
+        cls.john = create_student("jdoe", "John Doe", grade_level="Grade 12", is_active=False)
+        cls.user = User.objects.create(username="staff", email="staff@example.com")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse("export_students_csv"), params)
+
+    def rows(self, response):
+        self.assertTrue(response.streaming)
+        return list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.get().status_code, 302)
+
+    def test_streams_the_default_columns(self):
+        header, *rows = self.rows(self.get())
+        self.assertEqual(header, [STUDENT_ROSTER_COLUMNS[column] for column in STUDENT_ROSTER_DEFAULT_COLUMNS])
+        self.assertEqual([row[0] for row in rows], ["Jane Smith", "John Doe"])
+
+    def test_filters_and_columns(self):
+        self.assertEqual(
+            self.rows(self.get(grade_level="Grade 10", columns="full_name,grade_level")),
+            [["Full Name", "Grade Level"], ["Jane Smith", "Grade 10"]],
+        )
+        self.assertEqual(self.rows(self.get(active="0", columns="full_name")), [["Full Name"], ["John Doe"]])
+        self.assertEqual(
+            self.rows(self.get(enrolled_from="2024-01-01", enrolled_to="2024-12-31", columns="email")),
+            [["Email"], ["jsmith@example.com"]],
+        )
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({"active": "maybe"}, {"enrolled_from": "01/09/2024"}, {"columns": "full_name,password"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    @override_settings(EXPORT_JOB_RUNNER="worker")
+    def test_background_export_redirects_to_its_job(self):
+        response = self.get(background="1", grade_level="Grade 12", columns="full_name,email")
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, reverse("export_job", args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual((job.exporter, job.requested_by, job.status), ("students.roster_csv", self.user, "pending"))
+        self.assertEqual(list(selection_queryset(job.selection)), [("John Doe", "jdoe@example.com")])
+
+
+@override_settings(EXPORT_JOB_RUNNER="worker")
+class ExportJobTests(TestCase):
+    """Enqueueing, running, reusing, expiring and requeueing export jobs."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media.cleanup)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media.name))
+
+    @classmethod
+    def setUpTestData(cls):
+        # Run the commit callbacks now, so that the expiry a test queues is not
+        # merged into one still pending in the enclosing transaction.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.students = [create_student(f"student{number}", f"Student {number}") for number in range(5)]
+        cls.user = User.objects.create(username="staff", email="staff@example.com")
+        cls.other = User.objects.create(username="other", email="other@example.com")
+
+    def enqueue(self, user=None):
+        return enqueue_export("students.roster_csv", Student.objects.values_list("full_name"), user or self.user)
+
+    def test_selection_round_trip(self):
+        pks = [self.students[number].pk for number in (4, 0, 1, 2)]
+        queryset = Student.objects.filter(pk__in=pks).order_by("-pk").values_list("full_name", "email")
+        selection = queryset_selection(queryset)
+        self.assertEqual(selection["pks"], [[pks[1], pks[3]], [pks[0], pks[0]]])
+        self.assertEqual(list(selection_queryset(selection)), list(queryset))
+        self.assertEqual(json.loads(json.dumps(selection)), selection)
+        self.assertEqual(list(selection_queryset(queryset_selection(Student.objects.none()))), [])
+
+    def test_run_stores_the_file_and_progress(self):
+        job = self.enqueue()
+        self.assertEqual((job.status, job.reusable), (ExportJob.Status.PENDING, False))
+        self.assertEqual(self.enqueue(), job)
+
+        self.assertTrue(run_export(job.pk))
+        self.assertFalse(run_export(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.total, job.reusable), (ExportJob.Status.DONE, 5, 5, True))
+        self.assertIsNotNone(job.heartbeat_at)
+        with job.file.open("rb") as file:
+            self.assertEqual(file.read().decode().splitlines()[:2], ["Full Name", "Student 0"])
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("download_export", args=[job.pk]))
+        self.assertEqual(b"".join(response.streaming_content).decode().splitlines()[-1], "Student 4")
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(reverse("download_export", args=[job.pk])).status_code, 404)
+
+    def test_same_selection_reuses_the_file_until_the_data_changes(self):
+        job = self.enqueue()
+        run_export(job.pk)
+        job.refresh_from_db()
+        reused = self.enqueue(user=self.other)
+        self.assertNotEqual(reused.pk, job.pk)
+        self.assertEqual((reused.status, reused.file.name), (ExportJob.Status.DONE, job.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student = Student.objects.get(pk=self.students[0].pk)
+            student.full_name = "Renamed"
+            student.save()
+        self.assertFalse(ExportJob.objects.filter(reusable=True).exists())
+        self.assertEqual(self.enqueue(user=self.other).status, ExportJob.Status.PENDING)
+
+    def test_failing_exporter_fails_the_job(self):
+        def write(queryset, file, progress):
+            raise ValueError("Disk full")
+
+        job = self.enqueue()
+        with mock.patch.dict(EXPORTERS, {"students.roster_csv": Exporter("students.roster_csv", write, "csv", "s")}):
+            with self.assertLogs("students.export_jobs", "ERROR"):
+                run_export(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.reusable), (ExportJob.Status.FAILED, "Disk full", False))
+
+    def test_requeue_stale_jobs(self):
+        stale, alive = self.enqueue(), self.enqueue(user=self.other)
+        ExportJob.objects.filter(pk__in=[stale.pk, alive.pk]).update(
+            status=ExportJob.Status.RUNNING, processed=3, heartbeat_at=timezone.now()
+        )
+        ExportJob.objects.filter(pk=stale.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(requeue_stale_jobs(stale_after=300), [stale.pk])
+        stale.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((stale.status, stale.processed), (ExportJob.Status.PENDING, 0))
+        self.assertEqual(alive.status, ExportJob.Status.RUNNING)
+        self.assertTrue(run_export(stale.pk))
+
+
+class StudentDataGeneratorTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.generator = StudentDataGenerator(seed=11, pool_size=200, as_of=date(2025, 1, 1))
+
+    def test_chunks_are_reproducible_from_the_seed(self):
+        again = StudentDataGenerator(seed=11, pool_size=200, as_of=date(2025, 1, 1))
+        for typed in (True, False):
+            with self.subTest(typed=typed):
+                self.assertTrue(self.generator.chunk(2, 100, 50, typed).equals(again.chunk(2, 100, 50, typed)))
+        self.assertFalse(self.generator.chunk(2, 100, 50).equals(self.generator.chunk(3, 100, 50)))
+        other = StudentDataGenerator(seed=12, pool_size=200, as_of=date(2025, 1, 1))
+        self.assertFalse(self.generator.chunk(0, 0, 50).equals(other.chunk(0, 0, 50)))
+
+    def test_rows_are_what_the_importer_reads(self):
+        typed = self.generator.chunk(0, 0, 20).to_pylist()
+        untyped = self.generator.chunk(0, 0, 20, typed=False).to_pylist()
+        for typed_row, row in zip(typed, untyped):
+            self.assertEqual(row["subjects"], ", ".join(typed_row["subjects"]))
+            self.assertEqual(
+                [(name, Decimal(score)) for name, score in (item.split(":") for item in row["grades"].split("; "))],
+                [(grade["subject"], grade["score"]) for grade in typed_row["grades"]],
+            )
+            self.assertEqual({grade["subject"] for grade in typed_row["grades"]}, set(typed_row["subjects"]))
+            self.assertTrue(
+                date(2006, 12, 1) < typed_row["date_of_birth"] <= date(2009, 1, 1)
+                and typed_row["enrollment_date"] <= date(2025, 1, 1)
+            )
+
+    def test_usernames_are_unique(self):
+        users = [
+            user for index, start, size in plan_chunks(2000, 500)
+            for user in self.generator.chunk(index, start, size).column("user").to_pylist()
+        ]
+        self.assertEqual(len(set(users)), 2000)
+
+    def test_shards_hold_the_rows_of_a_single_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            single = os.path.join(directory, "single.parquet")
+            self.generator.write(single, 23, "parquet", chunk_size=5)
+            sharded = os.path.join(directory, "sharded.parquet")
+            manifest = self.generator.write_shards(sharded, 23, "parquet", chunk_size=5, shards=3, workers=2)
+            self.assertEqual([shard["rows"] for shard in manifest["shards"]], [10, 10, 3])
+            self.assertEqual([shard["first_row"] for shard in manifest["shards"]], [0, 10, 20])
+            shards = pa.concat_tables(pq.read_table(path) for path in read_manifest(manifest_path(sharded)))
+            self.assertTrue(shards.equals(pq.read_table(single)))
+
+
+class SeedDatabaseTests(TestCase):
+    def seed(self, students):
+        stdout = io.StringIO()
+        call_command(
+            "seed_database", students=students, seed=5, chunk_size=8, as_of=date(2025, 1, 1), quiet=True,
+            stdout=stdout, stderr=io.StringIO(),
+        )
+        return stdout.getvalue()
+
+    def test_seeds_students_with_their_records(self):
+        self.assertIn("Seeded 20 students", self.seed(students=20))
+        self.assertEqual(Student.objects.count(), 20)
+        for model in (HealthInformation, EconomicSituation, SocialMediaAndTechnology):
+            self.assertEqual(model.objects.count(), 20)
+        self.assertFalse(Student.objects.filter(grades__isnull=True).exists())
+        self.assertFalse(Student.objects.filter(academic_performance__isnull=True).exists())
+        for student_id, semester, count in (
+            Grade.objects.values_list("student_id", "semester").annotate(count=Count("pk")).order_by()
+        ):
+            trend = StudentPerformanceTrend.objects.get(student_id=student_id, semester=semester)
+            self.assertEqual(trend.grade_count, count)
+
+    def test_same_seed_skips_the_students_already_there(self):
+        self.seed(students=10)
+        students = dict(Student.objects.values_list("email", "import_hash"))
+        self.assertIn("Seeded 0 students (10 already present, 0 failed)", self.seed(students=10))
+        self.assertEqual(dict(Student.objects.values_list("email", "import_hash")), students)
+
+
+class SearchDocumentTests(TestCase):
+    """Search documents follow student and grade changes once their transaction commits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.chemistry = Subject.objects.create(name="Chemistry")
+
+    def text(self, student):
+        return StudentSearchDocument.objects.get(student=student).text
+
+    def test_documents_are_refreshed_on_commit(self):
+        with mock.patch(
+            "students.search.refresh_search_documents", wraps=refresh_search_documents
+        ) as refresh, self.captureOnCommitCallbacks(execute=True):
+            student = create_student("jsmith", "Jane Smith", mobile="0123456789")
+            Grade.objects.create(student=student, subject=self.chemistry, score=Decimal("70"))
+            self.assertFalse(StudentSearchDocument.objects.exists())
+        refresh.assert_called_once_with([student.pk])
+        self.assertEqual(self.text(student), "Jane Smith jsmith@example.com 0123456789 Chemistry")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student.full_name = "Jane Smith-Jones"
+            student.save()
+        self.assertTrue(self.text(student).startswith("Jane Smith-Jones "))
+
+    def test_rolled_back_changes_are_not_refreshed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = create_student("jsmith", "Jane Smith")
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Grade.objects.create(student=student, subject=self.chemistry, score=Decimal("70"))
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.text(student), "Jane Smith jsmith@example.com")
+
+    def test_search_view_pages_the_results(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(25):
+                create_student(f"smith{number}", f"Student{number} Smith")
+            create_student("jdoe", "John Doe")
+        response = self.client.get(reverse("student_search"), {"q": "smith"})
+        page = response.context["page_obj"]
+        self.assertEqual((page.paginator.count, len(page.object_list)), (25, 20))
+        response = self.client.get(reverse("student_search"), {"q": "smith", "page": 2})
+        self.assertEqual(len(response.context["page_obj"].object_list), 5)
+        response = self.client.get(reverse("student_search"), {"q": "?!"})
+        self.assertEqual(response.context["page_obj"].paginator.count, 0)
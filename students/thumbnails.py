@@ -0,0 +1,121 @@
+"""
+Profile image thumbnails for students.
+
+Student.save() used to open and resize ``profile_image`` with Pillow on every
+save, inside the request, overwriting the original upload. Now a changed image
+is handed to a background worker once the transaction commits. The worker
+renders a fixed set of sizes and stores them under the SHA-256 of the image
+content, so identical uploads share thumbnails and re-saving an unchanged
+image costs nothing. JPEGs are decoded with Pillow's draft mode, which scales
+them down while decoding instead of loading the full-resolution bitmap.
+
+Thumbnails can also be (re)generated synchronously with the
+``generate_thumbnails`` management command.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = {
+    "avatar": (64, 64),      # admin change list and search results
+    "profile": (300, 300),   # admin change form, profile and report pages
+}
+THUMBNAIL_DIR = "student_profiles/thumbnails"
+
+_executor = None
+
+
+def is_remote(name):
+    """Imported students may reference an external URL instead of an uploaded file."""
+    return name.lower().startswith("http")
+
+
+def thumbnail_name(content_hash, size):
+    return f"{THUMBNAIL_DIR}/{content_hash[:2]}/{content_hash}_{size}.jpg"
+
+
+def profile_image_url(student, size="profile"):
+    """URL of ``student``'s profile image at ``size``, or of the original if not generated yet."""
+    image = student.profile_image
+    if not image:
+        return ""
+    if is_remote(image.name):
+        return image.name
+    if student.profile_image_hash:
+        return image.storage.url(thumbnail_name(student.profile_image_hash, size))
+    return image.url
+
+
+def render_thumbnail(data, size):
+    """Return JPEG bytes of the image in ``data`` scaled to fit within ``size``."""
+    with Image.open(BytesIO(data)) as img:
+        if img.format == "JPEG":
+            # Let the decoder downscale by a power of two while reading.
+            img.draft("RGB", size)
+        img = img.convert("RGB")
+        img.thumbnail(size)
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
+
+
+def generate_profile_thumbnails(student_id):
+    """
+    Render every size in THUMBNAIL_SIZES for the student's current profile image
+    and record the image's content hash. Returns the hash, or ``None`` if there
+    was nothing to do.
+    """
+    Student = apps.get_model('students', 'Student')
+    student = Student.objects.filter(pk=student_id).only('pk', 'profile_image').first()
+    if student is None or not student.profile_image or is_remote(student.profile_image.name):
+        return None
+
+    image = student.profile_image
+    with image.open("rb") as fh:
+        data = fh.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+    for size_name, size in THUMBNAIL_SIZES.items():
+        name = thumbnail_name(content_hash, size_name)
+        if not image.storage.exists(name):
+            image.storage.save(name, ContentFile(render_thumbnail(data, size)))
+
+    # Skip the update if the image was replaced again in the meantime.
+    Student.objects.filter(pk=student_id, profile_image=image.name).update(profile_image_hash=content_hash)
+    return content_hash
+
+
+def _run_in_worker(student_id):
+    try:
+        generate_profile_thumbnails(student_id)
+    except Exception:
+        logger.exception("Error generating profile thumbnails for student %s", student_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_profile_thumbnails(student_id):
+    """
+    Generate the student's thumbnails in a background thread after the current
+    transaction commits. Set ``PROFILE_THUMBNAILS_ASYNC = False`` to generate
+    them synchronously on commit instead.
+    """
+    global _executor
+    if not getattr(settings, "PROFILE_THUMBNAILS_ASYNC", True):
+        transaction.on_commit(lambda: generate_profile_thumbnails(student_id))
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "PROFILE_THUMBNAIL_WORKERS", 2),
+            thread_name_prefix="profile-thumbnails",
+        )
+    transaction.on_commit(lambda: _executor.submit(_run_in_worker, student_id))
@@ -0,0 +1,180 @@
+"""
+In-process prefix index for student typeahead.
+
+The report dropdown used to render every student into a ``<select>``, and
+the admin autocomplete for students ran ``icontains`` on every keystroke.
+Both now use ``student_typeahead``, which keeps a sorted list of normalized
+keys per process. Each student has one key per word of their name, running
+to the end of the name ("aaron bell", "bell"), plus one for their email. A
+lookup bisects to the first key starting with the query and reads forward,
+so it does not touch the database and takes microseconds.
+
+The index is built on the first lookup. Saves and deletes of a Student in
+this process update it once their transaction commits (see
+``students.signals``). Changes made elsewhere (other worker processes, bulk
+writes) show up once the index is older than ``TYPEAHEAD_MAX_AGE`` seconds,
+when it is rebuilt in a background thread while the old one keeps serving.
+"""
+
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+
+from .models import Student
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Casefolded text without accents or diacritics, and with single spaces."""
+    text = unicodedata.normalize("NFKD", (text or "").casefold())
+    return " ".join("".join(char for char in text if not unicodedata.combining(char)).split())
+
+
+class PrefixIndex:
+    """Students by the prefixes of their normalized names and emails."""
+
+    def __init__(self):
+        # Sorted (key, pk) pairs, and the (full name, email) of each pk.
+        self._entries = []
+        self._students = {}
+
+    def __len__(self):
+        return len(self._students)
+
+    @staticmethod
+    def keys(full_name, email):
+        words = normalize(full_name).split()
+        keys = {" ".join(words[start:]) for start in range(len(words))}
+        if email:
+            keys.add(normalize(email))
+        return keys
+
+    @classmethod
+    def build(cls, students):
+        """An index of ``students``, an iterable of ``(pk, full_name, email)``."""
+        index = cls()
+        for pk, full_name, email in students:
+            index._students[pk] = (full_name, email)
+            index._entries.extend((key, pk) for key in cls.keys(full_name, email))
+        index._entries.sort()
+        return index
+
+    def add(self, pk, full_name, email):
+        """Add the student ``pk``, or replace its name and email."""
+        self.remove(pk)
+        self._students[pk] = (full_name, email)
+        for key in self.keys(full_name, email):
+            insort(self._entries, (key, pk))
+
+    def remove(self, pk):
+        student = self._students.pop(pk, None)
+        if student is None:
+            return
+        for key in self.keys(*student):
+            position = bisect_left(self._entries, (key, pk))
+            if position < len(self._entries) and self._entries[position] == (key, pk):
+                del self._entries[position]
+
+    def lookup(self, query, limit=10):
+        """
+        Up to ``limit`` students with a key starting with ``query``, as
+        ``{"id", "full_name", "email"}`` dicts in key order.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        entries = self._entries
+        results, seen = [], set()
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(results) < limit:
+            key, pk = entries[position]
+            if not key.startswith(prefix):
+                break
+            if pk not in seen:
+                seen.add(pk)
+                full_name, email = self._students[pk]
+                results.append({"id": pk, "full_name": full_name, "email": email})
+            position += 1
+        return results
+
+
+class StudentTypeahead:
+    """
+    The process's ``PrefixIndex`` of students, built lazily and rebuilt when too
+    old. Lookups and changes hold ``_lock``: ``PrefixIndex`` is not safe to read
+    while it is being changed. Changes made while a rebuild is loading are
+    replayed on the new index before it replaces the old one.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        # (method name, args) of the changes made during a rebuild.
+        self._changes = []
+
+    @staticmethod
+    def _load():
+        students = Student.objects.order_by().values_list("pk", "full_name", "email")
+        return PrefixIndex.build(students.iterator(chunk_size=5000))
+
+    def _rebuild(self):
+        try:
+            index = self._load()
+        except Exception:
+            logger.exception("Error rebuilding the student typeahead index")
+            index = None
+        finally:
+            connections.close_all()
+        with self._lock:
+            if index is not None and self._index is not None:
+                for method, args in self._changes:
+                    getattr(index, method)(*args)
+                self._index, self._built_at = index, time.monotonic()
+            self._changes = []
+            self._rebuilding = False
+
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                self._index, self._built_at = self._load(), time.monotonic()
+                return self._index
+            if self._rebuilding or time.monotonic() - self._built_at <= getattr(settings, "TYPEAHEAD_MAX_AGE", 300):
+                return self._index
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="student-typeahead", daemon=True).start()
+        return self._index
+
+    def lookup(self, query, limit=10):
+        index = self.index()
+        with self._lock:
+            return index.lookup(query, limit)
+
+    def _change(self, method, *args):
+        with self._lock:
+            if self._index is not None:
+                getattr(self._index, method)(*args)
+                if self._rebuilding:
+                    self._changes.append((method, args))
+
+    def update(self, pk, full_name, email):
+        self._change("add", pk, full_name, email)
+
+    def remove(self, pk):
+        self._change("remove", pk)
+
+    def clear(self):
+        """Drop the index; the next lookup builds it again."""
+        with self._lock:
+            self._index = None
+            self._changes = []
+
+
+student_typeahead = StudentTypeahead()
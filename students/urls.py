@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import home_view, student_search, export_students_csv
+from .views import home_view, student_search, student_typeahead_view, export_students_csv, export_job, download_export
 
 urlpatterns = [
     path("", home_view, name="home"),
     path("search/", student_search, name="student_search"),
+    path("typeahead/", student_typeahead_view, name="student_typeahead"),
     path("export/csv/", export_students_csv, name="export_students_csv"),
+    path("exports/<int:job_id>/", export_job, name="export_job"),
+    path("exports/<int:job_id>/download/", download_export, name="download_export"),
 ]
@@ -1,7 +1,20 @@
-import csv
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
-from .models import Student
+from datetime import date
+
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.shortcuts import render, get_object_or_404, redirect
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from .export_jobs import enqueue_export
+from .exports import STUDENT_ROSTER_COLUMNS, STUDENT_ROSTER_DEFAULT_COLUMNS, csv_lines, student_roster
+from .models import ExportJob, Student
+from .search import SearchResults
+from .typeahead import student_typeahead
+
+# Matches returned by the typeahead endpoint by default, and at most.
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+BOOLEAN_PARAMS = {"1": True, "true": True, "yes": True, "0": False, "false": False, "no": False}
 
 def home_view(request):
     """
@@ -16,35 +29,112 @@ def home_view(request):
 
 def student_search(request):
     """
-    Searches for students based on the query parameter 'q'.
+    Searches students by name, email, mobile and grade subjects for the query
+    parameter 'q', best matches first, 20 per page.
     """
-    query = request.GET.get("q", "")
-    if query:
-        students = Student.objects.filter(full_name__icontains=query)
-    else:
-        students = Student.objects.all()
-    return render(request, "students/student_search.html", {"students": students, "query": query})
+    query = request.GET.get("q", "").strip()
+    paginator = Paginator(SearchResults(query), 20)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    return render(request, "students/student_search.html", {"page_obj": page_obj, "query": query})
 
-def export_students_csv(request):
+
+@login_required
+def student_typeahead_view(request):
     """
-    Exports all students' data as a CSV file.
+    Returns as JSON the students whose name (from any word) or email starts
+    with the query parameter 'q', up to 'limit' of them. Served from the
+    in-process typeahead index, without querying the database. Login is
+    required since the results include the students' emails.
+    """
+    try:
+        limit = min(int(request.GET.get("limit", TYPEAHEAD_LIMIT)), TYPEAHEAD_MAX_LIMIT)
+    except ValueError:
+        return HttpResponseBadRequest("limit must be an integer.")
+    results = student_typeahead.lookup(request.GET.get("q", ""), limit=max(limit, 0))
+    return JsonResponse({"results": results})
+
+
+def _roster_selection(params):
+    """
+    The students and columns selected by the query parameters of the roster
+    CSV export. Raises ``ValueError`` for an invalid parameter.
     """
     students = Student.objects.all()
-    response = HttpResponse(content_type='text/csv')
+    grade_levels = [level for level in params.getlist("grade_level") if level]
+    if grade_levels:
+        students = students.filter(grade_level__in=grade_levels)
+    active = params.get("active", "").lower()
+    if active:
+        if active not in BOOLEAN_PARAMS:
+            raise ValueError("active must be 1 or 0.")
+        students = students.filter(is_active=BOOLEAN_PARAMS[active])
+    for name, lookup in (("enrolled_from", "enrollment_date__gte"), ("enrolled_to", "enrollment_date__lte")):
+        if params.get(name):
+            try:
+                students = students.filter(**{lookup: date.fromisoformat(params[name])})
+            except ValueError:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD).") from None
+    columns = [column.strip() for column in params.get("columns", "").split(",") if column.strip()]
+    unknown = [column for column in columns if column not in STUDENT_ROSTER_COLUMNS]
+    if unknown:
+        raise ValueError(
+            f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(STUDENT_ROSTER_COLUMNS)}."
+        )
+    return students, columns or STUDENT_ROSTER_DEFAULT_COLUMNS
+
+
+@login_required
+def export_students_csv(request):
+    """
+    Exports students' data as a CSV file, streamed as rows are read from the
+    database in chunks (through a server-side cursor on PostgreSQL), so memory
+    use does not grow with the number of students. Login is required, as for
+    the export job pages: the roster holds contact details, and a background
+    export belongs to the user who requested it.
+
+    Optional query parameters:
+    - grade_level: one or more grade levels to include
+    - active: 1 or 0, to include only active or inactive students
+    - enrolled_from, enrolled_to: enrollment date range (YYYY-MM-DD, inclusive)
+    - columns: comma-separated field names (default: STUDENT_ROSTER_DEFAULT_COLUMNS)
+    - background: 1 to produce the file in a background export job instead
+    """
+    try:
+        students, columns = _roster_selection(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    if request.GET.get("background"):
+        job = enqueue_export("students.roster_csv", students.values_list(*columns), request.user)
+        return redirect("export_job", job_id=job.pk)
+    header, rows = student_roster(students, columns)
+    response = StreamingHttpResponse(csv_lines(header, rows), content_type="text/csv")
     response['Content-Disposition'] = 'attachment; filename="students.csv"'
-    writer = csv.writer(response)
-    writer.writerow([
-        "Full Name", "Student ID", "Email", "Mobile",
-        "Grade Level", "Academic Performance", "Enrollment Date"
-    ])
-    for student in students:
-        writer.writerow([
-            student.full_name,
-            student.student_id,
-            student.email,
-            student.mobile,
-            student.grade_level,
-            student.academic_performance,
-            student.enrollment_date,
-        ])
     return response
+
+
+def _export_job_or_404(request, job_id):
+    """Staff see every export job, other users only their own."""
+    jobs = ExportJob.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(requested_by=request.user)
+    return get_object_or_404(jobs, pk=job_id)
+
+
+@login_required
+def export_job(request, job_id):
+    """
+    Shows the progress of an export job, and a link to its file once it is done.
+    """
+    job = _export_job_or_404(request, job_id)
+    return render(request, "students/export_job.html", {"job": job})
+
+
+@login_required
+def download_export(request, job_id):
+    """
+    Downloads the file of a finished export job from media storage.
+    """
+    job = _export_job_or_404(request, job_id)
+    if job.status != ExportJob.Status.DONE:
+        raise Http404("This export is not ready.")
+    return FileResponse(job.file.open("rb"), as_attachment=True, filename=job.file_name)